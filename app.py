@@ -1,5 +1,7 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
-from flask_mysqldb import MySQL
+from json_provider import FastJSONProvider
+from db_pool import MySQLPool
+from assets import StaticAssets
 from werkzeug.security import generate_password_hash, check_password_hash
 import traceback
 import config # Make sure config.py exists and is configured
@@ -7,19 +9,66 @@ from functools import wraps
 import json
 from datetime import datetime, timedelta, date
 import os # Added for show_env, ensure it's used or remove show_env
+from scheduler import schedule_review, schedule_reviews
+from leaderboard_refresher import LeaderboardRefresher
+from cache import LRUCache
+from streaks import USER_STATS_REVIEW_UPSERT, DEFAULT_TIMEZONE, local_review_day, streak_summary
+from study_sessions import STUDY_PAGE_SIZE, MAX_STUDY_PAGE_SIZE, build_study_queue, create_study_session, load_study_session, mark_handed_out, requeue_card
+from review_stats import RECENT_ACTIVITY_QUERY, daily_reviews_statement, record_daily_reviews, fetch_daily_review_stats
+from deck_stats import DECK_LIST_QUERY, DeckStatsDelta, delete_deck_stats, rebuild_all_deck_stats, fetch_due_today_counts
+from leaderboard import (
+    LEADERBOARD_SNAPSHOT_SIZE, LEADERBOARD_TOP_QUERY, LEADERBOARD_RECENT_REVIEWERS_QUERY, LEADERBOARD_COUNT_QUERY,
+    LEADERBOARD_PAGE_QUERY, LEADERBOARD_USER_RANK_QUERY
+)
+from card_queries import build_fulltext_query, card_search_query, order_card_search_page, deck_cards_query
+from review_log_writer import ReviewLogWriter
+from metrics import InstrumentedDictCursor, RequestMetrics, render_gauges
+from query_audit import QueryAuditor
+import base64
+import hmac
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 app.config['MYSQL_HOST'] = config.DB_HOST
 app.config['MYSQL_USER'] = config.DB_USER
 app.config['MYSQL_PASSWORD'] = config.DB_PASSWORD
 app.config['MYSQL_DB'] = config.DB_NAME
 app.config['MYSQL_PORT'] = config.DB_PORT
-app.config['MYSQL_CURSORCLASS'] = 'DictCursor'
+app.config['MYSQL_CURSORCLASS'] = InstrumentedDictCursor
+app.config['MYSQL_DECIMAL_AS_FLOAT'] = True
+app.config['MYSQL_POOL_SIZE'] = config.DB_POOL_SIZE
+app.config['MYSQL_POOL_WARMUP'] = config.DB_POOL_WARMUP
+app.config['MYSQL_POOL_TIMEOUT'] = config.DB_POOL_TIMEOUT
+app.config['MYSQL_POOL_MAX_LIFETIME'] = config.DB_POOL_MAX_LIFETIME
+app.config['MYSQL_POOL_PING_INTERVAL'] = config.DB_POOL_PING_INTERVAL
+app.config['ASSETS_MAX_AGE'] = config.ASSETS_MAX_AGE
+app.config['QUERY_AUDIT'] = config.QUERY_AUDIT
+app.config['QUERY_AUDIT_REPEAT_THRESHOLD'] = config.QUERY_AUDIT_REPEAT_THRESHOLD
+app.config['QUERY_AUDIT_SLOW_MS'] = config.QUERY_AUDIT_SLOW_MS
 
 app.secret_key = config.SECRET_KEY
 
-mysql = MySQL(app)
+mysql = MySQLPool(app)
+request_metrics = RequestMetrics(app)
+query_auditor = QueryAuditor(app, mysql)
+static_assets = StaticAssets(app)
+
+user_settings_cache = LRUCache(config.SETTINGS_CACHE_SIZE, ttl=config.SETTINGS_CACHE_TTL)
+# Decoded field_values of notes whose Front/Back the generated columns could
+# not extract, keyed by (note_id, content_version).
+note_fields_cache = LRUCache(config.NOTE_CACHE_SIZE)
+
+# With REVIEW_LOG_WRITE_BEHIND on, review_logs rows are written after the
+# review commits by a background flusher instead of inside the request.
+review_log_writer = ReviewLogWriter(
+    mysql,
+    enabled=config.REVIEW_LOG_WRITE_BEHIND,
+    max_queue=config.REVIEW_LOG_QUEUE_SIZE,
+    flush_rows=config.REVIEW_LOG_FLUSH_ROWS,
+    flush_interval=config.REVIEW_LOG_FLUSH_INTERVAL,
+    enqueue_timeout=config.REVIEW_LOG_ENQUEUE_TIMEOUT
+)
 
 def login_required(f):
     @wraps(f)
@@ -35,6 +84,39 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+
+DEFAULT_USER_SETTINGS = {
+    'new_cards_per_day': 20,
+    'max_reviews_per_day': 100,
+    'learning_steps': '1,10',
+    'ease_bonus': 1.3,
+    'timezone': DEFAULT_TIMEZONE
+}
+
+
+USER_SETTINGS_QUERY = """
+    SELECT new_cards_per_day, max_reviews_per_day, learning_steps, ease_bonus, timezone
+    FROM settings
+    WHERE user_id = %s
+"""
+
+
+def cache_user_settings(user_id, settings_row):
+    settings = dict(DEFAULT_USER_SETTINGS)
+    if settings_row:
+        settings.update({key: value for key, value in settings_row.items() if value is not None})
+    user_settings_cache.set(user_id, settings)
+    return dict(settings)
+
+
+def get_user_settings(cur, user_id):
+    # Read-through cache; api_update_profile invalidates the entry it changes.
+    settings = user_settings_cache.get(user_id)
+    if settings is None:
+        cur.execute(USER_SETTINGS_QUERY, (user_id,))
+        return cache_user_settings(user_id, cur.fetchone())
+    return dict(settings)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -44,37 +126,122 @@ def index():
 def leaderboard_page():
     return render_template('leaderboard.html')
 
+
+def encode_cursor(*values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError('Malformed cursor')
+    return values
+
+
+def decode_card_cursor(cursor, with_relevance=False):
+    """Decode a card listing cursor into ([relevance,] created_at, id); raises ValueError."""
+    values = decode_cursor(cursor, 3 if with_relevance else 2)
+    *relevance, created_at, row_id = values
+    if not isinstance(row_id, int) or not isinstance(created_at, str):
+        raise ValueError('Malformed cursor')
+    if relevance and not isinstance(relevance[0], (int, float)):
+        raise ValueError('Malformed cursor')
+    return (*relevance, datetime.fromisoformat(created_at), row_id)
+
+
+def request_page_limit(default, maximum):
+    return min(max(request.args.get('limit', default, type=int), 1), maximum)
+
+
+def refresh_leaderboard_snapshot(cur, full=False):
+    # A named lock keeps concurrent refreshes (other requests or workers) from
+    # interleaving their deletes and inserts. Returns None if one is running.
+    cur.execute("SELECT GET_LOCK('leaderboard_snapshot_refresh', 0) AS acquired")
+    lock_row = cur.fetchone()
+    if not lock_row or not lock_row['acquired']:
+        return None
+
+    try:
+        cur.execute("""
+            SELECT ls.user_id, ls.username AS snapshot_username, u.username, ls.points, ls.`rank`, ls.captured_at
+            FROM leaderboard_snapshots ls
+            JOIN users u ON u.id = ls.user_id
+        """)
+        current_rows = {row['user_id']: row for row in cur.fetchall()}
+        last_captured_at = max((row['captured_at'] for row in current_rows.values() if row['captured_at']), default=None)
+
+        candidates = {}
+        if full or last_captured_at is None:
+            cur.execute(LEADERBOARD_TOP_QUERY, (LEADERBOARD_SNAPSHOT_SIZE,))
+        else:
+            # Points only ever grow, so the new top N is contained in the current
+            # snapshot plus the users who reviewed since it was captured. A day of
+            # slack covers last_reviewed_date being in the user's time zone.
+            candidates = {user_id: {'username': row['username'], 'points': row['points']}
+                          for user_id, row in current_rows.items()}
+            cur.execute(LEADERBOARD_RECENT_REVIEWERS_QUERY, (last_captured_at.date() - timedelta(days=1),))
+        for row in cur.fetchall():
+            candidates[row['user_id']] = {'username': row['username'], 'points': row['points']}
+
+        ranked = sorted(
+            candidates.items(),
+            key=lambda item: (-item[1]['points'], (item[1]['username'] or '').casefold(), item[0])
+        )[:LEADERBOARD_SNAPSHOT_SIZE]
+
+        new_rows = {}
+        rank = 0
+        previous_points = None
+        for position, (user_id, candidate) in enumerate(ranked, start=1):
+            if candidate['points'] != previous_points:
+                rank = position
+                previous_points = candidate['points']
+            new_rows[user_id] = (candidate['username'], candidate['points'], rank)
+
+        changed_ids = [
+            user_id for user_id, (username, points, rank) in new_rows.items()
+            if user_id not in current_rows
+            or (current_rows[user_id]['snapshot_username'], current_rows[user_id]['points'], current_rows[user_id]['rank']) != (username, points, rank)
+        ]
+        removed_ids = [user_id for user_id in current_rows if user_id not in new_rows]
+
+        # Delete and re-insert only the rows that moved. Both statements commit
+        # together, so readers see either the previous snapshot or the new one.
+        stale_ids = changed_ids + removed_ids
+        if stale_ids:
+            placeholders = ','.join(['%s'] * len(stale_ids))
+            cur.execute(f"DELETE FROM leaderboard_snapshots WHERE user_id IN ({placeholders})", tuple(stale_ids))
+        if changed_ids:
+            captured_at = datetime.now()
+            cur.executemany(
+                "INSERT INTO leaderboard_snapshots (user_id, username, points, `rank`, captured_at) VALUES (%s, %s, %s, %s, %s)",
+                [(user_id, *new_rows[user_id], captured_at) for user_id in changed_ids]
+            )
+        mysql.connection.commit()
+
+        return {'updated': len(changed_ids), 'removed': len(removed_ids), 'total': len(new_rows)}
+    finally:
+        cur.execute("SELECT RELEASE_LOCK('leaderboard_snapshot_refresh')")
+        cur.fetchall()
+
+
 @app.route('/api/admin/populate-leaderboard', methods=['POST'])
 @login_required # Ensure only authorized users can do this if it's sensitive
 def admin_populate_leaderboard_snapshot():
+    full_refresh = request.args.get('full', '').lower() in ('1', 'true', 'yes')
+
     cur = None
     try:
         cur = mysql.connection.cursor()
+        refresh_result = refresh_leaderboard_snapshot(cur, full=full_refresh)
+        if refresh_result is None:
+            return jsonify(success=False, errors={'general': 'A leaderboard refresh is already running. Try again shortly.'}), 409
 
-        # Clear out the old snapshot before creating a new one
-        cur.execute("TRUNCATE TABLE leaderboard_snapshots;")
-
-        sql_populate_mysql8 = """
-            INSERT INTO leaderboard_snapshots (user_id, username, points, `rank`, captured_at)
-            SELECT
-                u.id AS user_id,
-                u.username,
-                us.points,
-                RANK() OVER (ORDER BY us.points DESC) AS `rank`,
-                NOW() AS captured_at
-            FROM users u
-            JOIN user_stats us ON u.id = us.user_id
-            WHERE us.points > 0  -- Only include users who have earned points
-            ORDER BY us.points DESC
-            LIMIT 1000;          -- Limit the size of the snapshot
-        """
-
-        cur.execute(sql_populate_mysql8)
-
-        rows_inserted = cur.rowcount # Get how many rows were inserted
-        mysql.connection.commit()
-
-        return jsonify(success=True, message=f"Leaderboard snapshot updated successfully. {rows_inserted} entries processed."), 200
+        return jsonify(
+            success=True,
+            message=f"Leaderboard snapshot updated successfully. {refresh_result['updated']} entries updated, {refresh_result['removed']} removed.",
+            **refresh_result
+        ), 200
 
     except Exception as e:
         if mysql.connection and hasattr(mysql.connection, 'rollback'):
@@ -86,100 +253,85 @@ def admin_populate_leaderboard_snapshot():
             cur.close()      
 
 
+def decode_leaderboard_cursor(cursor):
+    """Return the (rank, user_id) a leaderboard page starts after; (0, 0) without a cursor."""
+    if not cursor:
+        return 0, 0
+    after_rank, after_user_id = (int(value) for value in decode_cursor(cursor, 2))
+    return after_rank, after_user_id
+
+
+def leaderboard_response(rows, limit, total_entries_row, current_user_rank):
+    """Shape a page of LEADERBOARD_PAGE_QUERY rows (fetched with LIMIT limit + 1)."""
+    total_entries = total_entries_row['total_entries'] if total_entries_row else 0
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['rank'], rows[-1]['user_id'])
+    return {
+        'success': True,
+        'leaderboard': rows,
+        'current_user_rank': current_user_rank,
+        'pagination': {
+            'limit': limit,
+            'total_entries': total_entries,
+            'total_pages': (total_entries + limit - 1) // limit,
+            'next_cursor': next_cursor
+        }
+    }
+
+
+def refresh_leaderboard_snapshot_in_background():
+    with app.app_context():
+        cur = mysql.connection.cursor()
+        try:
+            refresh_leaderboard_snapshot(cur)
+        except Exception:
+            mysql.connection.rollback()
+            raise
+        finally:
+            cur.close()
+
+
+# Requests only read leaderboard_snapshots; each worker refreshes it every
+# LEADERBOARD_SNAPSHOT_MAX_AGE seconds from a background thread.
+leaderboard_refresher = LeaderboardRefresher(
+    app, refresh_leaderboard_snapshot_in_background, config.LEADERBOARD_SNAPSHOT_MAX_AGE
+)
+
+
 @app.route('/api/leaderboard', methods=['GET'])
 @login_required
 def api_get_leaderboard():
     user_id = session.get('user_id')
-    page = request.args.get('page', 1, type=int)
-    limit = max(1, request.args.get('limit', 50, type=int))
-    offset = (page - 1) * limit
+    limit = min(max(1, request.args.get('limit', 50, type=int)), LEADERBOARD_SNAPSHOT_SIZE)
+    cursor_str = request.args.get('cursor', '').strip()
+
+    try:
+        after_rank, after_user_id = decode_leaderboard_cursor(cursor_str)
+    except (ValueError, TypeError):
+        return jsonify(success=False, errors={'cursor': 'Invalid pagination cursor.'}), 400
 
     cur = None
     try:
         cur = mysql.connection.cursor()
 
-        # Query to count total users with points for pagination
-        cur.execute("""
-            SELECT COUNT(u.id) as total_entries
-            FROM users u
-            JOIN user_stats us ON u.id = us.user_id
-            WHERE us.points > 0
-        """)
+        # The count, the page and the caller's rank are read in one
+        # transaction, so they come from the same committed snapshot.
+        cur.execute(LEADERBOARD_COUNT_QUERY)
         total_entries_data = cur.fetchone()
-        total_entries = total_entries_data['total_entries'] if total_entries_data else 0
 
-        total_pages = 0
-        if total_entries > 0:
-            total_pages = (total_entries + limit - 1) // limit
-        
-        if page > total_pages and total_pages > 0: # Adjust page if out of bounds
-            page = total_pages
-            offset = (page - 1) * limit
-        elif total_entries == 0:
-            page = 1
-            offset = 0
-
-
-       
-        leaderboard_query_mysql8 = """
-            SELECT
-                u.id as user_id,
-                u.username,
-                us.points,
-                RANK() OVER (ORDER BY us.points DESC) AS `rank`
-            FROM users u
-            JOIN user_stats us ON u.id = us.user_id
-            WHERE us.points > 0
-            ORDER BY us.points DESC, u.username ASC
-            LIMIT %s OFFSET %s
-        """
-        leaderboard_query_older_mysql = """
-            SELECT
-                u.id as user_id,
-                u.username,
-                us.points
-                -- Rank will be assigned in Python based on order
-            FROM users u
-            JOIN user_stats us ON u.id = us.user_id
-            WHERE us.points > 0
-            ORDER BY us.points DESC, u.username ASC
-            LIMIT %s OFFSET %s
-        """
-        
-        cur.execute(leaderboard_query_mysql8, (limit, offset))
+        cur.execute(LEADERBOARD_PAGE_QUERY, (after_rank, after_rank, after_user_id, limit + 1))
         leaderboard_data = cur.fetchall()
 
-
+        # None when the caller is outside the snapshot's top entries.
         current_user_rank_info = None
         if user_id:
-            current_user_rank_query_mysql8 = """
-                SELECT user_id, username, points, `rank`
-                FROM (
-                    SELECT
-                        u.id AS user_id,
-                        u.username,
-                        us.points,
-                        RANK() OVER (ORDER BY us.points DESC) AS `rank`
-                    FROM users u
-                    JOIN user_stats us ON u.id = us.user_id
-                    WHERE us.points > 0
-                ) AS ranked_users
-                WHERE user_id = %s
-            """
-            cur.execute(current_user_rank_query_mysql8, (user_id,))
+            cur.execute(LEADERBOARD_USER_RANK_QUERY, (user_id,))
             current_user_rank_info = cur.fetchone()
 
-        return jsonify(
-            success=True,
-            leaderboard=leaderboard_data,
-            current_user_rank=current_user_rank_info,
-            pagination={
-                'page': page,
-                'limit': limit,
-                'total_entries': total_entries,
-                'total_pages': total_pages
-            }
-        )
+        return jsonify(leaderboard_response(leaderboard_data, limit, total_entries_data, current_user_rank_info))
     except Exception as e:
         traceback.print_exc()
         return jsonify(success=False, errors={'general': f'An error occurred fetching leaderboard: {str(e)}'}), 500
@@ -201,6 +353,25 @@ def auth():
 def dashboard():
     return render_template('dashboard.html')
 
+def fetch_user_tags(cur, user_id):
+    cur.execute("""
+        SELECT DISTINCT t.id, t.name 
+        FROM tags t
+        INNER JOIN note_tags nt ON t.id = nt.tag_id
+        INNER JOIN notes n ON nt.note_id = n.id
+        WHERE n.user_id = %s
+        UNION
+        SELECT DISTINCT t.id, t.name
+        FROM tags t
+        INNER JOIN deck_tags dt ON t.id = dt.tag_id
+        INNER JOIN decks d ON dt.deck_id = d.id
+        WHERE d.user_id = %s
+        ORDER BY name ASC
+    """, (user_id, user_id))
+    tags = cur.fetchall()
+    return list(tags) if tags else []
+
+
 @app.route('/api/tags', methods=['GET'])
 @login_required
 def api_get_tags():
@@ -211,22 +382,7 @@ def api_get_tags():
     cur = None
     try:
         cur = mysql.connection.cursor()
-        cur.execute("""
-            SELECT DISTINCT t.id, t.name 
-            FROM tags t
-            INNER JOIN note_tags nt ON t.id = nt.tag_id
-            INNER JOIN notes n ON nt.note_id = n.id
-            WHERE n.user_id = %s
-            UNION
-            SELECT DISTINCT t.id, t.name
-            FROM tags t
-            INNER JOIN deck_tags dt ON t.id = dt.tag_id
-            INNER JOIN decks d ON dt.deck_id = d.id
-            WHERE d.user_id = %s
-            ORDER BY name ASC
-        """, (user_id, user_id))
-        tags = cur.fetchall()
-        return jsonify(success=True, tags=tags if tags else [])
+        return jsonify(success=True, tags=fetch_user_tags(cur, user_id))
     except Exception as e:
         return jsonify(success=False, errors={'general': f'An error occurred while fetching tags: {str(e)}'}), 500
     finally:
@@ -254,6 +410,27 @@ def parse_field_values_utility(field_values_json):
         return {'Front': 'Error loading content due to an unexpected issue', 'Back': ''}
 
 
+def note_fields(row):
+    """Front/Back of a listing row.
+
+    Listing queries select the generated front_text/back_text columns, plus
+    n.content_version and the raw field_values only where front_text is
+    NULL (content the JSON path extraction cannot read), so JSON is decoded
+    at most once per note version.
+    """
+    if row.get('front_text') is not None:
+        return {'Front': row['front_text'], 'Back': row.get('back_text') or ''}
+
+    cache_key = (row['note_id'], row.get('content_version'))
+    field_values = note_fields_cache.get(cache_key)
+    if field_values is None:
+        field_values = parse_field_values_utility(row.get('field_values'))
+        if not isinstance(field_values, dict):
+            field_values = {'Front': 'Error: Invalid content data format', 'Back': ''}
+        note_fields_cache.set(cache_key, field_values)
+    return field_values
+
+
 @app.route('/api/cards/search', methods=['GET'])
 @login_required
 def api_search_cards():
@@ -264,34 +441,12 @@ def api_search_cards():
     search_query_term = request.args.get('query', '').strip()
     tag_ids_str = request.args.get('tags', '') 
     deck_id_str = request.args.get('deck_id', '').strip() 
+    limit = request_page_limit(config.CARD_PAGE_SIZE, config.CARD_PAGE_SIZE_MAX)
+    cursor = request.args.get('cursor')
 
     cur = None
     try:
-        cur = mysql.connection.cursor()
-        sql_query_base = """
-            SELECT 
-                n.id as note_id, 
-                f.id as flashcard_id,
-                n.field_values, 
-                d.name as deck_name,
-                d.id as deck_id,
-                f.card_type,
-                f.due_date,
-                (SELECT GROUP_CONCAT(DISTINCT t_sub.name SEPARATOR ', ') 
-                 FROM tags t_sub
-                 JOIN note_tags nt_sub ON t_sub.id = nt_sub.tag_id
-                 WHERE nt_sub.note_id = n.id) as note_tags 
-            FROM notes n
-            JOIN flashcards f ON n.id = f.note_id   
-            JOIN decks d ON f.deck_id = d.id
-            WHERE n.user_id = %s 
-        """
-        params = [user_id]
-        conditions = [] 
-
-        if search_query_term:
-            conditions.append("(n.field_values LIKE %s)")
-            params.append(f"%{search_query_term}%")
+        fulltext_query = build_fulltext_query(search_query_term) if search_query_term else None
 
         tag_ids = []
         if tag_ids_str:
@@ -299,11 +454,6 @@ def api_search_cards():
                 tag_ids = [int(tid) for tid in tag_ids_str.split(',') if tid.strip()]
             except ValueError:
                 return jsonify(success=False, errors={'tags': 'Invalid tag ID format. Ensure IDs are numbers.'}), 400
-            
-            if tag_ids:
-                placeholders = ','.join(['%s'] * len(tag_ids))
-                conditions.append(f"n.id IN (SELECT nt_sub.note_id FROM note_tags nt_sub WHERE nt_sub.tag_id IN ({placeholders}))")
-                params.extend(tag_ids)
 
         deck_ids = []
         if deck_id_str:
@@ -312,24 +462,40 @@ def api_search_cards():
             except ValueError:
                 return jsonify(success=False, errors={'deck_id': 'Invalid deck ID format. Ensure IDs are numbers.'}), 400
 
-            if deck_ids:
-                deck_placeholders = ','.join(['%s'] * len(deck_ids))
-                conditions.append(f"d.id IN ({deck_placeholders})")
-                params.extend(deck_ids)
-
-        if conditions:
-            sql_query = sql_query_base + " AND " + " AND ".join(conditions)
-        else:
-            sql_query = sql_query_base
-
-        sql_query += """
-            GROUP BY n.id, f.id, d.name, d.id, f.card_type, f.due_date 
-            ORDER BY n.created_at DESC
-            LIMIT 200 
-        """ 
+        cursor_values = None
+        if cursor:
+            try:
+                cursor_values = decode_card_cursor(cursor, with_relevance=bool(fulltext_query))
+            except (ValueError, TypeError):
+                return jsonify(success=False, errors={'cursor': 'Invalid cursor'}), 400
 
-        cur.execute(sql_query, tuple(params))
-        cards_raw = cur.fetchall()
+        cur = mysql.connection.cursor()
+        cur.execute(*card_search_query(
+            user_id, limit, search_query_term, fulltext_query, tag_ids, deck_ids, cursor_values
+        ))
+        cards_raw, has_more = order_card_search_page(cur.fetchall(), limit)
+
+        next_cursor = None
+        if has_more:
+            last_card = cards_raw[-1]
+            cursor_values = (last_card['created_at'].isoformat(), last_card['note_id'])
+            if fulltext_query:
+                cursor_values = (float(last_card['relevance']),) + cursor_values
+            next_cursor = encode_cursor(*cursor_values)
+
+        # Tags are looked up once for the whole page instead of per row.
+        tags_by_note = {}
+        note_ids = list({card_raw['note_id'] for card_raw in cards_raw if card_raw})
+        if note_ids:
+            note_placeholders = ','.join(['%s'] * len(note_ids))
+            cur.execute(f"""
+                SELECT nt.note_id, GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as note_tags
+                FROM note_tags nt
+                JOIN tags t ON t.id = nt.tag_id
+                WHERE nt.note_id IN ({note_placeholders})
+                GROUP BY nt.note_id
+            """, tuple(note_ids))
+            tags_by_note = {row['note_id']: row['note_tags'] for row in cur.fetchall()}
 
         results = []
         for card_raw in cards_raw:
@@ -337,9 +503,7 @@ def api_search_cards():
                 continue
                 
             card_data = dict(card_raw)
-            field_values = parse_field_values_utility(card_data.get('field_values'))
-            due_date = card_data.get('due_date')
-            
+            field_values = note_fields(card_data)
             results.append({
                 'note_id': card_data.get('note_id'),
                 'flashcard_id': card_data.get('flashcard_id'),
@@ -348,11 +512,11 @@ def api_search_cards():
                 'deck_name': card_data.get('deck_name'),
                 'deck_id': card_data.get('deck_id'),
                 'card_type': card_data.get('card_type'),
-                'due_date': due_date.strftime('%Y-%m-%d') if due_date else 'N/A',
-                'tags': card_data.get('note_tags', '')
+                'due_date': card_data.get('due_date'),
+                'tags': tags_by_note.get(card_data.get('note_id'), '')
             })
         
-        return jsonify(success=True, cards=results)
+        return jsonify(success=True, cards=results, pagination={'limit': limit, 'next_cursor': next_cursor})
 
     except Exception as e:
         return jsonify(success=False, errors={'general': f'An error occurred while searching cards: {str(e)}'}), 500
@@ -361,6 +525,46 @@ def api_search_cards():
             cur.close()
 
 
+def bump_deck_versions_statement(deck_ids):
+    deck_ids = list(set(deck_ids))
+    if not deck_ids:
+        return None
+    return (
+        f"UPDATE decks SET version = version + 1 WHERE id IN ({','.join(['%s'] * len(deck_ids))})",
+        tuple(deck_ids)
+    )
+
+
+def bump_deck_versions(cur, deck_ids):
+    # decks.version backs the ETags of the deck read endpoints; every write
+    # that changes what they return must bump it in the same transaction.
+    statement = bump_deck_versions_statement(deck_ids)
+    if statement:
+        cur.execute(*statement)
+
+
+def bump_note_deck_versions(cur, note_id):
+    cur.execute("""
+        UPDATE decks d
+        JOIN flashcards f ON f.deck_id = d.id
+        SET d.version = d.version + 1
+        WHERE f.note_id = %s
+    """, (note_id,))
+
+
+def not_modified_response(etag):
+    """Return a 304 response if the request's If-None-Match matches etag, else None."""
+    if etag in request.if_none_match:
+        return with_etag(app.response_class(status=304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @app.route('/api/decks/<int:deck_id>', methods=['DELETE'])
 @login_required
 def api_delete_deck(deck_id):
@@ -380,6 +584,7 @@ def api_delete_deck(deck_id):
         if not deck:
             return jsonify(success=False, errors={'deck': 'Deck not found or you do not have permission to delete it.'}), 404
 
+        delete_deck_stats(cur, deck_id)
         cur.execute("DELETE FROM decks WHERE id = %s", (deck_id,))
         mysql.connection.commit()
 
@@ -397,17 +602,13 @@ def api_delete_deck(deck_id):
             cur.close()
 
 
-@app.route('/api/stats/dashboard', methods=['GET'])
-@login_required
-def api_get_dashboard_stats():
-    user_id = session.get('user_id')
-    if not user_id:
-        return jsonify(success=False, errors={'general': 'Authentication required'}), 401
-    
-    cur = None
-    try:
-        cur = mysql.connection.cursor()
-        
+def fetch_dashboard_stats(cur, user_id, decks=None):
+    # When the caller already has the user's decks with per-deck counts (the
+    # dashboard bootstrap), the deck total and mastered count come from them.
+    if decks is not None:
+        total_decks = len(decks)
+        cards_mastered = sum(deck.get('mastered_cards_in_deck') or 0 for deck in decks)
+    else:
         cur.execute("SELECT COUNT(*) as total_decks FROM decks WHERE user_id = %s", (user_id,))
         total_decks_data = cur.fetchone()
         total_decks = total_decks_data['total_decks'] if total_decks_data else 0
@@ -421,21 +622,39 @@ def api_get_dashboard_stats():
         cards_mastered_data = cur.fetchone()
         cards_mastered = cards_mastered_data['cards_mastered'] if cards_mastered_data else 0
 
-        cur.execute("SELECT points, review_streak_days FROM user_stats WHERE user_id = %s", (user_id,))
-        user_stats_data = cur.fetchone()
-        
-        current_points = 0
-        review_streak_days = 0
-        if user_stats_data:
-            current_points = user_stats_data.get('points', 0) 
-            review_streak_days = user_stats_data.get('review_streak_days', 0)
+    cur.execute("""
+        SELECT points, last_reviewed_date, review_streak_days, longest_streak_days, activity_bitmap
+        FROM user_stats WHERE user_id = %s
+    """, (user_id,))
+    user_stats_data = cur.fetchone()
+    
+    current_points = 0
+    if user_stats_data:
+        current_points = user_stats_data.get('points', 0) 
+    streaks = streak_summary(user_stats_data, local_review_day(get_user_settings(cur, user_id)['timezone']))
+    
+    return {
+        'total_decks': total_decks,
+        'cards_mastered': cards_mastered,
+        'points': current_points,
+        'review_streak_days': streaks['review_streak_days'],
+        'longest_streak_days': streaks['longest_streak_days'],
+        'recent_activity': streaks['recent_activity']
+    }
+
+
+@app.route('/api/stats/dashboard', methods=['GET'])
+@login_required
+def api_get_dashboard_stats():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify(success=False, errors={'general': 'Authentication required'}), 401
+    
+    cur = None
+    try:
+        cur = mysql.connection.cursor()
         
-        dashboard_stats = {
-            'total_decks': total_decks,
-            'cards_mastered': cards_mastered,
-            'points': current_points,
-            'review_streak_days': review_streak_days 
-        }
+        dashboard_stats = fetch_dashboard_stats(cur, user_id)
 
         return jsonify(success=True, stats=dashboard_stats)
 
@@ -459,33 +678,26 @@ def api_get_performance_stats():
         today = date.today()
         thirty_days_ago = today - timedelta(days=30)
 
-        cur.execute("""
-            SELECT 
-                DATE(review_time) as review_date,
-                COUNT(*) as total_reviews,
-                AVG(rating) as average_rating
-            FROM review_logs
-            WHERE user_id = %s AND review_time >= %s
-            GROUP BY DATE(review_time)
-            ORDER BY review_date ASC
-        """, (user_id, thirty_days_ago))
-        daily_stats_raw = cur.fetchall()
+        daily_stats_dict = fetch_daily_review_stats(cur, user_id, thirty_days_ago, today)
 
         dates = []
         review_counts = []
         average_ratings = []
-        daily_stats_dict = {str(day['review_date']): day for day in daily_stats_raw if day and 'review_date' in day}
+        total_reviews = 0
+        total_rating_sum = 0
+        seconds_studied = 0
 
         for i in range(31):
             day = thirty_days_ago + timedelta(days=i)
-            day_str = day.strftime('%Y-%m-%d')
-            dates.append(day_str)
-
-            stats_for_day = daily_stats_dict.get(day_str)
-            if stats_for_day:
-                review_counts.append(stats_for_day.get('total_reviews', 0))
-                avg_rating = stats_for_day.get('average_rating')
-                average_ratings.append(round(float(avg_rating), 2) if avg_rating is not None else None)
+            dates.append(day.strftime('%Y-%m-%d'))
+
+            stats_for_day = daily_stats_dict.get(day)
+            if stats_for_day and stats_for_day['review_count']:
+                review_counts.append(stats_for_day['review_count'])
+                average_ratings.append(round(stats_for_day['rating_sum'] / stats_for_day['review_count'], 2))
+                total_reviews += stats_for_day['review_count']
+                total_rating_sum += stats_for_day['rating_sum']
+                seconds_studied += stats_for_day['seconds_studied']
             else:
                 review_counts.append(0)
                 average_ratings.append(None)
@@ -511,7 +723,12 @@ def api_get_performance_stats():
                     'yAxisID': 'y-rating',
                     'tension': 0.1
                 }
-            ]
+            ],
+            'totals': {
+                'total_reviews': total_reviews,
+                'average_rating': round(total_rating_sum / total_reviews, 2) if total_reviews else None,
+                'seconds_studied': seconds_studied
+            }
         }
         return jsonify(success=True, performance_data=performance_data)
 
@@ -531,20 +748,7 @@ def api_get_recent_activity():
     cur = None
     try:
         cur = mysql.connection.cursor()
-        cur.execute("""
-            SELECT 
-                rl.review_time,
-                rl.rating,
-                f.id as flashcard_id,
-                d.name as deck_name,
-                rl.id as review_id
-            FROM review_logs rl
-            JOIN flashcards f ON rl.flashcard_id = f.id
-            JOIN decks d ON f.deck_id = d.id
-            WHERE rl.user_id = %s
-            ORDER BY rl.review_time DESC
-            LIMIT 10
-        """, (user_id,))
+        cur.execute(RECENT_ACTIVITY_QUERY, (user_id,))
         recent_activity_raw = cur.fetchall()
 
         activity_list = []
@@ -558,13 +762,11 @@ def api_get_recent_activity():
             deck_name = activity_item.get('deck_name', 'Unknown Deck')
             
             description = f"Rated '{rating_descriptions.get(rating, 'N/A')}' on a card in '{deck_name}'"
-            review_time = activity_item.get('review_time')
-            
             activity_list.append({
                 'id': activity_item.get('review_id'),
                 'type': "Reviewed",
                 'description': description,
-                'time': review_time.isoformat() if review_time else None,
+                'time': activity_item.get('review_time'),
                 'icon': 'fas fa-check' 
             })
 
@@ -645,34 +847,44 @@ def api_create_custom_deck():
         )
         new_deck_id = cur.lastrowid
 
-        flashcards_created_count = 0
-        for note_id in note_ids:
-            cur.execute("SELECT id FROM notes WHERE id = %s AND user_id = %s", (note_id, user_id))
-            note = cur.fetchone()
-            if not note:
-                continue
-
+        note_ids = list(dict.fromkeys(note_ids))
+        valid_note_ids = set()
+        for note_ids_chunk in chunked(note_ids, BULK_INSERT_CHUNK_SIZE):
+            placeholders = ','.join(['%s'] * len(note_ids_chunk))
             cur.execute(
-                """
-                INSERT INTO flashcards (note_id, deck_id, card_type, due_date, ease_factor, reps, intervals, last_reviewed)
-                VALUES (%s, %s, 'new', CURDATE(), 2.5, 0, 0, NULL) 
-                """,
-                (note_id, new_deck_id)
+                f"SELECT id FROM notes WHERE id IN ({placeholders}) AND user_id = %s",
+                (*note_ids_chunk, user_id)
             )
-            if cur.rowcount > 0:
-                flashcards_created_count += 1
+            valid_note_ids.update(row['id'] for row in cur.fetchall())
+
+        accepted_note_ids = [note_id for note_id in note_ids if note_id in valid_note_ids]
+        rejected_note_ids = [note_id for note_id in note_ids if note_id not in valid_note_ids]
+
+        bulk_insert(
+            cur,
+            "INSERT INTO flashcards (note_id, deck_id, card_type, due_date, ease_factor, reps, intervals, last_reviewed) VALUES",
+            "(%s, %s, 'new', CURDATE(), 2.5, 0, 0, NULL)",
+            [(note_id, new_deck_id) for note_id in accepted_note_ids]
+        )
+        flashcards_created_count = len(accepted_note_ids)
+
+        deck_stats_delta = DeckStatsDelta()
+        deck_stats_delta.touch(new_deck_id)
+        deck_stats_delta.add_card(new_deck_id, 'new', 2.5, None, count=flashcards_created_count)
+        deck_stats_delta.apply(cur)
         
         if flashcards_created_count == 0:
             mysql.connection.rollback()
-            return jsonify(success=False, errors={'note_ids': 'No valid cards could be added to the new deck.'}), 400
+            return jsonify(success=False, errors={'note_ids': 'No valid cards could be added to the new deck.'}, rejected_note_ids=rejected_note_ids), 400
 
         mysql.connection.commit()
 
         cur.execute("""
             SELECT d.id, d.name, d.description, d.created_at, 
-                   (SELECT COUNT(*) FROM flashcards f WHERE f.deck_id = d.id) as card_count,
+                   COALESCE(ds.card_count, 0) as card_count,
                    GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as tags
             FROM decks d
+            LEFT JOIN deck_stats ds ON ds.deck_id = d.id
             LEFT JOIN deck_tags dt ON d.id = dt.deck_id
             LEFT JOIN tags t ON dt.tag_id = t.id
             WHERE d.id = %s
@@ -684,7 +896,13 @@ def api_create_custom_deck():
             new_deck_data = dict(new_deck_data)
             new_deck_data['mastered_percentage'] = 0 
 
-        return jsonify(success=True, message=f'Deck "{deck_name}" created with {flashcards_created_count} cards.', deck=new_deck_data), 201
+        return jsonify(
+            success=True,
+            message=f'Deck "{deck_name}" created with {flashcards_created_count} cards.',
+            deck=new_deck_data,
+            cards_created=flashcards_created_count,
+            rejected_note_ids=rejected_note_ids
+        ), 201
 
     except Exception as e:
         mysql.connection.rollback()
@@ -698,9 +916,30 @@ def api_get_deck_cards(deck_id):
     user_id = session['user_id']
     cur = mysql.connection.cursor()
     try:
+        cur.execute("SELECT version FROM decks WHERE id = %s AND user_id = %s", (deck_id, user_id))
+        deck_version = cur.fetchone()
+        if not deck_version:
+            return jsonify(success=False, errors={'general': 'Deck not found or access denied'}), 404
+
+        limit = request_page_limit(config.CARD_PAGE_SIZE, config.CARD_PAGE_SIZE_MAX)
+        cursor = request.args.get('cursor')
+        cursor_values = None
+        if cursor:
+            try:
+                cursor_values = decode_card_cursor(cursor)
+            except (ValueError, TypeError):
+                return jsonify(success=False, errors={'cursor': 'Invalid cursor'}), 400
+
+        etag = f"deck-{deck_id}-cards-v{deck_version['version']}"
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+
         cur.execute("""
-            SELECT d.id, d.name, d.description, GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as tags
+            SELECT d.id, d.name, d.description, COALESCE(ds.card_count, 0) as card_count,
+                   GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as tags
             FROM decks d
+            LEFT JOIN deck_stats ds ON ds.deck_id = d.id
             LEFT JOIN deck_tags dt ON d.id = dt.deck_id
             LEFT JOIN tags t ON dt.tag_id = t.id
             WHERE d.id = %s AND d.user_id = %s
@@ -711,25 +950,14 @@ def api_get_deck_cards(deck_id):
         if not deck_info:
             return jsonify(success=False, errors={'general': 'Deck not found or access denied'}), 404
 
-        cur.execute("""
-            SELECT 
-                n.id as note_id, 
-                f.id as flashcard_id, 
-                n.field_values,
-                f.card_type, 
-                f.due_date,
-                f.ease_factor,
-                f.intervals,
-                f.reps,
-                f.lapses,
-                f.last_reviewed
-            FROM flashcards f
-            JOIN notes n ON f.note_id = n.id
-            WHERE f.deck_id = %s AND n.user_id = %s 
-            ORDER BY n.created_at ASC 
-        """, (deck_id, user_id))
-        
+        cur.execute(*deck_cards_query(deck_id, user_id, limit, cursor_values))
+
         cards_raw = cur.fetchall()
+
+        next_cursor = None
+        if len(cards_raw) > limit:
+            cards_raw = cards_raw[:limit]
+            next_cursor = encode_cursor(cards_raw[-1]['created_at'].isoformat(), cards_raw[-1]['flashcard_id'])
         
         cards_list = []
         for card_raw in cards_raw:
@@ -737,7 +965,7 @@ def api_get_deck_cards(deck_id):
                 continue
                 
             card_data = dict(card_raw)
-            field_values = parse_field_values_utility(card_data.get('field_values'))
+            field_values = note_fields(card_data)
             
             cards_list.append({
                 'note_id': card_data['note_id'],
@@ -748,7 +976,8 @@ def api_get_deck_cards(deck_id):
                 'due_date': card_data.get('due_date'),
             })
 
-        return jsonify(success=True, deck=deck_info, cards=cards_list)
+        pagination = {'limit': limit, 'total_entries': deck_info['card_count'], 'next_cursor': next_cursor}
+        return with_etag(jsonify(success=True, deck=deck_info, cards=cards_list, pagination=pagination), etag)
 
     except Exception as e:
         return jsonify(success=False, errors={'general': f'An error occurred: {str(e)}'}), 500
@@ -773,7 +1002,7 @@ def api_update_note(note_id):
 
     cur = mysql.connection.cursor()
     try:
-        cur.execute("SELECT id FROM notes WHERE id = %s AND user_id = %s", (note_id, user_id))
+        cur.execute("SELECT id, content_version FROM notes WHERE id = %s AND user_id = %s", (note_id, user_id))
         note = cur.fetchone()
         if not note:
             return jsonify(success=False, errors={'note': 'Note not found or access denied'}), 404
@@ -781,10 +1010,12 @@ def api_update_note(note_id):
         field_values_json = json.dumps({'Front': front_text, 'Back': back_text})
 
         cur.execute(
-            "UPDATE notes SET field_values = %s WHERE id = %s",
+            "UPDATE notes SET field_values = %s, content_version = content_version + 1 WHERE id = %s",
             (field_values_json, note_id)
         )
+        bump_note_deck_versions(cur, note_id)
         mysql.connection.commit()
+        note_fields_cache.invalidate((note_id, note['content_version']))
         
         updated_card_data = {
             'note_id': note_id,
@@ -810,6 +1041,16 @@ def api_delete_note(note_id):
         if not note:
             return jsonify(success=False, errors={'note': 'Note not found or access denied'}), 404
 
+        cur.execute(
+            "SELECT deck_id, card_type, ease_factor, due_date FROM flashcards WHERE note_id = %s",
+            (note_id,)
+        )
+        deck_stats_delta = DeckStatsDelta()
+        for flashcard in cur.fetchall():
+            deck_stats_delta.remove_card(flashcard['deck_id'], flashcard['card_type'], flashcard['ease_factor'], flashcard['due_date'])
+        deck_stats_delta.apply(cur)
+        bump_note_deck_versions(cur, note_id)
+
         cur.execute("DELETE FROM notes WHERE id = %s", (note_id,))
         mysql.connection.commit()
 
@@ -870,13 +1111,16 @@ def api_add_card_to_deck(deck_id):
             (note_id, deck_id)
         )
         flashcard_id = cur.lastrowid
+
+        deck_stats_delta = DeckStatsDelta()
+        deck_stats_delta.add_card(deck_id, 'new', 2.5, None)
+        deck_stats_delta.apply(cur)
+        bump_deck_versions(cur, [deck_id])
         mysql.connection.commit()
 
         cur.execute("SELECT due_date FROM flashcards WHERE id = %s", (flashcard_id,))
         flashcard_info = cur.fetchone()
-        due_date_str = (flashcard_info['due_date'].strftime('%Y-%m-%d') 
-                        if flashcard_info and flashcard_info.get('due_date') 
-                        else datetime.today().strftime('%Y-%m-%d'))
+        due_date = flashcard_info['due_date'] if flashcard_info and flashcard_info.get('due_date') else date.today()
 
         new_card_data = {
             'note_id': note_id,
@@ -884,7 +1128,7 @@ def api_add_card_to_deck(deck_id):
             'front': front_text,
             'back': back_text,
             'card_type': 'new',
-            'due_date': due_date_str
+            'due_date': due_date
         }
         return jsonify(success=True, message='Card added successfully', card=new_card_data), 201
 
@@ -918,20 +1162,7 @@ def api_get_profile():
         if not user_data:
              return jsonify(success=False, errors={'general': 'User not found'}), 404
 
-        cur.execute("""
-            SELECT new_cards_per_day, max_reviews_per_day, learning_steps, ease_bonus
-            FROM settings
-            WHERE user_id = %s
-        """, (user_id,))
-        settings_data = cur.fetchone()
-
-        if not settings_data:
-             settings_data = {
-                 'new_cards_per_day': 20,
-                 'max_reviews_per_day': 100,
-                 'learning_steps': '1,10',
-                 'ease_bonus': 1.3
-             }
+        settings_data = get_user_settings(cur, user_id)
 
         cur.execute("SELECT points FROM user_stats WHERE user_id = %s", (user_id,))
         user_stats = cur.fetchone()
@@ -939,11 +1170,9 @@ def api_get_profile():
 
         profile_data = dict(user_data)
         profile_data['settings'] = settings_data
+        profile_data['timezone'] = settings_data['timezone']
         profile_data['points'] = current_points
 
-        if profile_data.get('date_of_birth') and isinstance(profile_data['date_of_birth'], date):
-            profile_data['date_of_birth'] = profile_data['date_of_birth'].strftime('%Y-%m-%d')
-
         return jsonify(success=True, profile=profile_data)
 
     except Exception as e:
@@ -965,7 +1194,7 @@ def api_update_profile():
 
     username = data.get('username')
     email = data.get('email')
-    timezone = data.get('timezone') # Note: timezone is received but not used for DB update in current code
+    timezone = data.get('timezone')
     settings_data_payload = data.get('settings', {})
     
     new_cards_per_day = settings_data_payload.get('new_cards_per_day')
@@ -998,6 +1227,11 @@ def api_update_profile():
             update_fields.append("email = %s")
             update_values.append(email)
 
+        if timezone is not None:
+            timezone = str(timezone).strip()
+            if not timezone or len(timezone) > 64:
+                return jsonify(success=False, errors={'timezone': 'Invalid timezone'}), 400
+
         if update_fields:
             update_query = "UPDATE users SET " + ", ".join(update_fields) + " WHERE id = %s"
             update_values.append(user_id)
@@ -1009,7 +1243,7 @@ def api_update_profile():
                 session['email'] = email
 
         cur.execute("""
-            SELECT new_cards_per_day, max_reviews_per_day, learning_steps, ease_bonus
+            SELECT new_cards_per_day, max_reviews_per_day, learning_steps, ease_bonus, timezone
             FROM settings WHERE user_id = %s
         """, (user_id,))
         existing_settings = cur.fetchone()
@@ -1022,7 +1256,9 @@ def api_update_profile():
             'learning_steps': learning_steps if learning_steps is not None else 
                              (existing_settings['learning_steps'] if existing_settings else '1,10'),
             'ease_bonus': ease_bonus if ease_bonus is not None else 
-                         (existing_settings['ease_bonus'] if existing_settings else 1.3)
+                         (existing_settings['ease_bonus'] if existing_settings else 1.3),
+            'timezone': timezone if timezone is not None else 
+                        ((existing_settings['timezone'] if existing_settings else None) or DEFAULT_TIMEZONE)
         }
         
         try:
@@ -1040,21 +1276,23 @@ def api_update_profile():
             return jsonify(success=False, errors={'settings': 'Invalid setting values'}), 400
 
         settings_update_query = """
-            INSERT INTO settings (user_id, new_cards_per_day, max_reviews_per_day, learning_steps, ease_bonus)
-            VALUES (%s, %s, %s, %s, %s)
+            INSERT INTO settings (user_id, new_cards_per_day, max_reviews_per_day, learning_steps, ease_bonus, timezone)
+            VALUES (%s, %s, %s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE
                 new_cards_per_day = VALUES(new_cards_per_day),
                 max_reviews_per_day = VALUES(max_reviews_per_day),
                 learning_steps = VALUES(learning_steps),
-                ease_bonus = VALUES(ease_bonus)
+                ease_bonus = VALUES(ease_bonus),
+                timezone = VALUES(timezone)
         """
         cur.execute(
             settings_update_query,
             (user_id, settings_to_save['new_cards_per_day'], settings_to_save['max_reviews_per_day'], 
-             settings_to_save['learning_steps'], settings_to_save['ease_bonus'])
+             settings_to_save['learning_steps'], settings_to_save['ease_bonus'], settings_to_save['timezone'])
         )
 
         mysql.connection.commit()
+        user_settings_cache.invalidate(user_id)
 
         cur.execute("""
             SELECT id, username, email, date_of_birth, gender, country, city, created_at
@@ -1063,17 +1301,10 @@ def api_update_profile():
         """, (user_id,))
         updated_user_data = cur.fetchone()
 
-        cur.execute("""
-            SELECT new_cards_per_day, max_reviews_per_day, learning_steps, ease_bonus
-            FROM settings
-            WHERE user_id = %s
-        """, (user_id,))
-        updated_settings_data = cur.fetchone()
+        updated_settings_data = get_user_settings(cur, user_id)
 
         updated_profile_data = dict(updated_user_data)
         updated_profile_data['settings'] = updated_settings_data
-        if updated_profile_data.get('date_of_birth') and isinstance(updated_profile_data['date_of_birth'], date):
-            updated_profile_data['date_of_birth'] = updated_profile_data['date_of_birth'].strftime('%Y-%m-%d')
 
         return jsonify(success=True, message='Profile updated successfully', profile=updated_profile_data)
 
@@ -1201,6 +1432,47 @@ def test_db():
     except Exception as e:
         return f"❌ Database connection failed: {str(e)}"
 
+@app.route('/api/admin/rebuild-deck-stats', methods=['POST'])
+@login_required
+def admin_rebuild_deck_stats():
+    try:
+        decks_rebuilt = rebuild_all_deck_stats(mysql.connection)
+        return jsonify(success=True, message=f'Deck statistics rebuilt for {decks_rebuilt} decks.', decks_rebuilt=decks_rebuilt)
+    except Exception as e:
+        if mysql.connection and hasattr(mysql.connection, 'rollback'):
+            mysql.connection.rollback()
+        traceback.print_exc()
+        return jsonify(success=False, errors={'general': f'An error occurred while rebuilding deck statistics: {str(e)}'}), 500
+
+
+@app.route('/api/admin/db-pool', methods=['GET'])
+@login_required
+def admin_db_pool_stats():
+    return jsonify(success=True, pool=mysql.stats())
+
+
+@app.route('/api/admin/review-log-writer', methods=['GET'])
+@login_required
+def admin_review_log_writer_stats():
+    return jsonify(success=True, writer=review_log_writer.stats())
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    # Scrapers authenticate with METRICS_TOKEN as a bearer token; logged-in
+    # users can look at it from the browser.
+    authorization = request.headers.get('Authorization', '')
+    token_valid = bool(config.METRICS_TOKEN) and hmac.compare_digest(authorization, f'Bearer {config.METRICS_TOKEN}')
+    if not token_valid and 'user_id' not in session:
+        return app.response_class('Authentication required\n', status=401, mimetype='text/plain',
+                                  headers={'WWW-Authenticate': 'Bearer'})
+
+    body = request_metrics.render(
+        *render_gauges('db_pool', mysql.stats(), 'Connection pool statistics of this worker.'),
+        *render_gauges('review_log_writer', review_log_writer.stats(), 'Review log write-behind buffer statistics of this worker.')
+    )
+    return app.response_class(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/show')
 def show_env():
     return {
@@ -1209,6 +1481,41 @@ def show_env():
         "DB_NAME": os.getenv("DB_NAME"),
         "DB_HOST": os.getenv("DB_HOST"),
     }
+
+
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_insert(cur, insert_sql, row_template, rows, return_ids=False):
+    """Insert rows with one multi-row VALUES statement per chunk.
+
+    insert_sql is the statement up to and including VALUES, row_template the
+    placeholder group for a single row. With return_ids, the auto-increment
+    ids of the rows are returned in order: InnoDB hands out a consecutive
+    block to each multi-row insert, starting at lastrowid.
+    """
+    inserted_ids = []
+    id_step = 1
+    if return_ids and rows:
+        cur.execute("SELECT @@SESSION.auto_increment_increment AS id_step")
+        id_step = cur.fetchone()['id_step']
+
+    for chunk in chunked(rows, BULK_INSERT_CHUNK_SIZE):
+        cur.execute(
+            f"{insert_sql} {', '.join([row_template] * len(chunk))}",
+            tuple(value for row in chunk for value in row)
+        )
+        if return_ids:
+            first_id = cur.lastrowid
+            inserted_ids.extend(range(first_id, first_id + id_step * len(chunk), id_step))
+    return inserted_ids
+
+
 @app.route('/api/decks', methods=['POST'])
 @login_required
 def api_create_deck():
@@ -1242,32 +1549,25 @@ def api_create_deck():
 
 
         if tags_str:
-            tag_names = [tag.strip() for tag in tags_str if isinstance(tag, str) and tag.strip()]
-            for tag_name in tag_names:
-                cur.execute("SELECT id FROM tags WHERE name = %s", (tag_name,))
-                tag_result = cur.fetchone()
-                tag_id = None
-
-                if tag_result:
-                    tag_id = tag_result['id']
-                else:
-                    try:
-                        cur.execute("INSERT INTO tags (name) VALUES (%s)", (tag_name,))
-                        tag_id = cur.lastrowid
-                        if not tag_id:
-                             continue
-                    except Exception as e_insert:
-                         continue
-
-                if tag_id:
-                    try:
-                         cur.execute(
-                            "INSERT INTO deck_tags (deck_id, tag_id) VALUES (%s, %s)",
-                            (deck_id, tag_id)
-                         )
-                    except Exception as e_deck_tag:
-                         pass
-                    tag_ids_for_notes.append(tag_id)
+            tag_names = list(dict.fromkeys(tag.strip() for tag in tags_str if isinstance(tag, str) and tag.strip()))
+            if tag_names:
+                tag_placeholders = ','.join(['%s'] * len(tag_names))
+                cur.execute(f"SELECT id, name FROM tags WHERE name IN ({tag_placeholders})", tuple(tag_names))
+                tag_ids_by_name = {row['name']: row['id'] for row in cur.fetchall()}
+
+                missing_tag_names = [tag_name for tag_name in tag_names if tag_name not in tag_ids_by_name]
+                if missing_tag_names:
+                    bulk_insert(cur, "INSERT IGNORE INTO tags (name) VALUES", "(%s)", [(tag_name,) for tag_name in missing_tag_names])
+                    missing_placeholders = ','.join(['%s'] * len(missing_tag_names))
+                    cur.execute(f"SELECT id, name FROM tags WHERE name IN ({missing_placeholders})", tuple(missing_tag_names))
+                    tag_ids_by_name.update({row['name']: row['id'] for row in cur.fetchall()})
+
+                tag_ids_for_notes = list(dict.fromkeys(tag_ids_by_name.values()))
+                if tag_ids_for_notes:
+                    bulk_insert(
+                        cur, "INSERT IGNORE INTO deck_tags (deck_id, tag_id) VALUES", "(%s, %s)",
+                        [(deck_id, tag_id) for tag_id in tag_ids_for_notes]
+                    )
 
         default_note_type_id = 1 
         cur.execute("SELECT id FROM note_types WHERE id = %s", (default_note_type_id,))
@@ -1277,7 +1577,7 @@ def api_create_deck():
                 (default_note_type_id, 'Basic', '["Front", "Back"]', '{"Default Card": {"front_template": "{{Front}}", "back_template": "{{Back}}"}}')
             )
 
-        flashcards_created_count = 0
+        note_rows = []
         for card_item in cards_data:
             front_text = card_item.get('front')
             back_text = card_item.get('back')
@@ -1286,49 +1586,43 @@ def api_create_deck():
                 continue 
 
             field_values_json = json.dumps({'Front': front_text, 'Back': back_text})
+            note_rows.append((user_id, default_note_type_id, field_values_json))
 
-            cur.execute(
-                "INSERT INTO notes (user_id, note_type_id, field_values) VALUES (%s, %s, %s)",
-                (user_id, default_note_type_id, field_values_json)
-            )
-            note_id = cur.lastrowid
-            if not note_id:
-                 mysql.connection.rollback()
-                 return jsonify(success=False, errors={'general': 'Failed to create note for a card.'}), 500
-
-            if tag_ids_for_notes:
-                 note_tag_values = [(note_id, tag_id) for tag_id in tag_ids_for_notes]
-                 if note_tag_values:
-                     placeholders = ', '.join(['(%s, %s)'] * len(note_tag_values))
-                     flat_values = [item for sublist in note_tag_values for item in sublist]
-                     try:
-                         cur.execute(
-                            f"INSERT INTO note_tags (note_id, tag_id) VALUES {placeholders}",
-                            tuple(flat_values)
-                         )
-                     except Exception as e_note_tag:
-                         pass
+        note_ids = bulk_insert(
+            cur, "INSERT INTO notes (user_id, note_type_id, field_values) VALUES", "(%s, %s, %s)",
+            note_rows, return_ids=True
+        )
+        if len(note_ids) != len(note_rows) or (note_ids and not note_ids[0]):
+            mysql.connection.rollback()
+            return jsonify(success=False, errors={'general': 'Failed to create note for a card.'}), 500
 
-            cur.execute(
-                """
-                INSERT INTO flashcards (note_id, deck_id, card_type, due_date, ease_factor, reps, intervals)
-                VALUES (%s, %s, 'new', CURDATE(), 2.5, 0, 0) 
-                """,
-                (note_id, deck_id)
+        if tag_ids_for_notes and note_ids:
+            bulk_insert(
+                cur, "INSERT IGNORE INTO note_tags (note_id, tag_id) VALUES", "(%s, %s)",
+                [(note_id, tag_id) for note_id in note_ids for tag_id in tag_ids_for_notes]
             )
-            flashcard_id = cur.lastrowid
-            if not flashcard_id:
-                 mysql.connection.rollback()
-                 return jsonify(success=False, errors={'general': 'Failed to create flashcard entry.'}), 500
-            flashcards_created_count += 1
+
+        bulk_insert(
+            cur,
+            "INSERT INTO flashcards (note_id, deck_id, card_type, due_date, ease_factor, reps, intervals) VALUES",
+            "(%s, %s, 'new', CURDATE(), 2.5, 0, 0)",
+            [(note_id, deck_id) for note_id in note_ids]
+        )
+        flashcards_created_count = len(note_ids)
+
+        deck_stats_delta = DeckStatsDelta()
+        deck_stats_delta.touch(deck_id)
+        deck_stats_delta.add_card(deck_id, 'new', 2.5, None, count=flashcards_created_count)
+        deck_stats_delta.apply(cur)
 
         mysql.connection.commit()
 
         cur.execute("""
             SELECT d.id, d.name, d.description, d.created_at, 
-                   (SELECT COUNT(*) FROM flashcards f WHERE f.deck_id = d.id) as card_count,
+                   COALESCE(ds.card_count, 0) as card_count,
                    GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as tags_on_deck
             FROM decks d
+            LEFT JOIN deck_stats ds ON ds.deck_id = d.id
             LEFT JOIN deck_tags dt ON d.id = dt.deck_id
             LEFT JOIN tags t ON dt.tag_id = t.id
             WHERE d.id = %s AND d.user_id = %s
@@ -1355,56 +1649,168 @@ def api_create_deck():
             cur.close()
 
 
+def fetch_decks_with_progress(cur, user_id):
+    # A deck without a deck_stats row (migration 0012 backfilled the old
+    # ones) reads as empty rather than being rebuilt from a GET.
+    cur.execute(DECK_LIST_QUERY, (user_id,))
+    decks_raw = cur.fetchall()
+
+    due_today_counts = fetch_due_today_counts(cur, [deck_row['id'] for deck_row in decks_raw], date.today())
+    
+    decks_with_progress = []
+    for deck_row in decks_raw:
+        deck_data = dict(deck_row)
+        deck_data['due_today_count'] = due_today_counts.get(deck_data['id'], 0)
+        
+        card_count = deck_data.get('card_count') or 0
+        mastered_count = deck_data.get('mastered_cards_in_deck') or 0
+
+        if card_count > 0:
+            deck_data['mastered_percentage'] = round((mastered_count / card_count) * 100, 0)
+        else:
+            deck_data['mastered_percentage'] = 0
+        
+        decks_with_progress.append(deck_data)
+    return decks_with_progress
+
+
+@app.route('/api/dashboard/bootstrap', methods=['GET'])
+@login_required
+def api_get_dashboard_bootstrap():
+    user_id = session['user_id']
+    cur = None
+    try:
+        cur = mysql.connection.cursor()
+        # The /api/decks watermark, plus the user_stats counters every review
+        # moves and the user's local day, which the streaks roll over on. Tags
+        # only change with deck writes, which the deck watermark already sees.
+        cur.execute("""
+            SELECT
+                COUNT(*) AS deck_count,
+                COALESCE(SUM(version), 0) AS version_sum,
+                COALESCE(MAX(id), 0) AS max_deck_id,
+                (SELECT points FROM user_stats WHERE user_id = %s) AS points,
+                (SELECT total_reviews FROM user_stats WHERE user_id = %s) AS total_reviews
+            FROM decks WHERE user_id = %s
+        """, (user_id, user_id, user_id))
+        watermark = cur.fetchone()
+        review_day = local_review_day(get_user_settings(cur, user_id)['timezone'])
+        etag = (f"dashboard-{user_id}-{watermark['deck_count']}-{int(watermark['version_sum'])}"
+                f"-{watermark['max_deck_id']}-{watermark['points'] or 0}-{watermark['total_reviews'] or 0}"
+                f"-{date.today().isoformat()}-{review_day.isoformat()}")
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+
+        decks = fetch_decks_with_progress(cur, user_id)
+        stats = fetch_dashboard_stats(cur, user_id, decks=decks)
+        tags = fetch_user_tags(cur, user_id)
+
+        return with_etag(jsonify(success=True, decks=decks, stats=stats, tags=tags), etag)
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify(success=False, errors={'general': f'An error occurred loading the dashboard: {str(e)}'}), 500
+    finally:
+        if cur:
+            cur.close()
+
+
 @app.route('/api/decks', methods=['GET'])
 @login_required
 def api_get_decks():
     user_id = session['user_id']
     cur = mysql.connection.cursor()
     try:
+        # Any deck write bumps its version, creating or deleting one changes the
+        # count and max id, and due-today counts move with the date.
         cur.execute("""
-            SELECT 
-                d.id, 
-                d.name, 
-                d.description, 
-                d.created_at,
-                (SELECT COUNT(*) FROM flashcards f WHERE f.deck_id = d.id) as card_count,
-                (SELECT COUNT(*) 
-                    FROM flashcards sf 
-                    WHERE sf.deck_id = d.id AND sf.card_type = 'review' AND sf.ease_factor >= 2.8
-                ) as mastered_cards_in_deck,
-                GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as tags
-            FROM decks d
-            LEFT JOIN deck_tags dt ON d.id = dt.deck_id
-            LEFT JOIN tags t ON dt.tag_id = t.id
-            WHERE d.user_id = %s
-            GROUP BY d.id, d.name, d.description, d.created_at
-            ORDER BY d.created_at DESC
+            SELECT COUNT(*) AS deck_count, COALESCE(SUM(version), 0) AS version_sum, COALESCE(MAX(id), 0) AS max_deck_id
+            FROM decks WHERE user_id = %s
         """, (user_id,))
-        
-        decks_raw = cur.fetchall()
-        
-        decks_with_progress = []
-        for deck_row in decks_raw:
-            deck_data = dict(deck_row)
-            
-            card_count = deck_data.get('card_count', 0)
-            mastered_count = deck_data.get('mastered_cards_in_deck', 0)
+        watermark = cur.fetchone()
+        etag = (f"decks-{user_id}-{watermark['deck_count']}-{int(watermark['version_sum'])}"
+                f"-{watermark['max_deck_id']}-{date.today().isoformat()}")
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
 
-            if card_count > 0:
-                deck_data['mastered_percentage'] = round((mastered_count / card_count) * 100, 0)
-            else:
-                deck_data['mastered_percentage'] = 0
-            
-            decks_with_progress.append(deck_data)
+        decks_with_progress = fetch_decks_with_progress(cur, user_id)
 
-        return jsonify(success=True, decks=decks_with_progress)
+        return with_etag(jsonify(success=True, decks=decks_with_progress), etag)
 
     except Exception as e:
         traceback.print_exc()
         return jsonify(success=False, errors={'general': f'An error occurred: {str(e)}'}), 500
     finally:
         cur.close()
-        
+
+
+def format_study_card(card_row):
+    field_values = note_fields(card_row)
+    return {
+        'flashcard_id': card_row['flashcard_id'],
+        'note_id': card_row['note_id'],
+        'front': field_values.get('Front', ''),
+        'back': field_values.get('Back', ''),
+        'card_type': card_row.get('card_type'),
+        'due_date': card_row.get('due_date'),
+        'ease_factor': card_row.get('ease_factor'),
+        'intervals': card_row.get('intervals'),
+        'reps': card_row.get('reps'),
+        'lapses': card_row.get('lapses'),
+    }
+
+
+def study_page_query(card_count):
+    return f"""
+        SELECT
+            f.id as flashcard_id,
+            n.id as note_id,
+            n.content_version,
+            n.front_text,
+            n.back_text,
+            IF(n.front_text IS NULL, n.field_values, NULL) as field_values,
+            f.card_type,
+            f.due_date,
+            f.ease_factor,
+            f.intervals,
+            f.reps,
+            f.lapses
+        FROM flashcards f
+        JOIN notes n ON f.note_id = n.id
+        WHERE f.id IN ({','.join(['%s'] * card_count)}) AND n.user_id = %s
+    """
+
+
+def decode_study_page_cursor(cursor):
+    """Return the (session_id, offset) of a study page cursor; raises ValueError."""
+    session_id, offset = decode_cursor(cursor, 2)
+    if not isinstance(session_id, int) or not isinstance(offset, int) or offset < 0:
+        raise ValueError('Malformed cursor')
+    return session_id, offset
+
+
+def study_page_response(deck_id, study_session, offset, page_ids, cards):
+    next_offset = offset + len(page_ids)
+    return {
+        'success': True,
+        'deck_id': deck_id,
+        'session_id': study_session['id'],
+        'cards': cards,
+        'position': offset,
+        'total_cards': len(study_session['card_ids']),
+        'has_more': next_offset < len(study_session['card_ids']),
+        'next_cursor': encode_cursor(study_session['id'], next_offset)
+    }
+
+
+def order_study_page(page_ids, rows):
+    cards_by_id = {row['flashcard_id']: row for row in rows}
+    # Cards deleted since the queue was built are skipped.
+    return [format_study_card(cards_by_id[flashcard_id]) for flashcard_id in page_ids if flashcard_id in cards_by_id]
+
+
 @app.route('/api/study/session/<int:deck_id>', methods=['GET'])
 @login_required
 def api_get_study_cards(deck_id):
@@ -1417,15 +1823,9 @@ def api_get_study_cards(deck_id):
         if not deck:
             return jsonify(success=False, errors={'deck': 'Deck not found or access denied'}), 404
 
-        cur.execute("""
-            SELECT new_cards_per_day, max_reviews_per_day
-            FROM settings
-            WHERE user_id = %s
-        """, (user_id,))
-        user_settings = cur.fetchone()
-
-        new_cards_limit = user_settings['new_cards_per_day'] if user_settings and user_settings['new_cards_per_day'] is not None else 20
-        review_cards_limit = user_settings['max_reviews_per_day'] if user_settings and user_settings['max_reviews_per_day'] is not None else 100
+        user_settings = get_user_settings(cur, user_id)
+        new_cards_limit = user_settings['new_cards_per_day']
+        review_cards_limit = user_settings['max_reviews_per_day']
 
         today = date.today()
 
@@ -1433,7 +1833,10 @@ def api_get_study_cards(deck_id):
             SELECT
                 f.id as flashcard_id,
                 n.id as note_id,
-                n.field_values,
+                n.content_version,
+                n.front_text,
+                n.back_text,
+                IF(n.front_text IS NULL, n.field_values, NULL) as field_values,
                 f.card_type,
                 f.due_date,
                 f.ease_factor,
@@ -1454,7 +1857,10 @@ def api_get_study_cards(deck_id):
             SELECT
                 f.id as flashcard_id,
                 n.id as note_id,
-                n.field_values,
+                n.content_version,
+                n.front_text,
+                n.back_text,
+                IF(n.front_text IS NULL, n.field_values, NULL) as field_values,
                 f.card_type,
                 f.due_date,
                 f.ease_factor,
@@ -1472,22 +1878,7 @@ def api_get_study_cards(deck_id):
 
         all_cards_raw = list(new_cards) + list(review_cards)
 
-        cards_for_study = []
-        for card_raw in all_cards_raw:
-            card_data = dict(card_raw)
-            field_values = parse_field_values_utility(card_data.get('field_values'))
-            cards_for_study.append({
-                'flashcard_id': card_data['flashcard_id'],
-                'note_id': card_data['note_id'],
-                'front': field_values.get('Front', ''),
-                'back': field_values.get('Back', ''),
-                'card_type': card_data.get('card_type'),
-                'due_date': card_data.get('due_date').strftime('%Y-%m-%d') if card_data.get('due_date') else None,
-                'ease_factor': card_data.get('ease_factor'),
-                'intervals': card_data.get('intervals'),
-                'reps': card_data.get('reps'),
-                'lapses': card_data.get('lapses'),
-            })
+        cards_for_study = [format_study_card(card_raw) for card_raw in all_cards_raw]
 
         import random
         random.shuffle(cards_for_study)
@@ -1500,150 +1891,462 @@ def api_get_study_cards(deck_id):
     finally:
         cur.close()
 
-@app.route('/api/study/review/<int:flashcard_id>', methods=['POST'])
+
+@app.route('/api/study/session/<int:deck_id>/next', methods=['GET'])
 @login_required
-def api_submit_review(flashcard_id):
+def api_get_study_session_page(deck_id):
+    """Stream a study session a page at a time.
+
+    Without a cursor the session queue (flashcard ids only) is built and the
+    first page returned; next_cursor fetches the following page. Relapsed
+    cards are put back into the queue by api_submit_review.
+    """
     user_id = session['user_id']
-    data = request.get_json()
+    limit = min(max(request.args.get('limit', STUDY_PAGE_SIZE, type=int), 1), MAX_STUDY_PAGE_SIZE)
+    cursor = request.args.get('cursor')
 
-    if not data:
-        return jsonify(success=False, errors={'general': 'Invalid request format, JSON expected'}), 400
+    cur = None
+    try:
+        cur = mysql.connection.cursor()
+
+        if cursor:
+            try:
+                session_id, offset = decode_study_page_cursor(cursor)
+            except ValueError:
+                return jsonify(success=False, errors={'cursor': 'Invalid cursor'}), 400
+
+            study_session = load_study_session(cur, session_id, user_id)
+            if not study_session or study_session['deck_id'] != deck_id:
+                return jsonify(success=False, errors={'session': 'Study session not found or expired'}), 404
+        else:
+            cur.execute("SELECT id FROM decks WHERE id = %s AND user_id = %s", (deck_id, user_id))
+            if not cur.fetchone():
+                return jsonify(success=False, errors={'deck': 'Deck not found or access denied'}), 404
+
+            user_settings = get_user_settings(cur, user_id)
+            card_ids = build_study_queue(
+                cur, deck_id, user_id,
+                user_settings['new_cards_per_day'], user_settings['max_reviews_per_day'], date.today()
+            )
+            session_id = create_study_session(cur, user_id, deck_id, card_ids)
+            study_session = {'id': session_id, 'deck_id': deck_id, 'card_ids': card_ids, 'handed_out': 0}
+            offset = 0
+
+        page_ids = study_session['card_ids'][offset:offset + limit]
+        cards = []
+        if page_ids:
+            cur.execute(study_page_query(len(page_ids)), (*page_ids, user_id))
+            cards = order_study_page(page_ids, cur.fetchall())
+
+        mark_handed_out(cur, session_id, offset + len(page_ids))
+        mysql.connection.commit()
+
+        return jsonify(study_page_response(deck_id, study_session, offset, page_ids, cards))
+
+    except Exception as e:
+        mysql.connection.rollback()
+        traceback.print_exc()
+        return jsonify(success=False, errors={'general': f'An error occurred: {str(e)}'}), 500
+    finally:
+        if cur:
+            cur.close()
+
+RATING_MAP = {'hard': 1, 'good': 2, 'easy': 3}
+POINTS_BY_RATING = {1: 50, 2: 200, 3: 500}
+MAX_REVIEW_BATCH_SIZE = 500
+# Longer answers are counted as this many seconds; the tab was likely left open.
+MAX_REVIEW_DURATION_SECONDS = 600
+
+
+def parse_review_duration(value):
+    """Return the seconds spent on a review, or None when not reported.
+
+    Raises ValueError for values that are not a non-negative number.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError('duration_seconds must be a non-negative number')
+    return min(int(round(value)), MAX_REVIEW_DURATION_SECONDS)
+
+
+REVIEW_LOG_INSERT = """
+    INSERT INTO review_logs (flashcard_id, user_id, rating, review_time, intervals_before, intervals_after, ease_factor_before, ease_factor_after, duration_seconds)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+REVIEW_FLASHCARD_QUERY = """
+    SELECT f.*, n.user_id
+    FROM flashcards f
+    JOIN notes n ON f.note_id = n.id
+    WHERE f.id = %s
+"""
+FLASHCARD_SCHEDULE_UPDATE = """
+    UPDATE flashcards
+    SET
+        card_type = %s, due_date = %s, intervals = %s, ease_factor = %s,
+        reps = %s, lapses = %s, last_reviewed = %s
+    WHERE id = %s
+"""
+FLASHCARD_SCHEDULE_COLUMNS = ('card_type', 'due_date', 'intervals', 'ease_factor', 'reps', 'lapses', 'last_reviewed')
+
+
+def flashcard_schedule_bulk_update(cards):
+    """FLASHCARD_SCHEDULE_UPDATE for many cards as one statement. A plain
+    UPDATE, so a card deleted in the meantime is skipped, never re-inserted."""
+    when_clauses = ' '.join(['WHEN %s THEN %s'] * len(cards))
+    assignments = ', '.join(f"{column} = CASE id {when_clauses} END" for column in FLASHCARD_SCHEDULE_COLUMNS)
+    args = [value for column in FLASHCARD_SCHEDULE_COLUMNS for card in cards for value in (card['id'], card[column])]
+    args.extend(card['id'] for card in cards)
+    return (
+        f"UPDATE flashcards SET {assignments} WHERE id IN ({','.join(['%s'] * len(cards))})",
+        tuple(args)
+    )
+
+
+def insert_review_logs(cur, rows):
+    cur.executemany(REVIEW_LOG_INSERT, rows)
+
+
+def queue_review_logs(cur, rows):
+    """Hand the rows of committed reviews to the write-behind buffer.
+
+    When the buffer stays full past its enqueue timeout the remaining rows
+    are written and committed here, so a backlog slows reviews down instead
+    of losing their logs. The reviews are already committed, so a failure
+    here is logged rather than raised: the request must still succeed or
+    the client would submit the reviews again.
+    """
+    try:
+        rejected = review_log_writer.submit(rows)
+        if rejected:
+            insert_review_logs(cur, rejected)
+            mysql.connection.commit()
+    except Exception:
+        traceback.print_exc()
+        try:
+            mysql.connection.rollback()
+        except Exception:
+            pass
+
+
+class ReviewRequestError(ValueError):
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
 
-    rating_text = data.get('rating')
-    rating_text_lower = rating_text.lower() if rating_text else None
-    
-    rating_map = {'hard': 1, 'good': 2, 'easy': 3}
-    rating = rating_map.get(rating_text_lower)
 
+def parse_review_request(data):
+    """Return (rating, duration_seconds, study_session_id) of a review payload.
+
+    Raises ReviewRequestError naming the offending field.
+    """
+    if not data or not isinstance(data, dict):
+        raise ReviewRequestError('general', 'Invalid request format, JSON expected')
+
+    rating_text = data.get('rating')
+    rating = RATING_MAP.get(rating_text.lower()) if isinstance(rating_text, str) else None
     if rating is None:
-        return jsonify(success=False, errors={'rating': 'Invalid rating provided. Expected "hard", "good", or "easy".'}), 400
+        raise ReviewRequestError('rating', 'Invalid rating provided. Expected "hard", "good", or "easy".')
 
-    points_awarded = 0
-    if rating == 3: 
-        points_awarded = 500
-    elif rating == 2:
-        points_awarded = 200
-    elif rating == 1:
-        points_awarded = 50
+    try:
+        duration_seconds = parse_review_duration(data.get('duration_seconds'))
+    except ValueError as e:
+        raise ReviewRequestError('duration_seconds', str(e))
+
+    study_session_id = data.get('study_session_id')
+    if study_session_id is not None and (not isinstance(study_session_id, int) or isinstance(study_session_id, bool)):
+        raise ReviewRequestError('study_session_id', 'Invalid study session id')
+
+    return rating, duration_seconds, study_session_id
+
+
+class ReviewPlan:
+    """Everything a single review writes, computed from the card row
+    (REVIEW_FLASHCARD_QUERY) before the review.
+
+    api_submit_review and its async counterpart in asgi.py only differ in
+    how they run statements().
+    """
+
+    def __init__(self, flashcard, rating, user_settings, duration_seconds, reviewed_at, today):
+        self.flashcard = flashcard
+        self.rating = rating
+        self.points = POINTS_BY_RATING[rating]
+        self.reviewed_at = reviewed_at
+        self.duration_seconds = duration_seconds
+        self.review_day = local_review_day(user_settings['timezone'], reviewed_at)
+        self.new_state = schedule_review(
+            flashcard['card_type'], flashcard['intervals'], flashcard['ease_factor'],
+            flashcard['reps'], flashcard['lapses'], rating, user_settings['ease_bonus'], today
+        )
+
+        self.deck_stats_delta = DeckStatsDelta()
+        self.deck_stats_delta.remove_card(flashcard['deck_id'], flashcard['card_type'], flashcard['ease_factor'], flashcard['due_date'])
+        self.deck_stats_delta.add_card(flashcard['deck_id'], self.new_state['card_type'], self.new_state['ease_factor'], self.new_state['due_date'])
+
+        self.review_log_rows = [
+            (flashcard['id'], flashcard['user_id'], rating, reviewed_at, flashcard['intervals'], self.new_state['intervals'],
+             flashcard['ease_factor'], self.new_state['ease_factor'], duration_seconds)
+        ]
+
+    def statements(self, with_review_logs=True):
+        """(statement, parameters) pairs to run in the review's transaction."""
+        flashcard, new_state = self.flashcard, self.new_state
+        statements = [(
+            FLASHCARD_SCHEDULE_UPDATE,
+            (new_state['card_type'], new_state['due_date'], new_state['intervals'], new_state['ease_factor'],
+             new_state['reps'], new_state['lapses'], self.reviewed_at, flashcard['id'])
+        )]
+        if with_review_logs:
+            statements.extend((REVIEW_LOG_INSERT, row) for row in self.review_log_rows)
+        statements.append(daily_reviews_statement(flashcard['user_id'], [(self.reviewed_at, self.rating, self.duration_seconds)]))
+        statements.append((USER_STATS_REVIEW_UPSERT, (flashcard['user_id'], self.points, 1, self.review_day)))
+        statements.extend(self.deck_stats_delta.statements())
+        statements.append(bump_deck_versions_statement([flashcard['deck_id']]))
+        return statements
+
+    def requeues(self, study_session_id):
+        return study_session_id is not None and self.rating == RATING_MAP['hard']
+
+    def response(self, requeued):
+        new_state = self.new_state
+        return {
+            'success': True,
+            'message': f'Review recorded. You earned {self.points} points!',
+            'flashcard_id': self.flashcard['id'],
+            'points_earned': self.points,
+            'requeued': requeued,
+            'new_state': {
+                'card_type': new_state['card_type'],
+                'due_date': new_state['due_date'],
+                'intervals': new_state['intervals'],
+                'ease_factor': round(new_state['ease_factor'], 2),
+                'reps': new_state['reps'],
+                'lapses': new_state['lapses']
+            }
+        }
+
+
+@app.route('/api/study/review/<int:flashcard_id>', methods=['POST'])
+@login_required
+def api_submit_review(flashcard_id):
+    user_id = session['user_id']
+    try:
+        rating, duration_seconds, study_session_id = parse_review_request(request.get_json())
+    except ReviewRequestError as e:
+        return jsonify(success=False, errors={e.field: str(e)}), 400
 
     cur = None
     try:
         cur = mysql.connection.cursor()
-        today = date.today()
 
-        cur.execute("""
-            SELECT f.*, n.user_id
-            FROM flashcards f
-            JOIN notes n ON f.note_id = n.id
-            WHERE f.id = %s
-        """, (flashcard_id,))
+        cur.execute(REVIEW_FLASHCARD_QUERY, (flashcard_id,))
         flashcard = cur.fetchone()
 
         if not flashcard or flashcard['user_id'] != user_id:
             return jsonify(success=False, errors={'flashcard': 'Flashcard not found or access denied'}), 404
 
-        cur.execute("""
-            SELECT learning_steps, ease_bonus
-            FROM settings
-            WHERE user_id = %s
-        """, (user_id,))
-        user_settings = cur.fetchone()
-        
-        default_ease_bonus = 1.3
-        ease_bonus = user_settings['ease_bonus'] if user_settings and user_settings.get('ease_bonus') is not None else default_ease_bonus
-
-        current_interval = flashcard['intervals']
-        current_ease_factor = flashcard['ease_factor']
-        current_reps = flashcard['reps']
-        current_lapses = flashcard['lapses']
-        current_card_type = flashcard['card_type']
-        last_reviewed_dt = datetime.now()
-
-        new_reps = current_reps + 1
-        new_lapses = current_lapses
-        new_card_type = current_card_type 
-        new_ease_factor = current_ease_factor
-        new_interval = current_interval
-
-        if rating == 3:
-            if current_card_type == 'new':
-                new_interval = 4 
-            elif current_card_type == 'learning':
-                new_interval = 1 
-            else:
-                new_interval = round(current_interval * current_ease_factor * ease_bonus)
-            new_ease_factor = current_ease_factor + 0.15
-            new_card_type = 'review'
-
-        elif rating == 2:
-            if current_card_type == 'new':
-                new_interval = 1 
-                new_card_type = 'learning' 
-            elif current_card_type == 'learning':
-                 new_interval = max(1, round(current_interval * 1.2)) 
-                 new_card_type = 'learning' 
-            else: 
-                new_interval = round(current_interval * current_ease_factor)
-            if current_card_type == 'review': new_card_type = 'review'
-
-
-        elif rating == 1:
-            new_lapses += 1
-            new_ease_factor = max(1.3, current_ease_factor - 0.20)
-            new_interval = 1 
-            new_card_type = 'learning' 
-
-        new_ease_factor = max(1.3, min(5.0, new_ease_factor)) 
-        final_interval_days = max(1, int(round(new_interval)))
-        next_due_date = today + timedelta(days=final_interval_days)
-
-        cur.execute(
-            """
-            UPDATE flashcards
-            SET
-                card_type = %s, due_date = %s, intervals = %s, ease_factor = %s,
-                reps = %s, lapses = %s, last_reviewed = %s
-            WHERE id = %s
-            """,
-            (new_card_type, next_due_date, final_interval_days, new_ease_factor,
-             new_reps, new_lapses, last_reviewed_dt, flashcard_id)
+        review_plan = ReviewPlan(
+            flashcard, rating, get_user_settings(cur, user_id), duration_seconds, datetime.now(), date.today()
         )
+        for statement, parameters in review_plan.statements(with_review_logs=not review_log_writer.enabled):
+            cur.execute(statement, parameters)
 
-        cur.execute(
-            """
-            INSERT INTO review_logs (flashcard_id, user_id, rating, review_time, intervals_before, intervals_after, ease_factor_before, ease_factor_after)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (flashcard_id, user_id, rating, last_reviewed_dt, current_interval, final_interval_days, current_ease_factor, new_ease_factor)
-        )
+        requeued = False
+        if review_plan.requeues(study_session_id):
+            requeued = requeue_card(cur, study_session_id, user_id, flashcard_id)
 
-        cur.execute(
-            """
-            INSERT INTO user_stats (user_id, points, total_reviews, last_reviewed_date)
-            VALUES (%s, %s, 1, %s)
-            ON DUPLICATE KEY UPDATE
-                points = points + VALUES(points),
-                total_reviews = total_reviews + 1,
-                last_reviewed_date = VALUES(last_reviewed_date)
-            """,
-            (user_id, points_awarded, today) 
-        )
+        mysql.connection.commit()
+        if review_log_writer.enabled:
+            queue_review_logs(cur, review_plan.review_log_rows)
 
+        return jsonify(review_plan.response(requeued))
+
+    except Exception as e:
+        if mysql.connection and hasattr(mysql.connection, 'rollback'):
+            mysql.connection.rollback()
+        traceback.print_exc()
+        return jsonify(success=False, errors={'general': f'An error occurred: {str(e)}'}), 500
+    finally:
+        if cur: 
+            cur.close()
+            
+@app.route('/api/study/review/batch', methods=['POST'])
+@login_required
+def api_submit_review_batch():
+    user_id = session['user_id']
+    data = request.get_json()
+
+    if not data:
+        return jsonify(success=False, errors={'general': 'Invalid request format, JSON expected'}), 400
+
+    reviews_payload = data.get('reviews')
+    if not reviews_payload or not isinstance(reviews_payload, list):
+        return jsonify(success=False, errors={'reviews': 'A non-empty list of reviews is required'}), 400
+
+    if len(reviews_payload) > MAX_REVIEW_BATCH_SIZE:
+        return jsonify(success=False, errors={'reviews': f'At most {MAX_REVIEW_BATCH_SIZE} reviews can be submitted at once'}), 400
+
+    now = datetime.now()
+    earliest_answered_at = now - timedelta(seconds=config.REVIEW_BATCH_MAX_AGE)
+    reviews = []
+    for index, review_item in enumerate(reviews_payload, start=1):
+        if not isinstance(review_item, dict):
+            return jsonify(success=False, errors={'reviews': f'Review #{index} must be an object'}), 400
+
+        flashcard_id = review_item.get('flashcard_id')
+        if not isinstance(flashcard_id, int) or isinstance(flashcard_id, bool) or flashcard_id <= 0:
+            return jsonify(success=False, errors={'reviews': f'Review #{index} has an invalid flashcard_id'}), 400
+
+        rating_text = review_item.get('rating')
+        rating = RATING_MAP.get(rating_text.lower()) if isinstance(rating_text, str) else None
+        if rating is None:
+            return jsonify(success=False, errors={'reviews': f'Review #{index} has an invalid rating. Expected "hard", "good", or "easy".'}), 400
+
+        answered_at = now
+        answered_at_str = review_item.get('answered_at')
+        if answered_at_str:
+            try:
+                answered_at = datetime.fromisoformat(str(answered_at_str))
+            except ValueError:
+                return jsonify(success=False, errors={'reviews': f'Review #{index} has an invalid answered_at timestamp'}), 400
+            if answered_at.tzinfo is not None:
+                answered_at = answered_at.astimezone().replace(tzinfo=None)
+            # Backdated answers would fill streak gaps and past daily stats.
+            if answered_at < earliest_answered_at:
+                return jsonify(success=False, errors={'reviews': f'Review #{index} was answered too long ago to be recorded'}), 400
+            answered_at = min(answered_at, now)
+
+        try:
+            duration_seconds = parse_review_duration(review_item.get('duration_seconds'))
+        except ValueError:
+            return jsonify(success=False, errors={'reviews': f'Review #{index} has an invalid duration_seconds'}), 400
+
+        reviews.append((flashcard_id, rating, answered_at, duration_seconds))
+
+    flashcard_ids = list(dict.fromkeys(flashcard_id for flashcard_id, _, _, _ in reviews))
+
+    cur = None
+    try:
+        cur = mysql.connection.cursor()
+
+        placeholders = ','.join(['%s'] * len(flashcard_ids))
+        cur.execute(f"""
+            SELECT f.id, f.note_id, f.deck_id, f.card_type, f.due_date, f.intervals, f.ease_factor, f.reps, f.lapses
+            FROM flashcards f
+            JOIN notes n ON f.note_id = n.id
+            WHERE f.id IN ({placeholders}) AND n.user_id = %s
+            FOR UPDATE
+        """, (*flashcard_ids, user_id))
+        cards_by_id = {row['id']: dict(row) for row in cur.fetchall()}
+
+        missing_ids = [flashcard_id for flashcard_id in flashcard_ids if flashcard_id not in cards_by_id]
+        if missing_ids:
+            return jsonify(success=False, errors={'flashcard': 'Flashcard not found or access denied', 'flashcard_ids': missing_ids}), 404
+
+        user_settings = get_user_settings(cur, user_id)
+        ease_bonus = user_settings['ease_bonus']
+        # Due dates count from the day the batch arrives, as in api_submit_review.
+        today = date.today()
+
+        deck_stats_delta = DeckStatsDelta()
+        for card in cards_by_id.values():
+            deck_stats_delta.remove_card(card['deck_id'], card['card_type'], card['ease_factor'], card['due_date'])
+
+        # Reviews are applied in submission order. Each pass schedules the next
+        # pending answer of every card in one vectorized call, so repeated
+        # answers to the same card (relapses) build on the previous state.
+        positions_by_card = {}
+        for position, (flashcard_id, _, _, _) in enumerate(reviews):
+            positions_by_card.setdefault(flashcard_id, []).append(position)
+
+        review_log_rows = [None] * len(reviews)
+        review_round = 0
+        while True:
+            positions = [card_positions[review_round] for card_positions in positions_by_card.values()
+                         if len(card_positions) > review_round]
+            if not positions:
+                break
+
+            cards = [cards_by_id[reviews[position][0]] for position in positions]
+            result = schedule_reviews(
+                [card['card_type'] for card in cards],
+                [card['intervals'] for card in cards],
+                [card['ease_factor'] for card in cards],
+                [card['reps'] for card in cards],
+                [card['lapses'] for card in cards],
+                [reviews[position][1] for position in positions],
+                ease_bonus
+            )
+
+            for i, (position, card) in enumerate(zip(positions, cards)):
+                flashcard_id, rating, answered_at, duration_seconds = reviews[position]
+                new_interval = int(result['intervals'][i])
+                new_ease_factor = float(result['ease_factor'][i])
+                review_log_rows[position] = (
+                    flashcard_id, user_id, rating, answered_at,
+                    card['intervals'], new_interval, card['ease_factor'], new_ease_factor, duration_seconds
+                )
+                card.update({
+                    'card_type': str(result['card_type'][i]),
+                    'due_date': today + timedelta(days=new_interval),
+                    'intervals': new_interval,
+                    'ease_factor': new_ease_factor,
+                    'reps': int(result['reps'][i]),
+                    'lapses': int(result['lapses'][i]),
+                    'last_reviewed': answered_at
+                })
+            review_round += 1
+
+        points_awarded = sum(POINTS_BY_RATING[rating] for _, rating, _, _ in reviews)
+
+        for card in cards_by_id.values():
+            deck_stats_delta.add_card(card['deck_id'], card['card_type'], card['ease_factor'], card['due_date'])
+
+        cur.execute(*flashcard_schedule_bulk_update([cards_by_id[flashcard_id] for flashcard_id in flashcard_ids]))
+
+        if not review_log_writer.enabled:
+            insert_review_logs(cur, review_log_rows)
+        record_daily_reviews(cur, user_id, [(answered_at, rating, duration_seconds) for _, rating, answered_at, duration_seconds in reviews])
+
+        # One user_stats upsert per local review day, oldest first, so the
+        # streak advances day by day like it would for single reviews.
+        totals_by_day = {}
+        for _, rating, answered_at, _ in reviews:
+            review_day = local_review_day(user_settings['timezone'], answered_at)
+            day_points, day_reviews = totals_by_day.get(review_day, (0, 0))
+            totals_by_day[review_day] = (day_points + POINTS_BY_RATING[rating], day_reviews + 1)
+        for review_day in sorted(totals_by_day):
+            day_points, day_reviews = totals_by_day[review_day]
+            cur.execute(USER_STATS_REVIEW_UPSERT, (user_id, day_points, day_reviews, review_day))
+
+        deck_stats_delta.apply(cur)
+        bump_deck_versions(cur, [card['deck_id'] for card in cards_by_id.values()])
         mysql.connection.commit()
+        if review_log_writer.enabled:
+            queue_review_logs(cur, review_log_rows)
+
+        cards_new_state = []
+        for flashcard_id in flashcard_ids:
+            card = cards_by_id[flashcard_id]
+            cards_new_state.append({
+                'flashcard_id': flashcard_id,
+                'new_state': {
+                    'card_type': card['card_type'],
+                    'due_date': card['due_date'],
+                    'intervals': card['intervals'],
+                    'ease_factor': round(card['ease_factor'], 2),
+                    'reps': card['reps'],
+                    'lapses': card['lapses']
+                }
+            })
 
         return jsonify(
             success=True,
-            message=f'Review recorded. You earned {points_awarded} points!',
-            flashcard_id=flashcard_id,
+            message=f'{len(reviews)} review(s) recorded. You earned {points_awarded} points!',
+            reviews_recorded=len(reviews),
             points_earned=points_awarded,
-            new_state={
-                'card_type': new_card_type,
-                'due_date': next_due_date.strftime('%Y-%m-%d'),
-                'intervals': final_interval_days,
-                'ease_factor': round(new_ease_factor, 2),
-                'reps': new_reps,
-                'lapses': new_lapses
-            }
+            cards=cards_new_state
         )
 
     except Exception as e:
@@ -1652,24 +2355,35 @@ def api_submit_review(flashcard_id):
         traceback.print_exc()
         return jsonify(success=False, errors={'general': f'An error occurred: {str(e)}'}), 500
     finally:
-        if cur: 
+        if cur:
             cur.close()
-            
+
 @app.route('/api/decks/<int:deck_id>', methods=['GET'])
 @login_required
 def api_get_deck_details(deck_id):
     user_id = session['user_id']
     cur = mysql.connection.cursor()
     try:
+        cur.execute("SELECT version FROM decks WHERE id = %s AND user_id = %s", (deck_id, user_id))
+        deck_version = cur.fetchone()
+        if not deck_version:
+            return jsonify(success=False, errors={'deck': 'Deck not found or access denied'}), 404
+
+        etag = f"deck-{deck_id}-v{deck_version['version']}"
+        not_modified = not_modified_response(etag)
+        if not_modified:
+            return not_modified
+
         cur.execute("""
             SELECT 
                 d.id, 
                 d.name, 
                 d.description, 
                 d.created_at,
-                (SELECT COUNT(*) FROM flashcards f WHERE f.deck_id = d.id) as card_count,
+                COALESCE(ds.card_count, 0) as card_count,
                 GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as tags
             FROM decks d
+            LEFT JOIN deck_stats ds ON ds.deck_id = d.id
             LEFT JOIN deck_tags dt ON d.id = dt.deck_id
             LEFT JOIN tags t ON dt.tag_id = t.id
             WHERE d.id = %s AND d.user_id = %s
@@ -1679,7 +2393,7 @@ def api_get_deck_details(deck_id):
         deck = cur.fetchone()
         
         if deck:
-            return jsonify(success=True, deck=deck)
+            return with_etag(jsonify(success=True, deck=deck), etag)
         else:
             return jsonify(success=False, errors={'deck': 'Deck not found or access denied'}), 404
 
@@ -1690,4 +2404,5 @@ def api_get_deck_details(deck_id):
         cur.close()
 
 if __name__ == '__main__':
+    mysql.warmup()
     app.run(debug=True)
\ No newline at end of file
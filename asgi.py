@@ -0,0 +1,326 @@
+# asgi.py
+#
+# ASGI entry point: async versions of the study and leaderboard endpoints
+# under /api/async/, with every other path handed to the Flask app.
+#
+#     uvicorn asgi:application --workers 4
+#
+# Needs starlette, aiomysql, a2wsgi and uvicorn on top of the Flask stack.
+
+import contextlib
+import json
+import random
+import time
+import traceback
+from datetime import date, datetime
+from functools import wraps
+
+import aiomysql
+from a2wsgi import WSGIMiddleware
+from itsdangerous import BadSignature
+from pymysql.constants import FIELD_TYPE
+from pymysql.converters import conversions
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+import config
+from app import (
+    app as flask_app, leaderboard_refresher, review_log_writer, user_settings_cache,
+    USER_SETTINGS_QUERY, REVIEW_FLASHCARD_QUERY, REVIEW_LOG_INSERT,
+    ReviewPlan, ReviewRequestError, parse_review_request,
+    cache_user_settings, decode_leaderboard_cursor, leaderboard_response,
+    decode_study_page_cursor, study_page_query, order_study_page, study_page_response
+)
+from leaderboard import LEADERBOARD_SNAPSHOT_SIZE, LEADERBOARD_COUNT_QUERY, LEADERBOARD_PAGE_QUERY, LEADERBOARD_USER_RANK_QUERY
+from metrics import REQUEST_LATENCY
+from study_sessions import (
+    STUDY_PAGE_SIZE, MAX_STUDY_PAGE_SIZE, STUDY_SESSION_MAX_AGE_HOURS,
+    NEW_CARDS_QUERY, DUE_CARDS_QUERY, DELETE_EXPIRED_SESSIONS, INSERT_SESSION,
+    LOAD_SESSION_QUERY, MARK_HANDED_OUT, UPDATE_SESSION_CARDS,
+    decode_study_session, insert_relapsed_card
+)
+
+
+def _conversions():
+    # Same as MYSQL_DECIMAL_AS_FLOAT on the Flask pool: the scheduler and
+    # the JSON responses expect floats, not Decimal.
+    conv = dict(conversions)
+    conv[FIELD_TYPE.DECIMAL] = float
+    conv[FIELD_TYPE.NEWDECIMAL] = float
+    return conv
+
+
+async def create_pool():
+    return await aiomysql.create_pool(
+        host=config.DB_HOST,
+        port=config.DB_PORT,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        db=config.DB_NAME,
+        charset='utf8',
+        minsize=config.ASYNC_DB_POOL_MIN_SIZE,
+        maxsize=config.ASYNC_DB_POOL_SIZE,
+        pool_recycle=config.DB_POOL_MAX_LIFETIME,
+        autocommit=False,
+        cursorclass=aiomysql.DictCursor,
+        conv=_conversions()
+    )
+
+
+@contextlib.asynccontextmanager
+async def database(request):
+    """Yield (connection, cursor) from the async pool.
+
+    Whatever the route left uncommitted is rolled back before the
+    connection goes back; aiomysql would otherwise close it.
+    """
+    async with request.app.state.pool.acquire() as connection:
+        try:
+            async with connection.cursor() as cur:
+                yield connection, cur
+        finally:
+            if connection.get_transaction_status():
+                await connection.rollback()
+
+
+def json_response(status=200, **fields):
+    return Response(flask_app.json.dumps(fields), status_code=status, media_type='application/json')
+
+
+def error_response(status, **errors):
+    return json_response(status, success=False, errors=errors)
+
+
+def load_flask_session(request):
+    """Decode the Flask session cookie the way SecureCookieSessionInterface does; None if absent or invalid."""
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    if not cookie or serializer is None:
+        return None
+    try:
+        return serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None
+
+
+def api_route(endpoint):
+    """Require a logged-in session and record the request in the Flask app's latency histogram."""
+    def decorator(f):
+        @wraps(f)
+        async def handler(request):
+            started = time.perf_counter()
+            flask_session = load_flask_session(request)
+            if not flask_session or 'user_id' not in flask_session:
+                response = error_response(401, general='Authentication required')
+            else:
+                response = await f(request, flask_session)
+            REQUEST_LATENCY.observe(
+                (endpoint, request.method, str(response.status_code)), time.perf_counter() - started
+            )
+            return response
+        return handler
+    return decorator
+
+
+def query_int(request, name, default):
+    # Like request.args.get(name, default, type=int).
+    try:
+        return int(request.query_params.get(name, default))
+    except ValueError:
+        return default
+
+
+async def get_user_settings(cur, user_id):
+    settings = user_settings_cache.get(user_id)
+    if settings is None:
+        await cur.execute(USER_SETTINGS_QUERY, (user_id,))
+        return cache_user_settings(user_id, await cur.fetchone())
+    return dict(settings)
+
+
+@api_route('async_leaderboard')
+async def api_get_leaderboard(request, flask_session):
+    user_id = flask_session['user_id']
+    limit = min(max(1, query_int(request, 'limit', 50)), LEADERBOARD_SNAPSHOT_SIZE)
+
+    try:
+        after_rank, after_user_id = decode_leaderboard_cursor(request.query_params.get('cursor', '').strip())
+    except (ValueError, TypeError):
+        return error_response(400, cursor='Invalid pagination cursor.')
+
+    try:
+        async with database(request) as (connection, cur):
+            await cur.execute(LEADERBOARD_COUNT_QUERY)
+            total_entries_data = await cur.fetchone()
+
+            await cur.execute(LEADERBOARD_PAGE_QUERY, (after_rank, after_rank, after_user_id, limit + 1))
+            leaderboard_data = await cur.fetchall()
+
+            await cur.execute(LEADERBOARD_USER_RANK_QUERY, (user_id,))
+            current_user_rank = await cur.fetchone()
+
+        return json_response(**leaderboard_response(leaderboard_data, limit, total_entries_data, current_user_rank))
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(500, general=f'An error occurred fetching leaderboard: {str(e)}')
+
+
+async def build_study_queue(cur, deck_id, user_id, new_cards_limit, review_cards_limit, today):
+    await cur.execute(NEW_CARDS_QUERY, (deck_id, user_id, new_cards_limit))
+    card_ids = [row['id'] for row in await cur.fetchall()]
+
+    await cur.execute(DUE_CARDS_QUERY, (deck_id, user_id, today, review_cards_limit))
+    card_ids.extend(row['id'] for row in await cur.fetchall())
+
+    random.shuffle(card_ids)
+    return card_ids
+
+
+async def create_study_session(cur, user_id, deck_id, card_ids):
+    await cur.execute(DELETE_EXPIRED_SESSIONS, (user_id, STUDY_SESSION_MAX_AGE_HOURS))
+    await cur.execute(INSERT_SESSION, (user_id, deck_id, json.dumps(card_ids)))
+    return cur.lastrowid
+
+
+async def load_study_session(cur, session_id, user_id, for_update=False):
+    await cur.execute(LOAD_SESSION_QUERY + (' FOR UPDATE' if for_update else ''), (session_id, user_id))
+    return decode_study_session(await cur.fetchone())
+
+
+async def requeue_card(cur, session_id, user_id, flashcard_id):
+    study_session = await load_study_session(cur, session_id, user_id, for_update=True)
+    if not study_session:
+        return False
+    card_ids = insert_relapsed_card(study_session, flashcard_id)
+    await cur.execute(UPDATE_SESSION_CARDS, (json.dumps(card_ids), session_id))
+    return True
+
+
+@api_route('async_study_session_page')
+async def api_get_study_session_page(request, flask_session):
+    """Async counterpart of app.api_get_study_session_page; sessions and cursors are interchangeable."""
+    user_id = flask_session['user_id']
+    deck_id = request.path_params['deck_id']
+    limit = min(max(query_int(request, 'limit', STUDY_PAGE_SIZE), 1), MAX_STUDY_PAGE_SIZE)
+    cursor = request.query_params.get('cursor')
+
+    if cursor:
+        try:
+            session_id, offset = decode_study_page_cursor(cursor)
+        except ValueError:
+            return error_response(400, cursor='Invalid cursor')
+
+    try:
+        async with database(request) as (connection, cur):
+            if cursor:
+                study_session = await load_study_session(cur, session_id, user_id)
+                if not study_session or study_session['deck_id'] != deck_id:
+                    return error_response(404, session='Study session not found or expired')
+            else:
+                await cur.execute("SELECT id FROM decks WHERE id = %s AND user_id = %s", (deck_id, user_id))
+                if not await cur.fetchone():
+                    return error_response(404, deck='Deck not found or access denied')
+
+                user_settings = await get_user_settings(cur, user_id)
+                card_ids = await build_study_queue(
+                    cur, deck_id, user_id,
+                    user_settings['new_cards_per_day'], user_settings['max_reviews_per_day'], date.today()
+                )
+                session_id = await create_study_session(cur, user_id, deck_id, card_ids)
+                study_session = {'id': session_id, 'deck_id': deck_id, 'card_ids': card_ids, 'handed_out': 0}
+                offset = 0
+
+            page_ids = study_session['card_ids'][offset:offset + limit]
+            cards = []
+            if page_ids:
+                await cur.execute(study_page_query(len(page_ids)), (*page_ids, user_id))
+                cards = order_study_page(page_ids, await cur.fetchall())
+
+            await cur.execute(MARK_HANDED_OUT, (offset + len(page_ids), session_id))
+            await connection.commit()
+
+        return json_response(**study_page_response(deck_id, study_session, offset, page_ids, cards))
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(500, general=f'An error occurred: {str(e)}')
+
+
+async def queue_review_logs(request, rows):
+    """Async counterpart of app.queue_review_logs; errors are logged, never raised."""
+    try:
+        # submit() may block while the buffer is full.
+        rejected = await run_in_threadpool(review_log_writer.submit, rows)
+        if rejected:
+            async with database(request) as (connection, cur):
+                await cur.executemany(REVIEW_LOG_INSERT, rejected)
+                await connection.commit()
+    except Exception:
+        traceback.print_exc()
+
+
+@api_route('async_submit_review')
+async def api_submit_review(request, flask_session):
+    """Async counterpart of app.api_submit_review."""
+    user_id = flask_session['user_id']
+    flashcard_id = request.path_params['flashcard_id']
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    try:
+        rating, duration_seconds, study_session_id = parse_review_request(data)
+    except ReviewRequestError as e:
+        return error_response(400, **{e.field: str(e)})
+
+    try:
+        async with database(request) as (connection, cur):
+            await cur.execute(REVIEW_FLASHCARD_QUERY, (flashcard_id,))
+            flashcard = await cur.fetchone()
+            if not flashcard or flashcard['user_id'] != user_id:
+                return error_response(404, flashcard='Flashcard not found or access denied')
+
+            review_plan = ReviewPlan(
+                flashcard, rating, await get_user_settings(cur, user_id), duration_seconds, datetime.now(), date.today()
+            )
+            for statement, parameters in review_plan.statements(with_review_logs=not review_log_writer.enabled):
+                await cur.execute(statement, parameters)
+
+            requeued = False
+            if review_plan.requeues(study_session_id):
+                requeued = await requeue_card(cur, study_session_id, user_id, flashcard_id)
+
+            await connection.commit()
+
+        if review_log_writer.enabled:
+            await queue_review_logs(request, review_plan.review_log_rows)
+
+        return json_response(**review_plan.response(requeued))
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(500, general=f'An error occurred: {str(e)}')
+
+
+@contextlib.asynccontextmanager
+async def lifespan(starlette_app):
+    starlette_app.state.pool = await create_pool()
+    leaderboard_refresher.start()
+    try:
+        yield
+    finally:
+        starlette_app.state.pool.close()
+        await starlette_app.state.pool.wait_closed()
+
+
+application = Starlette(
+    routes=[
+        Route('/api/async/leaderboard', api_get_leaderboard, methods=['GET']),
+        Route('/api/async/study/session/{deck_id:int}/next', api_get_study_session_page, methods=['GET']),
+        Route('/api/async/study/review/{flashcard_id:int}', api_submit_review, methods=['POST']),
+        # Everything else, including the synchronous versions of the routes
+        # above, is served by the Flask app on a2wsgi's thread pool.
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,203 @@
+# assets.py
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+
+from flask import abort, request, send_from_directory, url_for
+from werkzeug.utils import safe_join
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - .br files are skipped
+    brotli = None
+try:
+    import rcssmin
+except ImportError:  # pragma: no cover - falls back to _minify_css
+    rcssmin = None
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - JS is bundled unminified
+    rjsmin = None
+
+# One CSS and one JS bundle per page, in the order the templates used to
+# load the files. Bundles are written to static/<ASSETS_OUTPUT_DIR>, so CSS
+# sources must not use relative url()s.
+ASSET_BUNDLES = {
+    'auth.css': ['css/global.css', 'css/auth.css'],
+    'auth.js': ['js/auth.js'],
+    'create-deck.css': ['css/global.css', 'css/create-deck.css'],
+    'create-deck.js': ['js/create-deck.js'],
+    'dashboard.css': ['css/global.css', 'css/dashboard.css', 'css/animation.css'],
+    'dashboard.js': ['js/dashboard.js'],
+    'edit-deck.css': ['css/global.css', 'css/create-deck.css', 'css/edit-deck.css'],
+    'edit-deck.js': ['js/edit-deck.js'],
+    'index.css': ['css/global.css', 'css/responsive.css', 'css/animation.css'],
+    'index.js': ['js/main.js', 'js/animations.js'],
+    'leaderboard.css': ['css/global.css', 'css/leaderboard.css'],
+    'leaderboard.js': ['js/leaderboard.js'],
+    'profile.css': ['css/global.css', 'css/profile.css', 'css/animation.css'],
+    'profile.js': ['js/profile.js'],
+    'results.css': ['css/global.css', 'css/results.css', 'css/animation.css'],
+    'results.js': ['js/results.js'],
+    'reviews.css': ['css/global.css', 'css/animation.css', 'css/responsive.css', 'css/reviews.css'],
+    'reviews.js': ['js/main.js'],
+    'study.css': ['css/global.css', 'css/animation.css', 'css/study.css'],
+    'study.js': ['js/study.js'],
+}
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+
+_CSS_STRINGS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_CSS_TOKENS = re.compile(_CSS_STRINGS.pattern + r'|/\*.*?\*/|\s+', re.S)
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+
+def _minify_css(source):
+    # Drops comments and collapses whitespace outside strings; spaces around
+    # ':' and '+' are kept since they matter in selectors and calc().
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        return '' if match.group(0).startswith('/*') else ' '
+
+    collapsed = _CSS_TOKENS.sub(replace, source)
+    pieces = _CSS_STRINGS.split(collapsed)
+    for index in range(0, len(pieces), 2):
+        pieces[index] = _CSS_PUNCTUATION.sub(r'\1', pieces[index]).replace(';}', '}')
+    return ''.join(pieces).strip()
+
+
+def _minify(kind, source):
+    if kind == '.css':
+        return rcssmin.cssmin(source) if rcssmin is not None else _minify_css(source)
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    return source
+
+
+def _write_atomic(path, data):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def build_assets(static_folder, output_dir='dist', bundles=ASSET_BUNDLES):
+    """Write the bundles with content-hashed names and return {bundle: filename}.
+
+    Each bundle is concatenated, minified and stored next to .gz (and .br
+    when brotli is installed) copies. Files already present are left alone,
+    and files of older builds are kept so pages rendered before a deploy can
+    still load theirs.
+    """
+    output_path = os.path.join(static_folder, output_dir)
+    os.makedirs(output_path, exist_ok=True)
+    manifest = {}
+    for bundle, sources in bundles.items():
+        stem, kind = os.path.splitext(bundle)
+        contents = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as source_file:
+                contents.append(source_file.read())
+        # The separator keeps a file without a trailing semicolon from running
+        # into the next one.
+        data = _minify(kind, ('\n;\n' if kind == '.js' else '\n').join(contents)).encode('utf-8')
+        filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{kind}"
+        manifest[bundle] = filename
+
+        path = os.path.join(output_path, filename)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        if not os.path.exists(path + '.gz'):
+            _write_atomic(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None and not os.path.exists(path + '.br'):
+            _write_atomic(path + '.br', brotli.compress(data, quality=11))
+
+    manifest_path = os.path.join(output_path, MANIFEST_NAME)
+    encoded = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+    try:
+        with open(manifest_path, 'rb') as manifest_file:
+            unchanged = manifest_file.read() == encoded
+    except FileNotFoundError:
+        unchanged = False
+    if not unchanged:
+        _write_atomic(manifest_path, encoded)
+    return manifest
+
+
+class StaticAssets:
+    """Bundled, fingerprinted static files served with immutable caching.
+
+    Templates call ``asset_url('study.css')`` where they used
+    ``url_for('static', filename=...)``; extra keyword arguments go to
+    url_for. Bundles are built when the app starts (``python assets.py``
+    builds them ahead of a deploy) and, in debug mode, rebuilt when a
+    source file changes.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        self._source_mtime = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASSETS_OUTPUT_DIR', 'dist')
+        app.config.setdefault('ASSETS_MAX_AGE', 31536000)
+        self.app = app
+        self.static_folder = app.static_folder
+        self.output_dir = app.config['ASSETS_OUTPUT_DIR']
+        self.max_age = int(app.config['ASSETS_MAX_AGE'])
+        self.build()
+        app.add_url_rule('/assets/<path:filename>', 'asset', self.send_asset)
+        app.add_template_global(self.url, 'asset_url')
+
+    def _latest_source_mtime(self):
+        return max(
+            os.path.getmtime(os.path.join(self.static_folder, source))
+            for sources in ASSET_BUNDLES.values() for source in sources
+        )
+
+    def build(self):
+        self._source_mtime = self._latest_source_mtime()
+        self.manifest = build_assets(self.static_folder, self.output_dir)
+
+    def url(self, bundle, **values):
+        if self.app.debug and self._latest_source_mtime() != self._source_mtime:
+            self.build()
+        return url_for('asset', filename=self.manifest[bundle], **values)
+
+    def send_asset(self, filename):
+        directory = os.path.join(self.static_folder, self.output_dir)
+        path = safe_join(directory, filename)
+        if path is None or filename == MANIFEST_NAME or not os.path.isfile(path):
+            abort(404)
+
+        served, encoding = filename, None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[candidate] and os.path.isfile(path + suffix):
+                served, encoding = filename + suffix, candidate
+                break
+
+        response = send_from_directory(directory, served, mimetype=mimetypes.guess_type(filename)[0])
+        if encoding:
+            response.content_encoding = encoding
+        response.vary.add('Accept-Encoding')
+        # Names change with the content, so a URL's bytes never do.
+        response.headers['Cache-Control'] = f'public, max-age={self.max_age}, immutable'
+        return response
+
+
+if __name__ == '__main__':
+    built = build_assets(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    for bundle_name, bundle_file in sorted(built.items()):
+        print(f"{bundle_name} -> {bundle_file}")
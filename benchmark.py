@@ -0,0 +1,238 @@
+# benchmark.py
+
+import argparse
+import json
+import math
+import random
+import subprocess
+import time
+from datetime import datetime
+
+import MySQLdb
+from MySQLdb import cursors
+
+import config
+from populate_leaderboard import WORDS
+
+
+def _leaderboard(client, ctx, rng):
+    return client.get('/api/leaderboard')
+
+
+def _cards_search(client, ctx, rng):
+    return client.get('/api/cards/search', query_string={'query': rng.choice(WORDS)})
+
+
+def _study_session(client, ctx, rng):
+    return client.get(f"/api/study/session/{ctx['deck_id']}")
+
+
+def _study_session_next(client, ctx, rng):
+    return client.get(f"/api/study/session/{ctx['deck_id']}/next")
+
+
+def _study_review(client, ctx, rng):
+    return client.post(
+        f"/api/study/review/{rng.choice(ctx['card_ids'])}",
+        json={'rating': rng.choice(('hard', 'good', 'good', 'easy')), 'duration_seconds': rng.randint(2, 40)}
+    )
+
+
+def _decks(client, ctx, rng):
+    return client.get('/api/decks')
+
+
+# name -> (request, writes data)
+SCENARIOS = {
+    'leaderboard': (_leaderboard, False),
+    'cards_search': (_cards_search, False),
+    'study_session': (_study_session, False),
+    'study_session_next': (_study_session_next, False),
+    'study_review': (_study_review, True),
+    'decks': (_decks, False),
+}
+
+
+class QueryCounter:
+    """Count the statements the server executes, from the global Questions counter.
+
+    Only meaningful on a database nothing else is using; the counter's own
+    SHOW statement is calibrated out.
+    """
+
+    def __init__(self, connection):
+        self.cur = connection.cursor()
+        first = self.read()
+        self.overhead = self.read() - first
+
+    def read(self):
+        self.cur.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+        return int(self.cur.fetchone()['Value'])
+
+
+def percentile(sorted_values, p):
+    # Nearest-rank percentile of an already sorted list.
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def sample_contexts(cur, count, rng):
+    """Pick up to ``count`` users with reviews, each with one of their decks and its card ids."""
+    cur.execute("SELECT MIN(user_id) AS low, MAX(user_id) AS high FROM user_stats")
+    bounds = cur.fetchone()
+    if not bounds or bounds['low'] is None:
+        raise SystemExit('No users with reviews found; run populate_leaderboard.py first.')
+
+    contexts = {}
+    for _ in range(count * 4):
+        if len(contexts) >= count:
+            break
+        cur.execute("""
+            SELECT u.id AS user_id, u.username, d.id AS deck_id
+            FROM users u
+            JOIN decks d ON d.user_id = u.id
+            WHERE u.id >= %s
+            ORDER BY u.id, d.id
+            LIMIT 1
+        """, (rng.randint(bounds['low'], bounds['high']),))
+        row = cur.fetchone()
+        if not row or row['user_id'] in contexts:
+            continue
+        cur.execute("SELECT id FROM flashcards WHERE deck_id = %s ORDER BY id LIMIT 100", (row['deck_id'],))
+        card_ids = [card['id'] for card in cur.fetchall()]
+        if card_ids:
+            contexts[row['user_id']] = dict(row, card_ids=card_ids)
+    return list(contexts.values())
+
+
+def run_scenario(flask_app, name, contexts, iterations, warmup, counter, rng):
+    request_fn = SCENARIOS[name][0]
+    latencies = []
+    queries = []
+    errors = 0
+    for iteration in range(warmup + iterations):
+        ctx = contexts[iteration % len(contexts)]
+        client = flask_app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['user_id'] = ctx['user_id']
+            flask_session['username'] = ctx['username']
+
+        questions_before = counter.read()
+        started = time.perf_counter()
+        response = request_fn(client, ctx, rng)
+        elapsed = time.perf_counter() - started
+        executed = counter.read() - questions_before - counter.overhead
+
+        if iteration < warmup:
+            continue
+        if response.status_code >= 400:
+            errors += 1
+        latencies.append(elapsed * 1000)
+        queries.append(executed)
+
+    latencies.sort()
+    return {
+        'requests': iterations,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+def dataset_sizes(cur):
+    # Estimates from InnoDB statistics; exact counts are too slow at 10^8 rows.
+    cur.execute("""
+        SELECT TABLE_NAME AS table_name, TABLE_ROWS AS table_rows
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME IN ('users', 'decks', 'notes', 'flashcards', 'review_logs', 'tags')
+    """)
+    return {row['table_name']: row['table_rows'] for row in cur.fetchall()}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    print(f"{'scenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'errors':>7}")
+    for name, result in results['scenarios'].items():
+        line = (f"{name:<20} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                f"{result['queries_per_request']:>8.1f} {result['errors']:>7}")
+        previous = (baseline or {}).get('scenarios', {}).get(name)
+        if previous and previous['p95_ms']:
+            line += f"   p95 {(result['p95_ms'] / previous['p95_ms'] - 1) * 100:+.1f}% vs baseline"
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measure the hot API endpoints in-process against the configured (local) MySQL database.'
+    )
+    parser.add_argument('--iterations', type=int, default=200, help='measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--users', type=int, default=20, help='distinct users the requests are spread over')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='repeatable; default all')
+    parser.add_argument('--read-only', action='store_true', help='skip scenarios that write')
+    parser.add_argument('--output', help='results file (default benchmark-<timestamp>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare p95 against')
+    args = parser.parse_args()
+
+    from app import app as flask_app
+
+    db_connection = MySQLdb.connect(
+        host=config.DB_HOST,
+        user=config.DB_USER,
+        passwd=config.DB_PASSWORD,
+        db=config.DB_NAME,
+        port=config.DB_PORT,
+        charset='utf8',
+        cursorclass=cursors.DictCursor,
+        autocommit=True
+    )
+    try:
+        rng = random.Random(args.seed)
+        db_cur = db_connection.cursor()
+        contexts = sample_contexts(db_cur, args.users, rng)
+        names = args.scenario or [name for name, (_, writes) in SCENARIOS.items() if not (writes and args.read_only)]
+        counter = QueryCounter(db_connection)
+
+        started_at = datetime.now()
+        results = {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'users': len(contexts),
+            'dataset': dataset_sizes(db_cur),
+            'scenarios': {},
+        }
+        for name in names:
+            results['scenarios'][name] = run_scenario(
+                flask_app, name, contexts, args.iterations, args.warmup, counter, random.Random(f'{args.seed}:{name}')
+            )
+    finally:
+        db_connection.close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(results, baseline)
+
+    output_path = args.output or f"benchmark-{started_at.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Results written to {output_path}")
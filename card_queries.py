@@ -0,0 +1,145 @@
+# card_queries.py
+#
+# Statements of the card listings: /api/cards/search and
+# /api/decks/<deck_id>/cards.
+
+FULLTEXT_MIN_TOKEN_SIZE = 3
+FULLTEXT_OPERATOR_CHARS = '+-<>()~*"@'
+
+
+def build_fulltext_query(search_term):
+    # Every word must match, as a prefix so results follow the user's typing.
+    # Operator characters are stripped so input cannot alter the query syntax.
+    cleaned = search_term.translate({ord(char): ' ' for char in FULLTEXT_OPERATOR_CHARS})
+    words = [word for word in cleaned.split() if len(word) >= FULLTEXT_MIN_TOKEN_SIZE]
+    return ' '.join(f'+{word}*' for word in words)
+
+
+def card_search_query(user_id, limit, search_term='', fulltext_query=None, tag_ids=(), deck_ids=(), cursor_values=None):
+    """Return (statement, parameters) of a card search page.
+
+    ``fulltext_query`` is build_fulltext_query(search_term); terms too short
+    for it fall back to LIKE. ``cursor_values`` is the decoded cursor of the
+    previous page. Pages hold whole notes: the derived table reads ``limit``
+    notes (one extra tells whether another page exists) in
+    idx_notes_user_created order and the outer query adds their cards, which
+    order_card_search_page puts in order.
+    """
+    select_params = []
+    params = [user_id]
+    conditions = []
+    card_conditions = ""
+    order_by = "n.created_at DESC, n.id DESC"
+    relevance_column = ""
+
+    if fulltext_query:
+        relevance_column = ", MATCH(n.front_text, n.back_text) AGAINST (%s IN BOOLEAN MODE) as relevance"
+        select_params.append(fulltext_query)
+        conditions.append("MATCH(n.front_text, n.back_text) AGAINST (%s IN BOOLEAN MODE)")
+        params.append(fulltext_query)
+        order_by = "relevance DESC, n.created_at DESC, n.id DESC"
+    elif search_term:
+        # Terms shorter than the FULLTEXT token size are not indexed.
+        conditions.append("(n.front_text LIKE %s OR n.back_text LIKE %s)")
+        params.extend([f"%{search_term}%"] * 2)
+
+    if tag_ids:
+        placeholders = ','.join(['%s'] * len(tag_ids))
+        conditions.append(f"n.id IN (SELECT nt_sub.note_id FROM note_tags nt_sub WHERE nt_sub.tag_id IN ({placeholders}))")
+        params.extend(tag_ids)
+
+    deck_params = []
+    if deck_ids:
+        card_conditions = f" AND f_sub.deck_id IN ({','.join(['%s'] * len(deck_ids))})"
+        deck_params = list(deck_ids)
+    # Notes without a matching card would take a place on the page and show nothing.
+    conditions.append(f"EXISTS (SELECT 1 FROM flashcards f_sub WHERE f_sub.note_id = n.id{card_conditions})")
+    params.extend(deck_params)
+
+    if cursor_values:
+        keyset_condition = "(n.created_at < %s OR (n.created_at = %s AND n.id < %s))"
+        keyset_params = [cursor_values[-2], cursor_values[-2], cursor_values[-1]]
+        if fulltext_query:
+            match_expression = "MATCH(n.front_text, n.back_text) AGAINST (%s IN BOOLEAN MODE)"
+            keyset_condition = f"({match_expression} < %s OR ({match_expression} = %s AND {keyset_condition}))"
+            keyset_params = [fulltext_query, cursor_values[0], fulltext_query, cursor_values[0]] + keyset_params
+        conditions.append(keyset_condition)
+        params.extend(keyset_params)
+
+    statement = f"""
+        SELECT
+            n.id as note_id,
+            f.id as flashcard_id,
+            n.content_version,
+            n.front_text,
+            n.back_text,
+            IF(n.front_text IS NULL, n.field_values, NULL) as field_values,
+            d.name as deck_name,
+            d.id as deck_id,
+            f.card_type,
+            f.due_date,
+            n.created_at{', page.relevance' if fulltext_query else ''}
+        FROM (
+            SELECT n.id{relevance_column}
+            FROM notes n
+            WHERE n.user_id = %s
+            {''.join(' AND ' + condition for condition in conditions)}
+            ORDER BY {order_by}
+            LIMIT %s
+        ) page
+        JOIN notes n ON n.id = page.id
+        JOIN flashcards f ON n.id = f.note_id
+        JOIN decks d ON f.deck_id = d.id
+        {f"WHERE f.deck_id IN ({','.join(['%s'] * len(deck_ids))})" if deck_ids else ''}
+    """
+    return statement, tuple(select_params + params + [limit + 1] + deck_params)
+
+
+def order_card_search_page(rows, limit):
+    """Order the rows of card_search_query in ([relevance,] created_at, note id,
+    card id) order, newest first; return (rows of the first ``limit`` notes,
+    whether more notes matched)."""
+    rows = sorted(rows, key=lambda row: (
+        row.get('relevance') or 0, row['created_at'], row['note_id'], row['flashcard_id']
+    ), reverse=True)
+    note_ids = list(dict.fromkeys(row['note_id'] for row in rows))
+    if len(note_ids) <= limit:
+        return rows, False
+    page_note_ids = set(note_ids[:limit])
+    return [row for row in rows if row['note_id'] in page_note_ids], True
+
+
+def deck_cards_query(deck_id, user_id, limit, cursor_values=None):
+    """Return (statement, parameters) of a page of a deck's cards, oldest first.
+
+    ``cursor_values`` is the decoded (created_at, flashcard_id) cursor of
+    the previous page. One extra row tells whether another page exists.
+    """
+    keyset_condition = ""
+    keyset_params = ()
+    if cursor_values:
+        cursor_created_at, cursor_flashcard_id = cursor_values
+        keyset_condition = "AND (f.created_at > %s OR (f.created_at = %s AND f.id > %s))"
+        keyset_params = (cursor_created_at, cursor_created_at, cursor_flashcard_id)
+    return f"""
+        SELECT
+            n.id as note_id,
+            f.id as flashcard_id,
+            n.content_version,
+            n.front_text,
+            n.back_text,
+            IF(n.front_text IS NULL, n.field_values, NULL) as field_values,
+            f.card_type,
+            f.due_date,
+            f.ease_factor,
+            f.intervals,
+            f.reps,
+            f.lapses,
+            f.last_reviewed,
+            f.created_at
+        FROM flashcards f
+        JOIN notes n ON f.note_id = n.id
+        WHERE f.deck_id = %s AND n.user_id = %s {keyset_condition}
+        ORDER BY f.created_at ASC, f.id ASC
+        LIMIT %s
+    """, (deck_id, user_id, *keyset_params, limit + 1)
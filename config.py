@@ -10,4 +10,57 @@ DB_USER = os.environ.get("DB_USER")
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
 DB_NAME = os.environ.get("DB_NAME")
 DB_PORT = int(os.environ.get("DB_PORT", 3306))  
-SECRET_KEY = os.environ.get("SECRET_KEY")
\ No newline at end of file
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))  # max open connections per worker process
+DB_POOL_WARMUP = int(os.environ.get("DB_POOL_WARMUP", 2))  # connections opened at worker start
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 5))  # seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = int(os.environ.get("DB_POOL_MAX_LIFETIME", 1800))  # seconds before a connection is recycled
+DB_POOL_PING_INTERVAL = int(os.environ.get("DB_POOL_PING_INTERVAL", 30))  # idle seconds before checkout pings
+SECRET_KEY = os.environ.get("SECRET_KEY")
+
+# Seconds between the background incremental refreshes of leaderboard_snapshots
+# (see leaderboard_refresher.py); 0 turns them off, leaving refreshes to
+# POST /api/admin/populate-leaderboard.
+LEADERBOARD_SNAPSHOT_MAX_AGE = int(os.environ.get("LEADERBOARD_SNAPSHOT_MAX_AGE", 60))
+
+# Per-worker cache of users' settings rows. The TTL bounds staleness after a
+# profile update handled by another worker.
+SETTINGS_CACHE_SIZE = int(os.environ.get("SETTINGS_CACHE_SIZE", 10000))
+SETTINGS_CACHE_TTL = int(os.environ.get("SETTINGS_CACHE_TTL", 60))
+
+# Default and maximum page size of the deck card listing and card search.
+CARD_PAGE_SIZE = int(os.environ.get("CARD_PAGE_SIZE", 100))
+CARD_PAGE_SIZE_MAX = int(os.environ.get("CARD_PAGE_SIZE_MAX", 500))
+
+# Per-worker cache of decoded note contents (see note_fields in app.py).
+NOTE_CACHE_SIZE = int(os.environ.get("NOTE_CACHE_SIZE", 50000))
+
+# Write-behind buffering of review_logs rows (see review_log_writer.py). Off by
+# default; rows still queued when a worker is killed without a clean shutdown
+# are lost.
+REVIEW_LOG_WRITE_BEHIND = os.environ.get("REVIEW_LOG_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+REVIEW_LOG_QUEUE_SIZE = int(os.environ.get("REVIEW_LOG_QUEUE_SIZE", 10000))  # rows buffered per worker
+REVIEW_LOG_FLUSH_ROWS = int(os.environ.get("REVIEW_LOG_FLUSH_ROWS", 500))  # rows per multi-row INSERT
+REVIEW_LOG_FLUSH_INTERVAL = float(os.environ.get("REVIEW_LOG_FLUSH_INTERVAL", 1.0))  # max seconds a row waits
+REVIEW_LOG_ENQUEUE_TIMEOUT = float(os.environ.get("REVIEW_LOG_ENQUEUE_TIMEOUT", 0.5))  # seconds a full queue blocks a review
+
+# Oldest answered_at, in seconds before the request, that /api/study/review/batch
+# accepts; older reviews are rejected rather than backdated into past days.
+REVIEW_BATCH_MAX_AGE = int(os.environ.get("REVIEW_BATCH_MAX_AGE", 3600))
+
+# Cache lifetime of the fingerprinted bundles served from /assets (see assets.py).
+ASSETS_MAX_AGE = int(os.environ.get("ASSETS_MAX_AGE", 31536000))
+
+# Bearer token Prometheus sends to scrape /metrics; unset, only logged-in users can read it.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Development/test aid (see query_audit.py): warn when one statement shape runs
+# QUERY_AUDIT_REPEAT_THRESHOLD+ times in a request and EXPLAIN statements
+# slower than QUERY_AUDIT_SLOW_MS.
+QUERY_AUDIT = os.environ.get("QUERY_AUDIT", "0").lower() in ("1", "true", "yes")
+QUERY_AUDIT_REPEAT_THRESHOLD = int(os.environ.get("QUERY_AUDIT_REPEAT_THRESHOLD", 5))
+QUERY_AUDIT_SLOW_MS = int(os.environ.get("QUERY_AUDIT_SLOW_MS", 100))
+
+# Connection pool of the async routes in asgi.py, separate from DB_POOL_SIZE;
+# requests beyond ASYNC_DB_POOL_SIZE wait for a connection without holding a thread.
+ASYNC_DB_POOL_MIN_SIZE = int(os.environ.get("ASYNC_DB_POOL_MIN_SIZE", 2))
+ASYNC_DB_POOL_SIZE = int(os.environ.get("ASYNC_DB_POOL_SIZE", 20))
@@ -0,0 +1,259 @@
+# db_pool.py
+
+import os
+import queue
+import threading
+import time
+import traceback
+
+import MySQLdb
+from MySQLdb import cursors
+from MySQLdb.constants import FIELD_TYPE
+from MySQLdb.converters import conversions
+from flask import g
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class _PoolEntry:
+    __slots__ = ('connection', 'created_at', 'last_used_at')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class MySQLPool:
+    """Drop-in replacement for flask_mysqldb.MySQL backed by a connection pool.
+
+    ``mysql.connection`` checks a connection out of the pool the first time it
+    is used in an app context and the teardown handler returns it, so route
+    code keeps calling ``mysql.connection.cursor()`` unchanged. It reads the
+    same MYSQL_* settings as flask_mysqldb plus the MYSQL_POOL_* settings.
+    """
+
+    def __init__(self, app=None):
+        self._settings = {}
+        self._reset_state()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MYSQL_HOST', 'localhost')
+        app.config.setdefault('MYSQL_PORT', 3306)
+        app.config.setdefault('MYSQL_CHARSET', 'utf8')
+        app.config.setdefault('MYSQL_CONNECT_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_CURSORCLASS', None)
+        app.config.setdefault('MYSQL_DECIMAL_AS_FLOAT', False)
+        app.config.setdefault('MYSQL_POOL_SIZE', 10)
+        app.config.setdefault('MYSQL_POOL_WARMUP', 2)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 5.0)
+        app.config.setdefault('MYSQL_POOL_MAX_LIFETIME', 1800)
+        app.config.setdefault('MYSQL_POOL_PING_INTERVAL', 30)
+
+        connect_kwargs = {
+            'host': app.config['MYSQL_HOST'],
+            'port': app.config['MYSQL_PORT'],
+            'user': app.config.get('MYSQL_USER'),
+            'passwd': app.config.get('MYSQL_PASSWORD'),
+            'db': app.config.get('MYSQL_DB'),
+            'charset': app.config['MYSQL_CHARSET'],
+            'connect_timeout': app.config['MYSQL_CONNECT_TIMEOUT'],
+        }
+        cursorclass = app.config['MYSQL_CURSORCLASS']
+        if cursorclass:
+            # A MySQLdb.cursors class name, or a cursor class itself.
+            connect_kwargs['cursorclass'] = getattr(cursors, cursorclass) if isinstance(cursorclass, str) else cursorclass
+        if app.config['MYSQL_DECIMAL_AS_FLOAT']:
+            # DECIMAL results (ease factors, SUM()s) arrive as floats, which the
+            # JSON encoder writes natively instead of calling back per value.
+            conv = dict(conversions)
+            conv[FIELD_TYPE.DECIMAL] = float
+            conv[FIELD_TYPE.NEWDECIMAL] = float
+            connect_kwargs['conv'] = conv
+
+        self._settings = {
+            'connect_kwargs': {key: value for key, value in connect_kwargs.items() if value is not None},
+            'size': max(1, int(app.config['MYSQL_POOL_SIZE'])),
+            'warmup': max(0, int(app.config['MYSQL_POOL_WARMUP'])),
+            'timeout': float(app.config['MYSQL_POOL_TIMEOUT']),
+            'max_lifetime': float(app.config['MYSQL_POOL_MAX_LIFETIME']),
+            'ping_interval': float(app.config['MYSQL_POOL_PING_INTERVAL']),
+        }
+        self._reset_state()
+        app.teardown_appcontext(self.teardown)
+
+    def _reset_state(self):
+        # Connections inherited from a parent process share its sockets; they
+        # are kept referenced (never closed) so the parent's sessions survive.
+        inherited = getattr(self, '_idle', None)
+        self._inherited = list(inherited.queue) if inherited is not None else []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._open_count = 0
+        self._warmed = False
+        self._metrics = {
+            'checkouts': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_recycled': 0,
+            'validation_failures': 0,
+        }
+
+    def _check_process(self):
+        if os.getpid() != self._pid:
+            self._reset_state()
+
+    def _open(self):
+        connection = MySQLdb.connect(**self._settings['connect_kwargs'])
+        with self._lock:
+            self._metrics['connections_created'] += 1
+        return _PoolEntry(connection)
+
+    def _discard(self, entry):
+        with self._lock:
+            self._open_count -= 1
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._open_count < self._settings['size']:
+                self._open_count += 1
+                return True
+            return False
+
+    def _open_reserved(self):
+        try:
+            return self._open()
+        except Exception:
+            with self._lock:
+                self._open_count -= 1
+            raise
+
+    def warmup(self):
+        """Open MYSQL_POOL_WARMUP connections ahead of the first requests.
+
+        Call once per worker process (e.g. from a WSGI post-fork hook); the
+        pool also warms itself on the first checkout in each process.
+        """
+        self._check_process()
+        self._warmed = True
+        opened = 0
+        while opened < self._settings['warmup'] and self._idle.qsize() < self._settings['warmup']:
+            if not self._reserve_slot():
+                break
+            try:
+                self._idle.put(self._open_reserved())
+            except Exception:
+                traceback.print_exc()
+                break
+            opened += 1
+        return opened
+
+    def _is_expired(self, entry, now):
+        return now - entry.created_at > self._settings['max_lifetime']
+
+    def _is_healthy(self, entry, now):
+        if now - entry.last_used_at <= self._settings['ping_interval']:
+            return True
+        try:
+            entry.connection.ping()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        self._check_process()
+        if not self._warmed:
+            self.warmup()
+
+        started = time.monotonic()
+        deadline = started + self._settings['timeout']
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve_slot():
+                    entry = self._open_reserved()
+                else:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        if remaining <= 0:
+                            raise queue.Empty
+                        entry = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        with self._lock:
+                            self._metrics['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available within {self._settings['timeout']} seconds"
+                        )
+
+            now = time.monotonic()
+            if self._is_expired(entry, now):
+                self._discard(entry)
+                with self._lock:
+                    self._metrics['connections_recycled'] += 1
+                continue
+            if not self._is_healthy(entry, now):
+                self._discard(entry)
+                with self._lock:
+                    self._metrics['validation_failures'] += 1
+                continue
+
+            waited = now - started
+            with self._lock:
+                self._metrics['checkouts'] += 1
+                self._metrics['wait_seconds_total'] += waited
+                self._metrics['wait_seconds_max'] = max(self._metrics['wait_seconds_max'], waited)
+            return entry
+
+    def release(self, entry):
+        if os.getpid() != self._pid:
+            return
+        try:
+            # Never hand an open transaction from a failed request to the next one.
+            entry.connection.rollback()
+        except Exception:
+            self._discard(entry)
+            return
+
+        now = time.monotonic()
+        if self._is_expired(entry, now):
+            self._discard(entry)
+            with self._lock:
+                self._metrics['connections_recycled'] += 1
+            return
+        entry.last_used_at = now
+        self._idle.put(entry)
+
+    @property
+    def connection(self):
+        entry = g.get('_mysql_pool_entry')
+        if entry is None:
+            entry = self.acquire()
+            g._mysql_pool_entry = entry
+        return entry.connection
+
+    def teardown(self, exception):
+        entry = g.pop('_mysql_pool_entry', None)
+        if entry is not None:
+            self.release(entry)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats['size'] = self._settings.get('size', 0)
+            stats['open'] = self._open_count
+        stats['idle'] = self._idle.qsize()
+        stats['in_use'] = stats['open'] - stats['idle']
+        stats['wait_seconds_avg'] = stats['wait_seconds_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
@@ -0,0 +1,177 @@
+# deck_stats.py
+
+from collections import Counter, defaultdict
+
+MASTERED_EASE_FACTOR = 2.8
+COUNTER_COLUMNS = ('card_count', 'new_count', 'learning_count', 'review_count', 'mastered_count')
+REBUILD_CHUNK_SIZE = 500
+
+
+class DeckStatsDelta:
+    """Accumulates changes to deck_stats / deck_due_counts for one transaction.
+
+    Endpoints record every card they add, remove or reschedule, then call
+    apply() before committing so the counters move with the cards.
+    deck_due_counts is a per-deck histogram of due dates for cards that are
+    not new, so "due today" is a sum over a few rows rather than a card scan.
+    """
+
+    def __init__(self):
+        self._counts = defaultdict(Counter)
+        self._due = Counter()
+
+    def touch(self, deck_id):
+        # Makes sure a (possibly all-zero) deck_stats row exists for the deck.
+        self._counts[deck_id]
+
+    def add_card(self, deck_id, card_type, ease_factor, due_date, count=1):
+        counts = self._counts[deck_id]
+        counts['card_count'] += count
+        if card_type == 'new':
+            counts['new_count'] += count
+        elif card_type == 'learning':
+            counts['learning_count'] += count
+        elif card_type == 'review':
+            counts['review_count'] += count
+            if ease_factor is not None and float(ease_factor) >= MASTERED_EASE_FACTOR:
+                counts['mastered_count'] += count
+        if card_type != 'new' and due_date is not None:
+            self._due[(deck_id, due_date)] += count
+
+    def remove_card(self, deck_id, card_type, ease_factor, due_date, count=1):
+        self.add_card(deck_id, card_type, ease_factor, due_date, count=-count)
+
+    def statements(self):
+        """The (statement, parameters) pairs that apply the recorded changes."""
+        statements = []
+        if self._counts:
+            rows = [(deck_id, *(counts[column] for column in COUNTER_COLUMNS))
+                    for deck_id, counts in self._counts.items()]
+            statements.append((
+                f"""
+                INSERT INTO deck_stats (deck_id, {', '.join(COUNTER_COLUMNS)})
+                VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(rows))}
+                ON DUPLICATE KEY UPDATE
+                    {', '.join(f'{column} = {column} + VALUES({column})' for column in COUNTER_COLUMNS)}
+                """,
+                tuple(value for row in rows for value in row)
+            ))
+
+        due_rows = [(deck_id, due_date, count) for (deck_id, due_date), count in self._due.items() if count]
+        if due_rows:
+            statements.append((
+                f"""
+                INSERT INTO deck_due_counts (deck_id, due_date, card_count)
+                VALUES {', '.join(['(%s, %s, %s)'] * len(due_rows))}
+                ON DUPLICATE KEY UPDATE card_count = card_count + VALUES(card_count)
+                """,
+                tuple(value for row in due_rows for value in row)
+            ))
+            if any(count < 0 for _, _, count in due_rows):
+                deck_ids = list({deck_id for deck_id, _, _ in due_rows})
+                statements.append((
+                    f"DELETE FROM deck_due_counts WHERE deck_id IN ({','.join(['%s'] * len(deck_ids))}) AND card_count <= 0",
+                    tuple(deck_ids)
+                ))
+        return statements
+
+    def apply(self, cur):
+        for statement, parameters in self.statements():
+            cur.execute(statement, parameters)
+        self._counts.clear()
+        self._due.clear()
+
+
+def delete_deck_stats(cur, deck_id):
+    cur.execute("DELETE FROM deck_due_counts WHERE deck_id = %s", (deck_id,))
+    cur.execute("DELETE FROM deck_stats WHERE deck_id = %s", (deck_id,))
+
+
+def rebuild_deck_stats(cur, deck_ids):
+    """Recompute the counters of the given decks from flashcards."""
+    if not deck_ids:
+        return
+    placeholders = ','.join(['%s'] * len(deck_ids))
+    cur.execute(f"""
+        INSERT INTO deck_stats (deck_id, card_count, new_count, learning_count, review_count, mastered_count)
+        SELECT
+            d.id,
+            COUNT(f.id),
+            COALESCE(SUM(f.card_type = 'new'), 0),
+            COALESCE(SUM(f.card_type = 'learning'), 0),
+            COALESCE(SUM(f.card_type = 'review'), 0),
+            COALESCE(SUM(f.card_type = 'review' AND f.ease_factor >= {MASTERED_EASE_FACTOR}), 0)
+        FROM decks d
+        LEFT JOIN flashcards f ON f.deck_id = d.id
+        WHERE d.id IN ({placeholders})
+        GROUP BY d.id
+        ON DUPLICATE KEY UPDATE
+            card_count = VALUES(card_count),
+            new_count = VALUES(new_count),
+            learning_count = VALUES(learning_count),
+            review_count = VALUES(review_count),
+            mastered_count = VALUES(mastered_count)
+    """, tuple(deck_ids))
+    cur.execute(f"DELETE FROM deck_due_counts WHERE deck_id IN ({placeholders})", tuple(deck_ids))
+    cur.execute(f"""
+        INSERT INTO deck_due_counts (deck_id, due_date, card_count)
+        SELECT deck_id, due_date, COUNT(*)
+        FROM flashcards
+        WHERE deck_id IN ({placeholders}) AND card_type != 'new' AND due_date IS NOT NULL
+        GROUP BY deck_id, due_date
+    """, tuple(deck_ids))
+
+
+def rebuild_all_deck_stats(connection):
+    """Repair job: rebuild every deck's counters, committing per chunk."""
+    cur = connection.cursor()
+    try:
+        rebuilt = 0
+        last_deck_id = 0
+        while True:
+            cur.execute("SELECT id FROM decks WHERE id > %s ORDER BY id LIMIT %s", (last_deck_id, REBUILD_CHUNK_SIZE))
+            deck_ids = [row['id'] for row in cur.fetchall()]
+            if not deck_ids:
+                break
+            rebuild_deck_stats(cur, deck_ids)
+            connection.commit()
+            rebuilt += len(deck_ids)
+            last_deck_id = deck_ids[-1]
+        return rebuilt
+    finally:
+        cur.close()
+
+
+DECK_LIST_QUERY = """
+    SELECT
+        d.id,
+        d.name,
+        d.description,
+        d.created_at,
+        COALESCE(ds.card_count, 0) AS card_count,
+        COALESCE(ds.mastered_count, 0) as mastered_cards_in_deck,
+        COALESCE(ds.new_count, 0) AS new_count,
+        COALESCE(ds.learning_count, 0) AS learning_count,
+        COALESCE(ds.review_count, 0) AS review_count,
+        GROUP_CONCAT(DISTINCT t.name SEPARATOR ', ') as tags
+    FROM decks d
+    LEFT JOIN deck_stats ds ON ds.deck_id = d.id
+    LEFT JOIN deck_tags dt ON d.id = dt.deck_id
+    LEFT JOIN tags t ON dt.tag_id = t.id
+    WHERE d.user_id = %s
+    GROUP BY d.id, d.name, d.description, d.created_at
+    ORDER BY d.created_at DESC
+"""
+
+
+def fetch_due_today_counts(cur, deck_ids, today):
+    if not deck_ids:
+        return {}
+    placeholders = ','.join(['%s'] * len(deck_ids))
+    cur.execute(f"""
+        SELECT deck_id, SUM(card_count) AS due_today_count
+        FROM deck_due_counts
+        WHERE deck_id IN ({placeholders}) AND due_date <= %s
+        GROUP BY deck_id
+    """, (*deck_ids, today))
+    return {row['deck_id']: int(row['due_today_count'] or 0) for row in cur.fetchall()}
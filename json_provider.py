@@ -0,0 +1,57 @@
+# json_provider.py
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(o):
+    # Dates go out as ISO 8601 (YYYY-MM-DD / YYYY-MM-DDTHH:MM:SS), which is
+    # what the routes used to format by hand. DECIMAL columns become numbers:
+    # integers when the value has no fractional digits (SUM/COUNT results).
+    if isinstance(o, Decimal):
+        return int(o) if o.as_tuple().exponent >= 0 else float(o)
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider serializing responses with orjson when it is installed.
+
+    Rows from the DictCursor can be passed to jsonify as they are: date,
+    datetime and Decimal values are encoded natively. Without orjson the
+    stdlib encoder is used with the same conversions.
+    """
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE),
+            mimetype=self.mimetype
+        )
@@ -0,0 +1,30 @@
+# leaderboard.py
+#
+# SQL of the leaderboard: the ranking that refresh_leaderboard_snapshot in
+# app.py captures, and the snapshot reads of /api/leaderboard.
+
+LEADERBOARD_SNAPSHOT_SIZE = 1000
+
+LEADERBOARD_TOP_QUERY = """
+    SELECT u.id AS user_id, u.username, us.points
+    FROM users u
+    JOIN user_stats us ON u.id = us.user_id
+    WHERE us.points > 0
+    ORDER BY us.points DESC
+    LIMIT %s
+"""
+LEADERBOARD_RECENT_REVIEWERS_QUERY = """
+    SELECT u.id AS user_id, u.username, us.points
+    FROM users u
+    JOIN user_stats us ON u.id = us.user_id
+    WHERE us.points > 0 AND us.last_reviewed_date >= %s
+"""
+LEADERBOARD_COUNT_QUERY = "SELECT COUNT(*) AS total_entries FROM leaderboard_snapshots"
+LEADERBOARD_PAGE_QUERY = """
+    SELECT user_id, username, points, `rank`
+    FROM leaderboard_snapshots
+    WHERE `rank` > %s OR (`rank` = %s AND user_id > %s)
+    ORDER BY `rank` ASC, user_id ASC
+    LIMIT %s
+"""
+LEADERBOARD_USER_RANK_QUERY = "SELECT user_id, username, points, `rank` FROM leaderboard_snapshots WHERE user_id = %s"
@@ -0,0 +1,65 @@
+# leaderboard_refresher.py
+
+import atexit
+import os
+import threading
+import traceback
+
+
+class LeaderboardRefresher:
+    """Calls ``refresh`` every ``interval`` seconds from a daemon thread, so
+    requests only read leaderboard_snapshots.
+
+    The thread starts with the first request a worker handles (or start())
+    and, like the review log flusher, each forked worker runs its own. The
+    refresh itself takes a MySQL named lock, so workers whose turn overlaps
+    skip it. An ``interval`` of 0 or less leaves the refresh to callers.
+    """
+
+    def __init__(self, app=None, refresh=None, interval=60.0):
+        self.refresh = refresh
+        self.interval = float(interval)
+        self._lock = threading.Lock()
+        self._reset_state()
+        if app is not None:
+            self.init_app(app, refresh, interval)
+
+    def init_app(self, app, refresh, interval=60.0):
+        self.refresh = refresh
+        self.interval = float(interval)
+        if self.interval > 0:
+            app.before_request(self.start)
+            atexit.register(self.close)
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        # The thread does not survive a fork; each worker starts its own.
+        if os.getpid() != self._pid:
+            self._reset_state()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='leaderboard-refresher', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                traceback.print_exc()
+            if self._stopping.wait(self.interval):
+                return
+
+    def close(self, timeout=10.0):
+        """Stop the refresher thread."""
+        if self._thread is None or os.getpid() != self._pid:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
@@ -0,0 +1,214 @@
+# metrics.py
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+from MySQLdb import cursors
+from flask import request
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+MAX_FINGERPRINT_LENGTH = 300
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRINGS = re.compile(r"'(?:''|\\.|[^'\\])*'|\"(?:\"\"|\\.|[^\"\\])*\"")
+_NUMBERS = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'%s|%\(\w+\)s')
+_WHITESPACE = re.compile(r'\s+')
+_VALUE_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_GROUPS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement):
+    """Normalize a SQL statement into its shape: literals and placeholders
+    become ?, lists of them (...), and multi-row VALUES one group.
+
+    Statements built with a variable number of placeholders therefore share
+    one fingerprint.
+    """
+    if isinstance(statement, bytes):
+        statement = statement.decode('utf-8', 'replace')
+    shape = _COMMENTS.sub(' ', statement)
+    shape = _STRINGS.sub('?', shape)
+    shape = _PLACEHOLDERS.sub('?', shape)
+    shape = _NUMBERS.sub('?', shape)
+    shape = _WHITESPACE.sub(' ', shape).strip()
+    shape = _VALUE_LISTS.sub('(...)', shape)
+    shape = _REPEATED_GROUPS.sub('(...)', shape)
+    return shape[:MAX_FINGERPRINT_LENGTH]
+
+
+class Histogram:
+    """Cumulative-bucket histogram family keyed by a tuple of label values."""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series = {}
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(snapshot.items()):
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {series[-1]}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_gauges(prefix, stats, documentation):
+    """Render the numeric values of a stats() dict as gauges named <prefix>_<key>."""
+    lines = []
+    for key, value in sorted(stats.items()):
+        if isinstance(value, bool):
+            value = int(value)
+        if not isinstance(value, (int, float)):
+            continue
+        lines.append(f"# HELP {prefix}_{key} {documentation}")
+        lines.append(f"# TYPE {prefix}_{key} gauge")
+        lines.append(f"{prefix}_{key} {value}")
+    return lines
+
+
+class _RequestState(threading.local):
+    queries = 0
+    started = None
+    status = None
+    # (statement, args, seconds, many) of each call while a log is open.
+    statements = None
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint, method and status.',
+    ('endpoint', 'method', 'status'), REQUEST_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_queries', 'Database statements executed per request by endpoint.',
+    ('endpoint',), QUERY_COUNT_BUCKETS
+)
+QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'Statement execution time by normalized statement fingerprint.',
+    ('fingerprint',), QUERY_BUCKETS
+)
+_request_state = _RequestState()
+
+
+class InstrumentedDictCursor(cursors.DictCursor):
+    """DictCursor that times every execute()/executemany() by statement fingerprint
+    and counts them toward the current request."""
+
+    _in_executemany = False
+
+    def execute(self, query, args=None):
+        if self._in_executemany:
+            return super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            elapsed = time.perf_counter() - started
+            QUERY_LATENCY.observe((fingerprint(query),), elapsed)
+            _request_state.queries += 1
+            if _request_state.statements is not None:
+                _request_state.statements.append((query, args, elapsed, False))
+
+    def executemany(self, query, args):
+        # executemany falls back to execute() per row for statements it cannot
+        # batch; those count as the one call made here.
+        started = time.perf_counter()
+        self._in_executemany = True
+        try:
+            return super().executemany(query, args)
+        finally:
+            self._in_executemany = False
+            elapsed = time.perf_counter() - started
+            QUERY_LATENCY.observe((fingerprint(query),), elapsed)
+            _request_state.queries += 1
+            if _request_state.statements is not None:
+                _request_state.statements.append((query, args, elapsed, True))
+
+
+def begin_statement_log():
+    """Start collecting the statements this thread executes (see query_audit.py)."""
+    _request_state.statements = []
+
+
+def end_statement_log():
+    """Stop collecting and return the statements, or None if no log was open."""
+    statements = _request_state.statements
+    _request_state.statements = None
+    return statements
+
+
+class RequestMetrics:
+    """Record per-endpoint latency and statement counts of every request.
+
+    Requests are recorded at teardown, which also runs when a handler
+    raises; those count as status 500.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_request(self):
+        _request_state.started = time.perf_counter()
+        _request_state.queries = 0
+        _request_state.status = None
+
+    def _after_request(self, response):
+        _request_state.status = response.status_code
+        return response
+
+    def _teardown_request(self, exception):
+        started = _request_state.started
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            status = _request_state.status
+            if exception is not None or status is None:
+                status = 500
+            REQUEST_LATENCY.observe(
+                (endpoint, request.method, str(status)), time.perf_counter() - started
+            )
+            REQUEST_QUERIES.observe((endpoint,), _request_state.queries)
+            _request_state.started = None
+
+    def render(self, *extra_lines):
+        lines = REQUEST_LATENCY.render() + REQUEST_QUERIES.render() + QUERY_LATENCY.render()
+        lines.extend(extra_lines)
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,203 @@
+# migrate.py
+
+import argparse
+import hashlib
+import os
+import re
+
+import MySQLdb
+from MySQLdb import cursors
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_LOCK_TIMEOUT = 60
+
+_MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+_STATEMENT_END = re.compile(r';[ \t]*$', re.M)
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    __slots__ = ('version', 'name', 'sql', 'checksum')
+
+    def __init__(self, version, name, sql):
+        self.version = version
+        self.name = name
+        self.sql = sql
+        # Only the statements count: a migration's comments can be corrected
+        # after it was applied.
+        self.checksum = hashlib.sha256('\n'.join(self.statements()).encode('utf-8')).hexdigest()
+
+    def statements(self):
+        # Statements end with ';' at the end of a line; the files hold no
+        # procedures or triggers that would need a custom delimiter.
+        lines = [line for line in self.sql.splitlines() if not line.lstrip().startswith('--')]
+        return [statement.strip() for statement in _STATEMENT_END.split('\n'.join(lines)) if statement.strip()]
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding='utf-8') as migration_file:
+            migrations.append(Migration(int(match.group(1)), match.group(2), migration_file.read()))
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def _ensure_migrations_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_migrations(cur):
+    _ensure_migrations_table(cur)
+    cur.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {row['version']: row for row in cur.fetchall()}
+
+
+def _record(cur, migration):
+    cur.execute(
+        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+        (migration.version, migration.name, migration.checksum)
+    )
+
+
+def migrate(connection, target=None, migrations=None, log=print):
+    """Apply the pending migrations up to ``target`` (default: all) in order.
+
+    A named lock serializes concurrent runs (several hosts deploying at
+    once). Applied migrations whose statements have changed since are refused.
+    MySQL commits each DDL statement implicitly, so a migration failing
+    halfway stays partly applied and unrecorded; fix it and rerun, or finish
+    it by hand and use baseline(). Returns the versions applied.
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    cur = connection.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK('schema_migrations', %s) AS acquired", (MIGRATION_LOCK_TIMEOUT,))
+        if not cur.fetchone()['acquired']:
+            raise MigrationError("Another migration run holds the schema_migrations lock")
+        try:
+            applied = applied_migrations(cur)
+            for migration in migrations:
+                recorded = applied.get(migration.version)
+                if recorded and recorded['checksum'] != migration.checksum:
+                    raise MigrationError(
+                        f"Migration {migration.version:04d}_{migration.name} was changed after it was applied"
+                    )
+
+            applied_now = []
+            for migration in migrations:
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                log(f"Applying {migration.version:04d}_{migration.name}")
+                for statement in migration.statements():
+                    cur.execute(statement)
+                _record(cur, migration)
+                connection.commit()
+                applied_now.append(migration.version)
+            return applied_now
+        finally:
+            cur.execute("SELECT RELEASE_LOCK('schema_migrations')")
+            cur.fetchall()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def baseline(connection, version, migrations=None):
+    """Record migrations up to ``version`` as applied without running them,
+    for databases whose schema was set up by hand."""
+    migrations = load_migrations() if migrations is None else migrations
+    cur = connection.cursor()
+    try:
+        applied = applied_migrations(cur)
+        recorded = []
+        for migration in migrations:
+            if migration.version <= version and migration.version not in applied:
+                _record(cur, migration)
+                recorded.append(migration.version)
+        connection.commit()
+        return recorded
+    finally:
+        cur.close()
+
+
+def migration_status(connection, migrations=None):
+    """[(version, name, state)] with state 'applied', 'pending' or 'changed'."""
+    migrations = load_migrations() if migrations is None else migrations
+    cur = connection.cursor()
+    try:
+        applied = applied_migrations(cur)
+    finally:
+        cur.close()
+    status = []
+    for migration in migrations:
+        recorded = applied.get(migration.version)
+        if recorded is None:
+            state = 'pending'
+        elif recorded['checksum'] != migration.checksum:
+            state = 'changed'
+        else:
+            state = 'applied'
+        status.append((migration.version, migration.name, state))
+    return status
+
+
+if __name__ == '__main__':
+    import config
+
+    parser = argparse.ArgumentParser(description='Apply the SQL migrations in migrations/ to the configured database.')
+    parser.add_argument('--target', type=int, help='stop after this version')
+    parser.add_argument('--status', action='store_true', help='list migrations and whether they are applied')
+    parser.add_argument('--baseline', type=int, metavar='VERSION',
+                        help='mark migrations up to VERSION as applied without running them')
+    parser.add_argument('--check-plans', action='store_true',
+                        help='after migrating, EXPLAIN the hot queries and fail on full scans (see query_plans.py)')
+    args = parser.parse_args()
+
+    db_connection = MySQLdb.connect(
+        host=config.DB_HOST,
+        user=config.DB_USER,
+        passwd=config.DB_PASSWORD,
+        db=config.DB_NAME,
+        port=config.DB_PORT,
+        charset='utf8',
+        cursorclass=cursors.DictCursor
+    )
+    try:
+        if args.status:
+            for migration_version, migration_name, state in migration_status(db_connection):
+                print(f"{migration_version:04d}_{migration_name:<32} {state}")
+        elif args.baseline is not None:
+            recorded_versions = baseline(db_connection, args.baseline)
+            print(f"Recorded {len(recorded_versions)} migrations as applied.")
+        else:
+            applied_versions = migrate(db_connection, target=args.target)
+            print(f"Applied {len(applied_versions)} migrations.")
+            if args.check_plans:
+                from query_plans import check_query_plans
+
+                problems = check_query_plans(db_connection)
+                for problem in problems:
+                    print(problem)
+                if problems:
+                    raise SystemExit(1)
+                print("All hot queries use indexes.")
+    finally:
+        db_connection.close()
@@ -0,0 +1,124 @@
+-- Tables as they existed before the numbered migrations; later migrations
+-- add to them. IF NOT EXISTS keeps this a no-op on databases created by hand
+-- (record the migrations such a database already has with
+-- python migrate.py --baseline <version>).
+
+CREATE TABLE IF NOT EXISTS users (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    date_of_birth DATE NULL,
+    gender VARCHAR(20) NULL,
+    country VARCHAR(100) NULL,
+    city VARCHAR(100) NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_users_email (email)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS settings (
+    user_id INT NOT NULL PRIMARY KEY,
+    new_cards_per_day INT NOT NULL DEFAULT 20,
+    max_reviews_per_day INT NOT NULL DEFAULT 100,
+    learning_steps VARCHAR(100) NOT NULL DEFAULT '1,10',
+    ease_bonus DECIMAL(4,2) NOT NULL DEFAULT 1.30,
+    CONSTRAINT fk_settings_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INT NOT NULL PRIMARY KEY,
+    points INT NOT NULL DEFAULT 0,
+    total_reviews INT NOT NULL DEFAULT 0,
+    last_reviewed_date DATE NULL,
+    review_streak_days INT NOT NULL DEFAULT 0,
+    CONSTRAINT fk_user_stats_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+    user_id INT NOT NULL PRIMARY KEY,
+    username VARCHAR(100) NOT NULL,
+    points INT NOT NULL,
+    `rank` INT NOT NULL,
+    captured_at DATETIME NOT NULL,
+    CONSTRAINT fk_leaderboard_snapshots_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS note_types (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    fields JSON NOT NULL,
+    templates JSON NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS notes (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    note_type_id INT NOT NULL,
+    field_values JSON NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_notes_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+    CONSTRAINT fk_notes_note_type FOREIGN KEY (note_type_id) REFERENCES note_types (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS decks (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    description TEXT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_decks_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS flashcards (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    note_id INT NOT NULL,
+    deck_id INT NOT NULL,
+    card_type VARCHAR(20) NOT NULL DEFAULT 'new',
+    due_date DATE NULL,
+    intervals INT NOT NULL DEFAULT 0,
+    ease_factor DECIMAL(5,2) NOT NULL DEFAULT 2.50,
+    reps INT NOT NULL DEFAULT 0,
+    lapses INT NOT NULL DEFAULT 0,
+    last_reviewed DATETIME NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_flashcards_note FOREIGN KEY (note_id) REFERENCES notes (id) ON DELETE CASCADE,
+    CONSTRAINT fk_flashcards_deck FOREIGN KEY (deck_id) REFERENCES decks (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS review_logs (
+    id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    flashcard_id INT NOT NULL,
+    user_id INT NOT NULL,
+    rating TINYINT NOT NULL,
+    review_time DATETIME NOT NULL,
+    intervals_before INT NOT NULL DEFAULT 0,
+    intervals_after INT NOT NULL DEFAULT 0,
+    ease_factor_before DECIMAL(5,2) NOT NULL,
+    ease_factor_after DECIMAL(5,2) NOT NULL,
+    CONSTRAINT fk_review_logs_flashcard FOREIGN KEY (flashcard_id) REFERENCES flashcards (id) ON DELETE CASCADE,
+    CONSTRAINT fk_review_logs_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS tags (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    UNIQUE KEY uq_tags_name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS note_tags (
+    note_id INT NOT NULL,
+    tag_id INT NOT NULL,
+    PRIMARY KEY (note_id, tag_id),
+    KEY idx_note_tags_tag (tag_id, note_id),
+    CONSTRAINT fk_note_tags_note FOREIGN KEY (note_id) REFERENCES notes (id) ON DELETE CASCADE,
+    CONSTRAINT fk_note_tags_tag FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS deck_tags (
+    deck_id INT NOT NULL,
+    tag_id INT NOT NULL,
+    PRIMARY KEY (deck_id, tag_id),
+    KEY idx_deck_tags_tag (tag_id, deck_id),
+    CONSTRAINT fk_deck_tags_deck FOREIGN KEY (deck_id) REFERENCES decks (id) ON DELETE CASCADE,
+    CONSTRAINT fk_deck_tags_tag FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,12 @@
+-- Searchable Front/Back columns extracted from notes.field_values, backing
+-- the FULLTEXT search in /api/cards/search. STORED generated columns are
+-- maintained by MySQL on every INSERT/UPDATE of field_values.
+
+ALTER TABLE notes
+    ADD COLUMN front_text TEXT
+        GENERATED ALWAYS AS (JSON_UNQUOTE(JSON_EXTRACT(field_values, '$.Front'))) STORED,
+    ADD COLUMN back_text TEXT
+        GENERATED ALWAYS AS (JSON_UNQUOTE(JSON_EXTRACT(field_values, '$.Back'))) STORED;
+
+ALTER TABLE notes
+    ADD FULLTEXT INDEX ft_notes_front_back (front_text, back_text);
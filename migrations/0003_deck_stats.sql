@@ -0,0 +1,25 @@
+-- Per-deck card counters maintained by the write endpoints (see deck_stats.py).
+-- Counters of decks that existed before these tables are filled by the
+-- backfill in 0012_backfill_deck_stats.sql; POST /api/admin/rebuild-deck-stats
+-- recomputes every deck.
+
+CREATE TABLE deck_stats (
+    deck_id INT NOT NULL PRIMARY KEY,
+    card_count INT NOT NULL DEFAULT 0,
+    new_count INT NOT NULL DEFAULT 0,
+    learning_count INT NOT NULL DEFAULT 0,
+    review_count INT NOT NULL DEFAULT 0,
+    mastered_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_deck_stats_deck FOREIGN KEY (deck_id) REFERENCES decks (id) ON DELETE CASCADE
+);
+
+-- Histogram of due dates for cards that are not new; "due today" for a deck
+-- is SUM(card_count) over due_date <= CURDATE().
+CREATE TABLE deck_due_counts (
+    deck_id INT NOT NULL,
+    due_date DATE NOT NULL,
+    card_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (deck_id, due_date),
+    CONSTRAINT fk_deck_due_counts_deck FOREIGN KEY (deck_id) REFERENCES decks (id) ON DELETE CASCADE
+);
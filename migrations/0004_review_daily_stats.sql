@@ -0,0 +1,19 @@
+-- Per-user, per-day review rollup maintained by the review endpoints (see
+-- review_stats.py). After creating the table, fill it from existing logs
+-- with: python review_stats.py
+
+ALTER TABLE review_logs
+    ADD COLUMN duration_seconds INT UNSIGNED NULL;
+
+CREATE TABLE review_daily_stats (
+    user_id INT NOT NULL,
+    review_date DATE NOT NULL,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    hard_count INT NOT NULL DEFAULT 0,
+    good_count INT NOT NULL DEFAULT 0,
+    easy_count INT NOT NULL DEFAULT 0,
+    seconds_studied INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, review_date),
+    CONSTRAINT fk_review_daily_stats_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
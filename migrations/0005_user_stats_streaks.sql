@@ -0,0 +1,16 @@
+-- Incrementally maintained review streaks (see streaks.py) and the user's
+-- time zone, which decides when a review day rolls over.
+
+ALTER TABLE user_stats
+    ADD COLUMN longest_streak_days INT NOT NULL DEFAULT 0,
+    ADD COLUMN activity_bitmap BIGINT UNSIGNED NOT NULL DEFAULT 0;
+
+ALTER TABLE settings
+    ADD COLUMN timezone VARCHAR(64) NULL;
+
+-- Existing rows only know their last review day.
+UPDATE user_stats
+SET activity_bitmap = 1,
+    review_streak_days = GREATEST(review_streak_days, 1),
+    longest_streak_days = GREATEST(review_streak_days, 1)
+WHERE last_reviewed_date IS NOT NULL;
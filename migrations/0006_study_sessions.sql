@@ -0,0 +1,14 @@
+-- Server-side study queues handed out page by page through
+-- /api/study/session/<deck_id>/next (see study_sessions.py).
+
+CREATE TABLE study_sessions (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    deck_id INT NOT NULL,
+    card_ids MEDIUMTEXT NOT NULL,
+    handed_out INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_study_sessions_user_created (user_id, created_at),
+    CONSTRAINT fk_study_sessions_user FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+    CONSTRAINT fk_study_sessions_deck FOREIGN KEY (deck_id) REFERENCES decks (id) ON DELETE CASCADE
+);
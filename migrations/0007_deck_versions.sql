@@ -0,0 +1,5 @@
+-- Per-deck version bumped by every write that changes a deck's cards or
+-- details; the deck read endpoints derive their ETags from it.
+
+ALTER TABLE decks
+    ADD COLUMN version INT NOT NULL DEFAULT 1;
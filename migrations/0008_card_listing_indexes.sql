@@ -0,0 +1,5 @@
+-- Keyset pagination of deck card listings and card search on
+-- (created_at, id) reads these indexes in order.
+
+CREATE INDEX idx_flashcards_deck_created ON flashcards (deck_id, created_at, id);
+CREATE INDEX idx_notes_user_created ON notes (user_id, created_at, id);
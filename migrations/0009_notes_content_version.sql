@@ -0,0 +1,12 @@
+-- Version of a note's content, bumped by PUT /api/notes/<id>; decoded
+-- contents are cached per (note_id, content_version).
+
+ALTER TABLE notes
+    ADD COLUMN content_version INT NOT NULL DEFAULT 1;
+
+-- Double-encoded rows (field_values holding a JSON string that contains
+-- the object) are unwrapped once so front_text/back_text can be extracted.
+UPDATE notes
+SET field_values = JSON_UNQUOTE(field_values)
+WHERE JSON_TYPE(field_values) = 'STRING'
+  AND JSON_VALID(JSON_UNQUOTE(field_values));
@@ -0,0 +1,23 @@
+-- Indexes behind the hot queries; query_plans.py checks that their EXPLAIN
+-- plans use them. Card listing and search use idx_notes_user_created and
+-- idx_flashcards_deck_created from 0008.
+
+-- Study queue (study_sessions.build_study_queue): due cards in due/ease
+-- order and new cards newest first. note_id makes both covering for the
+-- join to notes.
+CREATE INDEX idx_flashcards_study_queue ON flashcards (deck_id, card_type, due_date, ease_factor, note_id);
+CREATE INDEX idx_flashcards_new_queue ON flashcards (deck_id, card_type, created_at, note_id);
+
+-- Recent activity on the dashboard and the review_daily_stats rebuild.
+CREATE INDEX idx_review_logs_user_time ON review_logs (user_id, review_time);
+
+-- Leaderboard ranking (points DESC) and the incremental snapshot refresh,
+-- which reads users who reviewed since the last capture.
+CREATE INDEX idx_user_stats_points ON user_stats (points, user_id);
+CREATE INDEX idx_user_stats_last_reviewed ON user_stats (last_reviewed_date, points);
+
+-- Leaderboard pages are read in (rank, user_id) keyset order.
+CREATE INDEX idx_leaderboard_snapshots_rank ON leaderboard_snapshots (`rank`, user_id);
+
+-- Deck list, newest first.
+CREATE INDEX idx_decks_user_created ON decks (user_id, created_at);
@@ -0,0 +1,10 @@
+-- The due-card queue (study_sessions.DUE_CARDS_QUERY) filters
+-- card_type != 'new' and reads due_date <= today in (due_date, ease_factor)
+-- order. Behind card_type, a range on due_date cannot return rows in that
+-- order, so idx_flashcards_study_queue from 0010 left a filesort (and so
+-- would card_type IN ('learning', 'review'): two ranges, each ordered on
+-- its own). Leading with (deck_id, due_date) the index returns due cards
+-- already ordered; card_type is checked in the index and note_id keeps the
+-- join to notes covering. New cards have no due date and are not read.
+CREATE INDEX idx_flashcards_due_order ON flashcards (deck_id, due_date, ease_factor, card_type, note_id);
+DROP INDEX idx_flashcards_study_queue ON flashcards;
@@ -0,0 +1,28 @@
+-- Counters for decks that still have no deck_stats row (decks created
+-- before 0003 that the admin rebuild has not reached). The deck list used
+-- to build them on first read, committing from a GET; it now reads a
+-- missing row as zero counts. The due-date histogram goes first, while
+-- the decks to fill can still be told apart by their missing stats row.
+-- 2.8 is deck_stats.MASTERED_EASE_FACTOR.
+
+INSERT INTO deck_due_counts (deck_id, due_date, card_count)
+SELECT f.deck_id, f.due_date, COUNT(*)
+FROM flashcards f
+LEFT JOIN deck_stats ds ON ds.deck_id = f.deck_id
+WHERE ds.deck_id IS NULL AND f.card_type != 'new' AND f.due_date IS NOT NULL
+GROUP BY f.deck_id, f.due_date
+ON DUPLICATE KEY UPDATE card_count = VALUES(card_count);
+
+INSERT INTO deck_stats (deck_id, card_count, new_count, learning_count, review_count, mastered_count)
+SELECT
+    d.id,
+    COUNT(f.id),
+    COALESCE(SUM(f.card_type = 'new'), 0),
+    COALESCE(SUM(f.card_type = 'learning'), 0),
+    COALESCE(SUM(f.card_type = 'review'), 0),
+    COALESCE(SUM(f.card_type = 'review' AND f.ease_factor >= 2.8), 0)
+FROM decks d
+LEFT JOIN deck_stats ds ON ds.deck_id = d.id
+LEFT JOIN flashcards f ON f.deck_id = d.id
+WHERE ds.deck_id IS NULL
+GROUP BY d.id;
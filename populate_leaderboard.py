@@ -0,0 +1,312 @@
+# populate_leaderboard.py
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import MySQLdb
+from MySQLdb import cursors
+from werkzeug.security import generate_password_hash
+
+from deck_stats import rebuild_all_deck_stats
+from review_stats import backfill_daily_review_stats
+from streaks import ACTIVITY_WINDOW_DAYS
+
+# Every generated user can log in with this password (benchmark.py does).
+SYNTHETIC_PASSWORD = 'synthetic-password'
+POINTS_BY_RATING = {1: 50, 2: 200, 3: 500}  # as in app.py
+RATING_WEIGHTS = (15, 60, 25)
+CARD_TYPES = ('new', 'learning', 'review')
+CARD_TYPE_WEIGHTS = (30, 10, 60)
+# Card text is drawn from this vocabulary, so searches for any of these
+# words have matches.
+WORDS = (
+    'atom', 'biology', 'cell', 'chemistry', 'climate', 'code', 'delta', 'energy', 'enzyme', 'equation',
+    'france', 'galaxy', 'gene', 'geometry', 'gravity', 'history', 'integral', 'japan', 'kernel', 'language',
+    'lattice', 'matrix', 'molecule', 'neuron', 'orbit', 'photon', 'planet', 'protein', 'quantum', 'river',
+    'spanish', 'spectrum', 'theorem', 'vector', 'velocity', 'verb', 'volcano', 'wave', 'wavelength', 'zinc',
+)
+DEFAULT_BATCH_SIZE = 5000
+INFILE_BATCH_SIZE = 500000
+
+
+class BulkLoader:
+    """Buffer rows for one table and write them in large batches.
+
+    Rows go out as multi-row INSERTs, or with ``infile`` as tab-separated
+    files loaded by LOAD DATA LOCAL INFILE (needs local_infile enabled on
+    the server), which is several times faster at 10^8 rows. Each batch is
+    committed on its own.
+    """
+
+    def __init__(self, connection, table, columns, batch_size, infile=False):
+        self.connection = connection
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self.infile = infile
+        self.rows = []
+        self.loaded = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        cur = self.connection.cursor()
+        try:
+            if self.infile:
+                self._load_infile(cur)
+            else:
+                cur.execute(
+                    f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES "
+                    f"{', '.join(['(' + ', '.join(['%s'] * len(self.columns)) + ')'] * len(self.rows))}",
+                    tuple(value for row in self.rows for value in row)
+                )
+            self.connection.commit()
+        finally:
+            cur.close()
+        self.loaded += len(self.rows)
+        self.rows = []
+
+    def _load_infile(self, cur):
+        fd, path = tempfile.mkstemp(prefix=f'{self.table}-', suffix='.tsv')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as tsv:
+                for row in self.rows:
+                    tsv.write('\t'.join(_tsv_value(value) for value in row))
+                    tsv.write('\n')
+            cur.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.table} CHARACTER SET utf8 ({', '.join(self.columns)})",
+                (path,)
+            )
+        finally:
+            os.unlink(path)
+
+
+def _tsv_value(value):
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def _next_id(cur, table):
+    cur.execute(f"SELECT COALESCE(MAX(id), 0) + 1 AS next_id FROM {table}")
+    return cur.fetchone()['next_id']
+
+
+def _sentence(rng, length):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def _random_moment(rng, now, days):
+    # Skewed toward recent days, like real activity.
+    return now - timedelta(days=int(rng.random() ** 2 * days), seconds=rng.randrange(86400))
+
+
+def _longest_run(bits):
+    longest = run = 0
+    while bits:
+        run = run + 1 if bits & 1 else 0
+        longest = max(longest, run)
+        bits >>= 1
+    return longest
+
+
+def populate(connection, users=1000, decks_per_user=3, cards_per_deck=50, reviews=100000, tags=200,
+             days=365, seed=42, skew=3.0, batch_size=None, infile=False, log=print):
+    """Fill users, decks, notes, flashcards, tags and review_logs with synthetic data.
+
+    The same arguments and seed always produce the same rows (ids are
+    offset past existing ones). Every user owns ``decks_per_user`` decks of
+    ``cards_per_deck`` one-card notes; reviews are spread over users with a
+    power-law skew so the leaderboard has a long tail. user_stats,
+    review_daily_stats and deck_stats are rebuilt from the generated data.
+    """
+    batch_size = batch_size or (INFILE_BATCH_SIZE if infile else DEFAULT_BATCH_SIZE)
+    now = datetime.now().replace(microsecond=0)
+    today = now.date()
+    cards_per_user = decks_per_user * cards_per_deck
+
+    cur = connection.cursor()
+    try:
+        cur.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        first_user_id = _next_id(cur, 'users')
+        first_deck_id = _next_id(cur, 'decks')
+        first_note_id = _next_id(cur, 'notes')
+        first_card_id = _next_id(cur, 'flashcards')
+        first_tag_id = _next_id(cur, 'tags')
+        cur.execute("SELECT id FROM note_types WHERE id = 1")
+        if not cur.fetchone():
+            cur.execute(
+                "INSERT INTO note_types (id, name, fields, templates) VALUES (%s, %s, %s, %s)",
+                (1, 'Basic', '["Front", "Back"]',
+                 '{"Default Card": {"front_template": "{{Front}}", "back_template": "{{Back}}"}}')
+            )
+        connection.commit()
+    finally:
+        cur.close()
+
+    def loader(table, columns):
+        return BulkLoader(connection, table, columns, batch_size, infile)
+
+    started = time.monotonic()
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+    rng = random.Random(f'{seed}:users')
+    user_loader = loader('users', ('id', 'username', 'email', 'password_hash', 'date_of_birth', 'gender', 'country', 'city'))
+    for index in range(users):
+        user_id = first_user_id + index
+        user_loader.add((
+            user_id, f'user{user_id}', f'user{user_id}@example.com', password_hash,
+            today - timedelta(days=rng.randrange(16 * 365, 60 * 365)),
+            rng.choice(('male', 'female', 'other')), rng.choice(('US', 'DE', 'IN', 'BR', 'JP')), None
+        ))
+    user_loader.flush()
+    log(f"users: {user_loader.loaded} ({time.monotonic() - started:.1f}s)")
+
+    rng = random.Random(f'{seed}:tags')
+    tag_loader = loader('tags', ('id', 'name'))
+    for index in range(tags):
+        tag_loader.add((first_tag_id + index, f'{rng.choice(WORDS)}-{first_tag_id + index}'))
+    tag_loader.flush()
+
+    rng = random.Random(f'{seed}:decks')
+    deck_loader = loader('decks', ('id', 'user_id', 'name', 'description'))
+    deck_tag_loader = loader('deck_tags', ('deck_id', 'tag_id'))
+    for index in range(users * decks_per_user):
+        deck_id = first_deck_id + index
+        deck_loader.add((deck_id, first_user_id + index // decks_per_user, _sentence(rng, 2).title(), _sentence(rng, 6)))
+        if tags and rng.random() < 0.5:
+            deck_tag_loader.add((deck_id, first_tag_id + rng.randrange(tags)))
+    deck_loader.flush()
+    deck_tag_loader.flush()
+    log(f"decks: {deck_loader.loaded} ({time.monotonic() - started:.1f}s)")
+
+    rng = random.Random(f'{seed}:cards')
+    note_loader = loader('notes', ('id', 'user_id', 'note_type_id', 'field_values', 'created_at'))
+    note_tag_loader = loader('note_tags', ('note_id', 'tag_id'))
+    card_loader = loader('flashcards', (
+        'id', 'note_id', 'deck_id', 'card_type', 'due_date', 'intervals', 'ease_factor', 'reps', 'lapses',
+        'last_reviewed', 'created_at'
+    ))
+    # Note n and flashcard n belong to deck n // cards_per_deck, so review
+    # generation can compute a card's owner without looking it up.
+    for index in range(users * cards_per_user):
+        note_id = first_note_id + index
+        created_at = _random_moment(rng, now, days)
+        field_values = json.dumps({'Front': f'What is {_sentence(rng, 2)}?', 'Back': _sentence(rng, 8)})
+        note_loader.add((note_id, first_user_id + index // cards_per_user, 1, field_values, created_at))
+        for tag_index in rng.sample(range(tags), min(rng.choice((0, 0, 1, 2)), tags)):
+            note_tag_loader.add((note_id, first_tag_id + tag_index))
+
+        card_type = rng.choices(CARD_TYPES, CARD_TYPE_WEIGHTS)[0]
+        if card_type == 'new':
+            card_loader.add((first_card_id + index, note_id, first_deck_id + index // cards_per_deck, 'new',
+                             created_at.date(), 0, 2.5, 0, 0, None, created_at))
+        else:
+            intervals = rng.randint(1, 120) if card_type == 'review' else 0
+            card_loader.add((
+                first_card_id + index, note_id, first_deck_id + index // cards_per_deck, card_type,
+                today + timedelta(days=rng.randint(-10, intervals)), intervals, round(rng.uniform(1.3, 3.0), 2),
+                rng.randint(1, 30), rng.randint(0, 5), _random_moment(rng, now, 30), created_at
+            ))
+    note_loader.flush()
+    note_tag_loader.flush()
+    card_loader.flush()
+    log(f"notes/flashcards: {card_loader.loaded} ({time.monotonic() - started:.1f}s)")
+
+    rng = random.Random(f'{seed}:reviews')
+    review_loader = loader('review_logs', (
+        'flashcard_id', 'user_id', 'rating', 'review_time', 'intervals_before', 'intervals_after',
+        'ease_factor_before', 'ease_factor_after', 'duration_seconds'
+    ))
+    points = [0] * users
+    review_counts = [0] * users
+    # Days before today of each user's latest review, and the days reviewed
+    # (bit i = i days before today) for the streak columns.
+    last_days_ago = [None] * users
+    activity_bits = [0] * users
+    for _ in range(reviews):
+        user_index = min(int(users * rng.random() ** skew), users - 1)
+        card_index = user_index * cards_per_user + rng.randrange(cards_per_user)
+        days_ago = int(rng.random() ** 2 * days)
+        rating = rng.choices((1, 2, 3), RATING_WEIGHTS)[0]
+        intervals_before = rng.randint(0, 60)
+        ease_factor_before = round(rng.uniform(1.3, 3.0), 2)
+        review_loader.add((
+            first_card_id + card_index, first_user_id + user_index, rating,
+            now - timedelta(days=days_ago, seconds=rng.randrange(86400)),
+            intervals_before, 1 if rating == 1 else max(1, int(intervals_before * (1.5 + rating / 2))),
+            ease_factor_before, max(1.3, round(ease_factor_before + (rating - 2) * 0.15, 2)), rng.randint(2, 40)
+        ))
+        points[user_index] += POINTS_BY_RATING[rating]
+        review_counts[user_index] += 1
+        if last_days_ago[user_index] is None or days_ago < last_days_ago[user_index]:
+            last_days_ago[user_index] = days_ago
+        activity_bits[user_index] |= 1 << days_ago
+    review_loader.flush()
+    log(f"review_logs: {review_loader.loaded} ({time.monotonic() - started:.1f}s)")
+
+    stats_loader = loader('user_stats', (
+        'user_id', 'points', 'total_reviews', 'last_reviewed_date', 'review_streak_days', 'longest_streak_days',
+        'activity_bitmap'
+    ))
+    for user_index in range(users):
+        if not review_counts[user_index]:
+            continue
+        # Re-anchor the history on the last review day, as streaks.py stores it.
+        history = activity_bits[user_index] >> last_days_ago[user_index]
+        stats_loader.add((
+            first_user_id + user_index, points[user_index], review_counts[user_index],
+            today - timedelta(days=last_days_ago[user_index]),
+            _longest_run(history & ~(history + 1)), _longest_run(history),
+            history & ((1 << ACTIVITY_WINDOW_DAYS) - 1)
+        ))
+    stats_loader.flush()
+
+    backfill_daily_review_stats(connection)
+    rebuild_all_deck_stats(connection)
+    log(f"user_stats, review_daily_stats and deck_stats rebuilt ({time.monotonic() - started:.1f}s)")
+
+
+if __name__ == '__main__':
+    import config
+
+    parser = argparse.ArgumentParser(description='Fill the database with seeded synthetic users, decks, cards and reviews.')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--decks-per-user', type=int, default=3)
+    parser.add_argument('--cards-per-deck', type=int, default=50)
+    parser.add_argument('--reviews', type=int, default=100000, help='total review_logs rows')
+    parser.add_argument('--tags', type=int, default=200)
+    parser.add_argument('--days', type=int, default=365, help='history length in days')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skew', type=float, default=3.0, help='>1 concentrates reviews on fewer users')
+    parser.add_argument('--batch-size', type=int)
+    parser.add_argument('--infile', action='store_true', help='bulk load with LOAD DATA LOCAL INFILE')
+    args = parser.parse_args()
+
+    db_connection = MySQLdb.connect(
+        host=config.DB_HOST,
+        user=config.DB_USER,
+        passwd=config.DB_PASSWORD,
+        db=config.DB_NAME,
+        port=config.DB_PORT,
+        charset='utf8',
+        cursorclass=cursors.DictCursor,
+        local_infile=int(args.infile)
+    )
+    try:
+        populate(
+            db_connection, users=args.users, decks_per_user=args.decks_per_user, cards_per_deck=args.cards_per_deck,
+            reviews=args.reviews, tags=args.tags, days=args.days, seed=args.seed, skew=args.skew,
+            batch_size=args.batch_size, infile=args.infile
+        )
+    finally:
+        db_connection.close()
@@ -0,0 +1,149 @@
+# query_audit.py
+
+import logging
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import request
+
+from metrics import begin_statement_log, end_statement_log, fingerprint
+
+try:
+    import pytest
+except ImportError:  # pragma: no cover - the fixture is only needed under pytest
+    pytest = None
+
+logger = logging.getLogger(__name__)
+EXPLAINABLE_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE')
+# Called with the QueryReport of every request while non-empty (see query_budget).
+_report_listeners = []
+
+
+class QueryReport:
+    """The statements one request executed."""
+
+    def __init__(self, endpoint, method, statements):
+        self.endpoint = endpoint
+        self.method = method
+        self.statements = statements
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self, threshold):
+        """[(fingerprint, count)] of statement shapes executed at least ``threshold`` times."""
+        counts = Counter(fingerprint(statement) for statement, _, _, _ in self.statements)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+    def slow(self, budget_seconds):
+        return [entry for entry in self.statements if entry[2] > budget_seconds]
+
+    def describe(self):
+        return f"{self.method} {self.endpoint}: {self.count} statements"
+
+
+class QueryAuditor:
+    """Opt-in (QUERY_AUDIT) auditor of the statements each request executes.
+
+    Logs a warning when a statement shape repeats QUERY_AUDIT_REPEAT_THRESHOLD
+    times or more in one request, the usual sign of a query inside a Python
+    loop, and logs the EXPLAIN plan of statements slower than
+    QUERY_AUDIT_SLOW_MS. Responses carry an X-Query-Count header. Meant for
+    development and tests; EXPLAIN adds a round trip per slow statement.
+    """
+
+    def __init__(self, app=None, mysql=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app, mysql)
+
+    def init_app(self, app, mysql):
+        app.config.setdefault('QUERY_AUDIT', False)
+        app.config.setdefault('QUERY_AUDIT_REPEAT_THRESHOLD', 5)
+        app.config.setdefault('QUERY_AUDIT_SLOW_MS', 100)
+        self.mysql = mysql
+        self.enabled = bool(app.config['QUERY_AUDIT'])
+        self.repeat_threshold = int(app.config['QUERY_AUDIT_REPEAT_THRESHOLD'])
+        self.slow_seconds = float(app.config['QUERY_AUDIT_SLOW_MS']) / 1000
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        if self.enabled or _report_listeners:
+            begin_statement_log()
+
+    def _after_request(self, response):
+        statements = end_statement_log()
+        if statements is None:
+            return response
+
+        report = QueryReport(request.endpoint or 'unmatched', request.method, statements)
+        for listener in list(_report_listeners):
+            listener(report)
+        if self.enabled:
+            self._log(report)
+            response.headers['X-Query-Count'] = str(report.count)
+        return response
+
+    def _log(self, report):
+        for shape, count in report.repeated(self.repeat_threshold):
+            logger.warning("Possible N+1 in %s: %d x %s", report.describe(), count, shape)
+        for statement, args, elapsed, many in report.slow(self.slow_seconds):
+            logger.warning("Slow statement in %s (%.1f ms): %s", report.describe(), elapsed * 1000, fingerprint(statement))
+            if not many:
+                self._log_explain(statement, args)
+
+    def _log_explain(self, statement, args):
+        text = statement.decode('utf-8', 'replace') if isinstance(statement, bytes) else statement
+        if not text.lstrip().upper().startswith(EXPLAINABLE_STATEMENTS):
+            return
+        cur = None
+        try:
+            cur = self.mysql.connection.cursor()
+            cur.execute(f"EXPLAIN {text}", args)
+            for row in cur.fetchall():
+                logger.warning("  EXPLAIN %s", dict(row))
+        except Exception:
+            logger.exception("EXPLAIN failed for %s", fingerprint(statement))
+        finally:
+            if cur:
+                cur.close()
+
+
+@contextmanager
+def query_budget(max_queries, max_repeats=None):
+    """Fail (AssertionError) when a request made inside the block executes more
+    than ``max_queries`` statements, or one statement shape more than
+    ``max_repeats`` times. Yields the list of QueryReports collected.
+
+        with query_budget(6, max_repeats=1):
+            client.get('/api/decks')
+
+    Works whether or not QUERY_AUDIT is on, as long as the app has a QueryAuditor.
+    """
+    reports = []
+    _report_listeners.append(reports.append)
+    try:
+        yield reports
+    finally:
+        _report_listeners.remove(reports.append)
+
+    failures = []
+    for report in reports:
+        if report.count > max_queries:
+            shapes = ''.join(f"\n    {count} x {shape}" for shape, count in report.repeated(1)[:10])
+            failures.append(f"{report.describe()}, budget {max_queries}:{shapes}")
+        if max_repeats is not None:
+            for shape, count in report.repeated(max_repeats + 1):
+                failures.append(f"{report.describe()}: {count} x {shape} (at most {max_repeats} allowed)")
+    if failures:
+        raise AssertionError("Query budget exceeded:\n  " + "\n  ".join(failures))
+
+
+if pytest is not None:
+    @pytest.fixture(name='query_budget')
+    def query_budget_fixture():
+        """The query_budget context manager; load with ``pytest -p query_audit``
+        or ``pytest_plugins = ['query_audit']``."""
+        return query_budget
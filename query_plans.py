@@ -0,0 +1,95 @@
+# query_plans.py
+
+from datetime import date, datetime, timedelta
+
+from card_queries import build_fulltext_query, card_search_query, deck_cards_query
+from deck_stats import DECK_LIST_QUERY
+from leaderboard import (
+    LEADERBOARD_SNAPSHOT_SIZE, LEADERBOARD_TOP_QUERY, LEADERBOARD_RECENT_REVIEWERS_QUERY, LEADERBOARD_PAGE_QUERY
+)
+from review_stats import RECENT_ACTIVITY_QUERY, DAILY_REVIEW_STATS_QUERY
+from study_sessions import NEW_CARDS_QUERY, DUE_CARDS_QUERY
+
+# Access types that read a whole table or a whole index.
+FULL_SCAN_TYPES = ('ALL', 'index')
+# Paged queries whose order an index must provide: a filesort or temporary
+# table there sorts every matching row to return one page.
+INDEX_ORDERED_QUERIES = ('study_queue_due', 'card_search_recent', 'deck_cards_page', 'leaderboard_page')
+SORTING_EXTRAS = ('Using filesort', 'Using temporary')
+
+# (name, build) of the hot queries: build(parameters) returns the
+# (statement, args) the route runs, with parameters from sample_parameters().
+# The statements are the routes' own, so a query changed there is checked here.
+HOT_QUERIES = (
+    ('study_queue_new', lambda p: (NEW_CARDS_QUERY, (p['deck_id'], p['user_id'], 20))),
+    ('study_queue_due', lambda p: (DUE_CARDS_QUERY, (p['deck_id'], p['user_id'], p['today'], 100))),
+    ('leaderboard_top', lambda p: (LEADERBOARD_TOP_QUERY, (LEADERBOARD_SNAPSHOT_SIZE,))),
+    ('leaderboard_recent_reviewers', lambda p: (LEADERBOARD_RECENT_REVIEWERS_QUERY, (p['yesterday'],))),
+    ('leaderboard_page', lambda p: (LEADERBOARD_PAGE_QUERY, (50, 50, 0, 51))),
+    ('recent_activity', lambda p: (RECENT_ACTIVITY_QUERY, (p['user_id'],))),
+    ('daily_review_stats', lambda p: (DAILY_REVIEW_STATS_QUERY, (p['user_id'], p['month_ago'].date(), p['today']))),
+    ('deck_cards_page', lambda p: deck_cards_query(p['deck_id'], p['user_id'], 100, (p['month_ago'], 0))),
+    ('card_search_recent', lambda p: card_search_query(p['user_id'], 100)),
+    ('card_search_fulltext', lambda p: card_search_query(
+        p['user_id'], 100, p['word'], build_fulltext_query(p['word']))),
+    ('deck_list', lambda p: (DECK_LIST_QUERY, (p['user_id'],))),
+)
+
+
+def sample_parameters(cur):
+    """Parameters for HOT_QUERIES taken from the busiest user and one of their decks."""
+    cur.execute("SELECT user_id FROM user_stats ORDER BY points DESC LIMIT 1")
+    user_row = cur.fetchone()
+    user_id = user_row['user_id'] if user_row else 1
+    cur.execute("SELECT id FROM decks WHERE user_id = %s ORDER BY id LIMIT 1", (user_id,))
+    deck_row = cur.fetchone()
+    today = date.today()
+    return {
+        'user_id': user_id,
+        'deck_id': deck_row['id'] if deck_row else 1,
+        'today': today,
+        'yesterday': today - timedelta(days=1),
+        'month_ago': datetime.combine(today - timedelta(days=30), datetime.min.time()),
+        'word': 'gene',
+    }
+
+
+def explain_hot_queries(connection):
+    """Return {query name: EXPLAIN rows}."""
+    cur = connection.cursor()
+    try:
+        parameters = sample_parameters(cur)
+        plans = {}
+        for name, build in HOT_QUERIES:
+            statement, args = build(parameters)
+            cur.execute(f"EXPLAIN {statement}", args)
+            plans[name] = list(cur.fetchall())
+        return plans
+    finally:
+        cur.close()
+
+
+def check_query_plans(connection):
+    """EXPLAIN every hot query and describe each table it reads without an
+    index, and each sort of the INDEX_ORDERED_QUERIES.
+
+    Returns [] when all of them use indexes. Run it on realistically sized
+    data (see populate_leaderboard.py): on near-empty tables MySQL prefers
+    full scans even when a usable index exists.
+    """
+    problems = []
+    for name, rows in explain_hot_queries(connection).items():
+        for row in rows:
+            if name in INDEX_ORDERED_QUERIES:
+                sorts = [extra for extra in SORTING_EXTRAS if extra in (row.get('Extra') or '')]
+                if sorts:
+                    problems.append(f"{name}: {row.get('table')} read with {' and '.join(sorts)}")
+            # <derivedN> is a materialized page of a subquery, at most its LIMIT rows.
+            if row.get('table') is None or row['table'].startswith('<derived'):
+                continue
+            if row.get('type') in FULL_SCAN_TYPES or row.get('key') is None:
+                problems.append(
+                    f"{name}: {row['table']} read with type={row.get('type')} key={row.get('key')} "
+                    f"(possible keys: {row.get('possible_keys')}, rows: {row.get('rows')})"
+                )
+    return problems
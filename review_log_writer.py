@@ -0,0 +1,205 @@
+# review_log_writer.py
+
+import atexit
+import os
+import queue
+import threading
+import time
+import traceback
+
+import MySQLdb
+
+REVIEW_LOG_COLUMNS = (
+    'flashcard_id', 'user_id', 'rating', 'review_time', 'intervals_before',
+    'intervals_after', 'ease_factor_before', 'ease_factor_after', 'duration_seconds'
+)
+FLUSH_ATTEMPTS = 3
+# Errors caused by the rows themselves (e.g. a card deleted before its log
+# was flushed); retrying the same rows cannot succeed.
+ROW_ERRORS = (MySQLdb.IntegrityError, MySQLdb.DataError)
+
+
+class ReviewLogWriter:
+    """Optional write-behind buffer for review_logs rows.
+
+    Review endpoints hand their rows to submit() after committing; a daemon
+    thread writes them with multi-row INSERTs whenever ``flush_rows`` are
+    waiting or ``flush_interval`` seconds have passed. The queue is bounded:
+    submit() blocks up to ``enqueue_timeout`` for space and returns the rows
+    it could not queue so the caller can write them itself. Pending rows are
+    flushed on interpreter shutdown. Connection errors are retried; rows
+    still failing after FLUSH_ATTEMPTS are dropped. A batch rejected for one
+    of its rows (ROW_ERRORS) is split in halves until only the offending
+    rows are left out. Both are counted in stats().
+    """
+
+    def __init__(self, pool, enabled=False, max_queue=10000, flush_rows=500,
+                 flush_interval=1.0, enqueue_timeout=0.5):
+        self.pool = pool
+        self.enabled = enabled
+        self.max_queue = max(1, int(max_queue))
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = float(flush_interval)
+        self.enqueue_timeout = float(enqueue_timeout)
+        self._lock = threading.Lock()
+        self._reset_state()
+        if enabled:
+            atexit.register(self.close)
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._metrics = {
+            'rows_enqueued': 0,
+            'rows_written': 0,
+            'rows_rejected': 0,
+            'rows_dropped': 0,
+            'rows_invalid': 0,
+            'flushes': 0,
+            'flush_failures': 0,
+            'flush_seconds_total': 0.0,
+            'flush_seconds_max': 0.0,
+            'flush_seconds_last': 0.0,
+        }
+
+    def _ensure_started(self):
+        # The flusher thread does not survive a fork; each worker starts its own.
+        if os.getpid() != self._pid:
+            self._reset_state()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='review-log-writer', daemon=True)
+                    self._thread.start()
+
+    def submit(self, rows):
+        """Queue rows for writing; returns the rows that did not fit (possibly [])."""
+        self._ensure_started()
+        deadline = time.monotonic() + self.enqueue_timeout
+        for index, row in enumerate(rows):
+            try:
+                self._queue.put(row, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                rejected = list(rows[index:])
+                with self._lock:
+                    self._metrics['rows_enqueued'] += index
+                    self._metrics['rows_rejected'] += len(rejected)
+                return rejected
+        with self._lock:
+            self._metrics['rows_enqueued'] += len(rows)
+        return []
+
+    def _next_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            if self._stopping.is_set():
+                remaining = 0
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _write(self, batch):
+        entry = self.pool.acquire()
+        try:
+            cur = entry.connection.cursor()
+            try:
+                cur.execute(
+                    f"""
+                    INSERT INTO review_logs ({', '.join(REVIEW_LOG_COLUMNS)})
+                    VALUES {', '.join(['(' + ', '.join(['%s'] * len(REVIEW_LOG_COLUMNS)) + ')'] * len(batch))}
+                    """,
+                    tuple(value for row in batch for value in row)
+                )
+                entry.connection.commit()
+            except Exception:
+                entry.connection.rollback()
+                raise
+            finally:
+                cur.close()
+        finally:
+            self.pool.release(entry)
+
+    def _write_with_retries(self, rows):
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                self._write(rows)
+                return
+            except MySQLdb.OperationalError:
+                traceback.print_exc()
+                with self._lock:
+                    self._metrics['flush_failures'] += 1
+                if attempt == FLUSH_ATTEMPTS:
+                    raise
+                time.sleep(0.1 * 2 ** attempt)
+
+    def _write_isolating(self, rows):
+        """Write rows, leaving out only those rejected for their own content."""
+        try:
+            self._write_with_retries(rows)
+        except ROW_ERRORS:
+            if len(rows) == 1:
+                # The row itself stays out of the logs; rows_invalid counts it.
+                traceback.print_exc()
+                with self._lock:
+                    self._metrics['rows_invalid'] += 1
+                return
+            middle = len(rows) // 2
+            self._write_isolating(rows[:middle])
+            self._write_isolating(rows[middle:])
+            return
+        except Exception as e:
+            # Retries exhausted (already logged and counted), or an error no
+            # retry would fix.
+            transient = isinstance(e, MySQLdb.OperationalError)
+            if not transient:
+                traceback.print_exc()
+            with self._lock:
+                self._metrics['flush_failures'] += 0 if transient else 1
+                self._metrics['rows_dropped'] += len(rows)
+            return
+        with self._lock:
+            self._metrics['rows_written'] += len(rows)
+
+    def _flush(self, batch):
+        started = time.monotonic()
+        self._write_isolating(batch)
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._metrics['flushes'] += 1
+            self._metrics['flush_seconds_total'] += elapsed
+            self._metrics['flush_seconds_last'] = elapsed
+            self._metrics['flush_seconds_max'] = max(self._metrics['flush_seconds_max'], elapsed)
+
+    def close(self, timeout=10.0):
+        """Flush pending rows and stop the flusher thread."""
+        if self._thread is None or os.getpid() != self._pid:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        stats['enabled'] = self.enabled
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_capacity'] = self.max_queue
+        stats['flush_seconds_avg'] = stats['flush_seconds_total'] / stats['flushes'] if stats['flushes'] else 0.0
+        return stats
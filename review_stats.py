@@ -0,0 +1,146 @@
+# review_stats.py
+
+from collections import defaultdict
+
+import MySQLdb
+from MySQLdb import cursors
+
+BACKFILL_CHUNK_SIZE = 200
+
+
+def daily_reviews_statement(user_id, reviews):
+    """The (statement, parameters) upsert adding reviews to the user's
+    review_daily_stats rows, or None when there are no reviews.
+
+    ``reviews`` is an iterable of (review_time, rating, duration_seconds)
+    tuples; they are grouped per day so a batch costs one upsert.
+    """
+    days = defaultdict(lambda: [0, 0, 0, 0, 0, 0])
+    for review_time, rating, duration_seconds in reviews:
+        day = days[review_time.date()]
+        day[0] += 1
+        day[1] += rating
+        day[1 + rating] += 1
+        day[5] += duration_seconds or 0
+    if not days:
+        return None
+
+    rows = [(user_id, review_date, *counts) for review_date, counts in days.items()]
+    return (
+        f"""
+        INSERT INTO review_daily_stats
+            (user_id, review_date, review_count, rating_sum, hard_count, good_count, easy_count, seconds_studied)
+        VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s)'] * len(rows))}
+        ON DUPLICATE KEY UPDATE
+            review_count = review_count + VALUES(review_count),
+            rating_sum = rating_sum + VALUES(rating_sum),
+            hard_count = hard_count + VALUES(hard_count),
+            good_count = good_count + VALUES(good_count),
+            easy_count = easy_count + VALUES(easy_count),
+            seconds_studied = seconds_studied + VALUES(seconds_studied)
+        """,
+        tuple(value for row in rows for value in row)
+    )
+
+
+def record_daily_reviews(cur, user_id, reviews):
+    """Add reviews to the user's review_daily_stats rows (see daily_reviews_statement)."""
+    statement = daily_reviews_statement(user_id, reviews)
+    if statement:
+        cur.execute(*statement)
+
+
+RECENT_ACTIVITY_QUERY = """
+    SELECT
+        rl.review_time,
+        rl.rating,
+        f.id as flashcard_id,
+        d.name as deck_name,
+        rl.id as review_id
+    FROM review_logs rl
+    JOIN flashcards f ON rl.flashcard_id = f.id
+    JOIN decks d ON f.deck_id = d.id
+    WHERE rl.user_id = %s
+    ORDER BY rl.review_time DESC
+    LIMIT 10
+"""
+DAILY_REVIEW_STATS_QUERY = """
+    SELECT review_date, review_count, rating_sum, hard_count, good_count, easy_count, seconds_studied
+    FROM review_daily_stats
+    WHERE user_id = %s AND review_date BETWEEN %s AND %s
+    ORDER BY review_date ASC
+"""
+
+
+def fetch_daily_review_stats(cur, user_id, start_date, end_date):
+    """Return {date: row} for the user's days with reviews in [start_date, end_date]."""
+    cur.execute(DAILY_REVIEW_STATS_QUERY, (user_id, start_date, end_date))
+    return {row['review_date']: row for row in cur.fetchall()}
+
+
+def rebuild_daily_review_stats(cur, user_ids):
+    """Recompute the rollup rows of the given users from review_logs."""
+    if not user_ids:
+        return
+    placeholders = ','.join(['%s'] * len(user_ids))
+    cur.execute(f"DELETE FROM review_daily_stats WHERE user_id IN ({placeholders})", tuple(user_ids))
+    cur.execute(f"""
+        INSERT INTO review_daily_stats
+            (user_id, review_date, review_count, rating_sum, hard_count, good_count, easy_count, seconds_studied)
+        SELECT
+            user_id,
+            DATE(review_time),
+            COUNT(*),
+            SUM(rating),
+            SUM(rating = 1),
+            SUM(rating = 2),
+            SUM(rating = 3),
+            COALESCE(SUM(duration_seconds), 0)
+        FROM review_logs
+        WHERE user_id IN ({placeholders})
+        GROUP BY user_id, DATE(review_time)
+    """, tuple(user_ids))
+
+
+def backfill_daily_review_stats(connection, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Rebuild review_daily_stats for every user.
+
+    Users are walked by id in chunks and each chunk is aggregated by MySQL
+    and committed on its own, so neither the log rows nor the whole rebuild
+    have to fit in memory or in one transaction.
+    """
+    cur = connection.cursor()
+    try:
+        rebuilt = 0
+        last_user_id = 0
+        while True:
+            cur.execute("SELECT id FROM users WHERE id > %s ORDER BY id LIMIT %s", (last_user_id, chunk_size))
+            user_ids = [row['id'] for row in cur.fetchall()]
+            if not user_ids:
+                break
+            rebuild_daily_review_stats(cur, user_ids)
+            connection.commit()
+            rebuilt += len(user_ids)
+            last_user_id = user_ids[-1]
+        return rebuilt
+    finally:
+        cur.close()
+
+
+if __name__ == '__main__':
+    import config
+
+    db_connection = MySQLdb.connect(
+        host=config.DB_HOST,
+        user=config.DB_USER,
+        passwd=config.DB_PASSWORD,
+        db=config.DB_NAME,
+        port=config.DB_PORT,
+        charset='utf8',
+        cursorclass=cursors.DictCursor
+    )
+    try:
+        users_rebuilt = backfill_daily_review_stats(db_connection)
+        print(f"Rebuilt daily review stats for {users_rebuilt} users.")
+    finally:
+        db_connection.close()
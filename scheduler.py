@@ -0,0 +1,81 @@
+# scheduler.py
+
+from datetime import timedelta
+
+import numpy as np
+
+MIN_EASE_FACTOR = 1.3
+MAX_EASE_FACTOR = 5.0
+
+
+def schedule_reviews(card_types, intervals, ease_factors, reps, lapses, ratings, ease_bonus):
+    """Compute the next scheduling state for many cards at once.
+
+    Every argument is an array (or anything np.asarray accepts) of the same
+    length; ease_bonus may also be a scalar. Ratings use the review_logs
+    encoding: 1 = hard, 2 = good, 3 = easy. Returns a dict of arrays with the
+    new card_type, intervals (whole days, at least 1), ease_factor, reps and
+    lapses.
+    """
+    card_types = np.asarray(card_types, dtype=str)
+    intervals = np.asarray(intervals, dtype=np.float64)
+    ease_factors = np.asarray(ease_factors, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.int64)
+    lapses = np.asarray(lapses, dtype=np.int64)
+    ratings = np.asarray(ratings, dtype=np.int64)
+    ease_bonus = np.asarray(ease_bonus, dtype=np.float64)
+
+    is_new = card_types == 'new'
+    is_learning = card_types == 'learning'
+    easy = ratings == 3
+    good = ratings == 2
+    hard = ratings == 1
+
+    # np.rint rounds half to even, like the built-in round() this replaces.
+    new_intervals = np.select(
+        [easy & is_new, easy & is_learning, easy,
+         good & is_new, good & is_learning, good,
+         hard],
+        [4, 1, np.rint(intervals * ease_factors * ease_bonus),
+         1, np.maximum(1, np.rint(intervals * 1.2)), np.rint(intervals * ease_factors),
+         1],
+        default=intervals
+    )
+
+    new_card_types = np.select(
+        [easy, good & is_new, hard],
+        ['review', 'learning', 'learning'],
+        default=card_types
+    )
+
+    new_ease_factors = np.select(
+        [easy, hard],
+        [ease_factors + 0.15, np.maximum(MIN_EASE_FACTOR, ease_factors - 0.20)],
+        default=ease_factors
+    )
+
+    return {
+        'card_type': new_card_types,
+        'intervals': np.maximum(1, np.rint(new_intervals)).astype(np.int64),
+        'ease_factor': np.clip(new_ease_factors, MIN_EASE_FACTOR, MAX_EASE_FACTOR),
+        'reps': reps + 1,
+        'lapses': lapses + hard
+    }
+
+
+def schedule_review(card_type, interval, ease_factor, reps, lapses, rating, ease_bonus, review_day):
+    """Single-card wrapper around schedule_reviews.
+
+    Returns plain Python values plus the due_date, counted from review_day.
+    """
+    result = schedule_reviews([card_type], [interval], [ease_factor], [reps], [lapses], [rating], ease_bonus)
+    final_interval_days = int(result['intervals'][0])
+
+    return {
+        'card_type': str(result['card_type'][0]),
+        'due_date': review_day + timedelta(days=final_interval_days),
+        'intervals': final_interval_days,
+        'ease_factor': float(result['ease_factor'][0]),
+        'reps': int(result['reps'][0]),
+        'lapses': int(result['lapses'][0])
+    }
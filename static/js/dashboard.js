@@ -275,6 +275,20 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  function renderDecks(decks) {
+    if (!decksGrid) return;
+    decksGrid.innerHTML = ""; // Clear loading message
+    if (decks.length === 0) {
+      decksGrid.innerHTML = "<p>No decks found. Create your first deck!</p>";
+    } else {
+      decks.forEach((deck, index) => {
+        const deckCardElement = createDeckCardElement(deck);
+        deckCardElement.style.animationDelay = `${index * 0.05}s`;
+        decksGrid.appendChild(deckCardElement);
+      });
+    }
+  }
+
   async function loadDecks() {
     if (!decksGrid) {
         console.warn("decksGrid element not found. Cannot load decks.");
@@ -293,16 +307,7 @@ document.addEventListener("DOMContentLoaded", () => {
       const result = await response.json();
 
       if (result.success && result.decks) {
-        decksGrid.innerHTML = ""; // Clear loading message
-        if (result.decks.length === 0) {
-          decksGrid.innerHTML = "<p>No decks found. Create your first deck!</p>";
-        } else {
-          result.decks.forEach((deck, index) => {
-            const deckCardElement = createDeckCardElement(deck);
-            deckCardElement.style.animationDelay = `${index * 0.05}s`;
-            decksGrid.appendChild(deckCardElement);
-          });
-        }
+        renderDecks(result.decks);
       } else {
         decksGrid.innerHTML = `<p>Error loading decks: ${escapeHtml(result.errors?.general) || 'Unknown error'}</p>`;
       }
@@ -312,6 +317,16 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  function renderDashboardStats(stats) {
+    // console.log("Stats object:", stats);
+    if (statsTotalDecksElement) statsTotalDecksElement.textContent = stats.total_decks !== undefined ? stats.total_decks : 'N/A';
+    if (statsCardsMasteredElement) statsCardsMasteredElement.textContent = stats.cards_mastered !== undefined ? stats.cards_mastered : 'N/A';
+    
+    if (statsUserPointsElement) {
+        statsUserPointsElement.textContent = stats.points !== undefined ? stats.points.toLocaleString() : 'N/A';
+    }
+  }
+
   async function loadDashboardStats() {
     // console.log("loadDashboardStats called");
     if (statsTotalDecksElement) statsTotalDecksElement.textContent = '...';
@@ -335,14 +350,7 @@ document.addEventListener("DOMContentLoaded", () => {
       // console.log("Dashboard stats API result:", result);
 
       if (result.success && result.stats) {
-        const stats = result.stats;
-        // console.log("Stats object:", stats);
-        if (statsTotalDecksElement) statsTotalDecksElement.textContent = stats.total_decks !== undefined ? stats.total_decks : 'N/A';
-        if (statsCardsMasteredElement) statsCardsMasteredElement.textContent = stats.cards_mastered !== undefined ? stats.cards_mastered : 'N/A';
-        
-        if (statsUserPointsElement) {
-            statsUserPointsElement.textContent = stats.points !== undefined ? stats.points.toLocaleString() : 'N/A';
-        }
+        renderDashboardStats(result.stats);
       } else {
         console.error("API returned error for dashboard stats:", result);
         if (statsTotalDecksElement) statsTotalDecksElement.textContent = 'Error';
@@ -358,6 +366,26 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   // --- Card Browser Tab Functions ---
+  function renderTagsFilter(tags) {
+    if (!tagFilterSelect) return;
+    tagFilterSelect.innerHTML = ''; 
+    if (tags.length === 0) {
+        const noTagsOption = document.createElement('option');
+        noTagsOption.textContent = "No tags available";
+        noTagsOption.disabled = true; 
+        tagFilterSelect.appendChild(noTagsOption);
+    } else {
+        tags.forEach(tag => {
+            const option = document.createElement('option');
+            option.value = tag.id;
+            option.textContent = escapeHtml(tag.name);
+            tagFilterSelect.appendChild(option);
+        });
+    }
+    // console.log("Tags loaded and populated into select:", tags.length);
+    tagsLoadedSuccessfully = true;
+  }
+
   async function loadTagsForFilter() {
     if (!tagFilterSelect) {
         console.warn("tagFilterSelect element not found.");
@@ -376,24 +404,9 @@ document.addEventListener("DOMContentLoaded", () => {
             return;
         }
         const result = await response.json();
-        tagFilterSelect.innerHTML = ''; 
 
         if (result.success && result.tags) {
-            if (result.tags.length === 0) {
-                const noTagsOption = document.createElement('option');
-                noTagsOption.textContent = "No tags available";
-                noTagsOption.disabled = true; 
-                tagFilterSelect.appendChild(noTagsOption);
-            } else {
-                result.tags.forEach(tag => {
-                    const option = document.createElement('option');
-                    option.value = tag.id;
-                    option.textContent = escapeHtml(tag.name);
-                    tagFilterSelect.appendChild(option);
-                });
-            }
-            // console.log("Tags loaded and populated into select:", result.tags.length);
-            tagsLoadedSuccessfully = true;
+            renderTagsFilter(result.tags);
         } else {
             console.error("API error fetching tags:", result.errors);
             tagFilterSelect.innerHTML = '<option value="" disabled selected>Error: No tags or API issue</option>';
@@ -406,6 +419,53 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  function renderDecksFilter(decks) {
+    if (!deckFilterSelect) return;
+    deckFilterSelect.innerHTML = '<option value="">All Decks</option>'; 
+    decks.forEach(deck => {
+        const option = document.createElement('option');
+        option.value = deck.id;
+        option.textContent = escapeHtml(deck.name);
+        deckFilterSelect.appendChild(option);
+    });
+    deckFilterSelect.value = ""; 
+    // console.log("Decks loaded for filter:", decks.length);
+    decksLoadedSuccessfully = true;
+  }
+
+  // Loads decks, stats and filter options in one request. The server sends an
+  // ETag, so the browser revalidates and gets a 304 when nothing changed.
+  async function loadDashboardBootstrap() {
+    if (decksGrid) decksGrid.innerHTML = "<p>Loading decks...</p>";
+    if (statsTotalDecksElement) statsTotalDecksElement.textContent = '...';
+    if (statsCardsMasteredElement) statsCardsMasteredElement.textContent = '...';
+    if (statsUserPointsElement) statsUserPointsElement.textContent = '...';
+
+    try {
+      const response = await fetch("/api/dashboard/bootstrap");
+      if (!response.ok) {
+        if (response.status === 401) {
+          window.location.href = '/auth?tab=login&next=' + encodeURIComponent(window.location.pathname);
+          return;
+        }
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      const result = await response.json();
+      if (!result.success) {
+        throw new Error(result.errors?.general || 'Unknown error');
+      }
+
+      renderDecks(result.decks || []);
+      renderDashboardStats(result.stats || {});
+      renderTagsFilter(result.tags || []);
+      renderDecksFilter(result.decks || []);
+    } catch (error) {
+      console.error("Failed to load dashboard bootstrap, falling back to separate requests:", error);
+      if (decksGrid) loadDecks();
+      loadDashboardStats();
+    }
+  }
+
   async function loadDecksForFilter() {
     if (!deckFilterSelect) {
         console.warn("deckFilterSelect element not found.");
@@ -425,20 +485,11 @@ document.addEventListener("DOMContentLoaded", () => {
             return;
         }
         const result = await response.json();
-        deckFilterSelect.innerHTML = defaultAllDecksOptionHTML; 
 
         if (result.success && result.decks) {
-            if (result.decks.length > 0) {
-                result.decks.forEach(deck => {
-                    const option = document.createElement('option');
-                    option.value = deck.id;
-                    option.textContent = escapeHtml(deck.name);
-                    deckFilterSelect.appendChild(option);
-                });
-            }
-            // console.log("Decks loaded for filter:", result.decks.length);
-            decksLoadedSuccessfully = true;
+            renderDecksFilter(result.decks);
         } else {
+            deckFilterSelect.innerHTML = defaultAllDecksOptionHTML; 
             console.error("API error fetching decks for filter:", result.errors);
             decksLoadedSuccessfully = false;
         }
@@ -457,18 +508,18 @@ document.addEventListener("DOMContentLoaded", () => {
     createCustomDeckBtn.disabled = selectedCheckboxes.length === 0;
   }
 
-  function renderCardResults(cards) {
+  function renderCardResults(cards, append = false) {
     if (!cardResultsTbody || !cardBrowserInitialMessage || !loadingCardsMessage || !noCardsFoundMessage || !cardResultsTable) {
         console.error("renderCardResults: One or more card browser display elements are missing.");
         return;
     }
     // console.log("Rendering card results. Received cards count:", cards ? cards.length : 0);
 
-    cardResultsTbody.innerHTML = ''; 
+    if (!append) cardResultsTbody.innerHTML = ''; 
     cardBrowserInitialMessage.style.display = 'none';
     loadingCardsMessage.style.display = 'none';
 
-    if (!cards || cards.length === 0) {
+    if ((!cards || cards.length === 0) && !append) {
         noCardsFoundMessage.style.display = 'block';
         cardResultsTable.style.display = 'none';
         if(selectAllCardsCheckbox) {
@@ -513,6 +564,40 @@ document.addEventListener("DOMContentLoaded", () => {
     updateCreateCustomDeckButtonState(); 
   }
 
+  // Search results are paged; "Load more" follows the API's next_cursor.
+  let cardSearchUrl = null;
+  let cardSearchNextCursor = null;
+  const loadMoreCardsBtn = document.createElement('button');
+  loadMoreCardsBtn.type = 'button';
+  loadMoreCardsBtn.className = 'btn secondary-btn';
+  loadMoreCardsBtn.textContent = 'Load more';
+  loadMoreCardsBtn.style.display = 'none';
+  if (cardResultsTable) cardResultsTable.after(loadMoreCardsBtn);
+
+  function updateLoadMoreCardsButton(pagination) {
+    cardSearchNextCursor = pagination ? pagination.next_cursor : null;
+    loadMoreCardsBtn.style.display = cardSearchNextCursor ? 'inline-block' : 'none';
+  }
+
+  loadMoreCardsBtn.addEventListener('click', async () => {
+    if (!cardSearchUrl || !cardSearchNextCursor) return;
+    loadMoreCardsBtn.disabled = true;
+    try {
+        const response = await fetch(`${cardSearchUrl}&cursor=${encodeURIComponent(cardSearchNextCursor)}`);
+        const result = await response.json();
+        if (response.ok && result.success) {
+            renderCardResults(result.cards, true);
+            updateLoadMoreCardsButton(result.pagination);
+        } else {
+            console.error("Card search API returned error:", result);
+        }
+    } catch (error) {
+        console.error("Failed to load more cards:", error);
+    } finally {
+        loadMoreCardsBtn.disabled = false;
+    }
+  });
+
   async function searchUserCards() {
     if (!cardSearchInput || !tagFilterSelect || !deckFilterSelect || 
         !cardResultsTable || !noCardsFoundMessage || !cardBrowserInitialMessage || 
@@ -546,6 +631,7 @@ document.addEventListener("DOMContentLoaded", () => {
         selectAllCardsCheckbox.checked = false;
         selectAllCardsCheckbox.disabled = true;
     }
+    updateLoadMoreCardsButton(null);
 
     try {
         const apiUrl = `/api/cards/search?query=${encodeURIComponent(query)}&tags=${encodeURIComponent(tagIds)}&deck_id=${encodeURIComponent(selectedDeckId)}`;
@@ -562,7 +648,9 @@ document.addEventListener("DOMContentLoaded", () => {
         }
 
         if (response.ok && result.success) {
+            cardSearchUrl = apiUrl;
             renderCardResults(result.cards);
+            updateLoadMoreCardsButton(result.pagination);
         } else {
             let errorMessage = result.errors?.general || result.message || 'Unknown error from API';
             console.error("Card search API returned error:", errorMessage, result);
@@ -609,6 +697,7 @@ document.addEventListener("DOMContentLoaded", () => {
         if(cardResultsTable) cardResultsTable.style.display = 'none';
         if(noCardsFoundMessage) noCardsFoundMessage.style.display = 'none';
         if(cardBrowserInitialMessage) cardBrowserInitialMessage.style.display = 'block';
+        updateLoadMoreCardsButton(null);
         if(selectAllCardsCheckbox) {
             selectAllCardsCheckbox.checked = false;
             selectAllCardsCheckbox.disabled = true;
@@ -733,16 +822,14 @@ document.addEventListener("DOMContentLoaded", () => {
 
         // Load data based on the active tab
         if (initialTargetTab === 'browse') {
-            if (tagFilterSelect) loadTagsForFilter(); // Check element existence
-            if (deckFilterSelect) loadDecksForFilter(); // Check element existence
+            loadDashboardBootstrap();
             if (cardResultsTbody && cardResultsTbody.children.length === 0 && 
                 loadingCardsMessage && (loadingCardsMessage.style.display === 'none' || !loadingCardsMessage.style.display) &&
                 cardBrowserInitialMessage) {
                 cardBrowserInitialMessage.style.display = 'block';
             }
         } else if (initialTargetTab === 'decks') {
-            if(decksGrid) loadDecks();
-            loadDashboardStats();
+            loadDashboardBootstrap();
         }
     } else { 
         // Fallback if no tab is initially marked active
@@ -751,8 +838,7 @@ document.addEventListener("DOMContentLoaded", () => {
         if (decksContent && decksButton) {
             decksButton.classList.add('active');
             decksContent.classList.add('active');
-            if(decksGrid) loadDecks();
-            loadDashboardStats();
+            loadDashboardBootstrap();
         } else {
             console.error("Default 'decks' tab or its button not found for fallback initialization.");
         }
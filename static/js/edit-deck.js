@@ -11,6 +11,10 @@ document.addEventListener("DOMContentLoaded", () => {
     const deckId = pathParts[pathParts.length - 2]; 
 
     let currentCards = []; 
+    // Cards are loaded a page at a time as the list is scrolled.
+    let totalCardCount = 0;
+    let nextCardsCursor = null;
+    let loadingMoreCards = false;
 
         function escapeHtml(unsafe) {
         if (typeof unsafe !== 'string') return '';
@@ -47,7 +51,9 @@ document.addEventListener("DOMContentLoaded", () => {
                     : '<span>No tags</span>';
 
                 currentCards = result.cards;
-                cardCountSpan.textContent = currentCards.length;
+                totalCardCount = result.pagination ? result.pagination.total_entries : currentCards.length;
+                nextCardsCursor = result.pagination ? result.pagination.next_cursor : null;
+                cardCountSpan.textContent = totalCardCount;
                 renderCardsList();
             } else {
                 throw new Error(result.errors?.general || 'Failed to load deck data.');
@@ -59,6 +65,31 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
 
+    async function loadMoreCards() {
+        if (!nextCardsCursor || loadingMoreCards) return;
+        loadingMoreCards = true;
+        try {
+            const response = await fetch(`/api/decks/${deckId}/cards?cursor=${encodeURIComponent(nextCardsCursor)}`);
+            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+            const result = await response.json();
+            if (result.success) {
+                currentCards = currentCards.concat(result.cards);
+                nextCardsCursor = result.pagination.next_cursor;
+                renderCardsList();
+            }
+        } catch (error) {
+            console.error("Error loading more cards:", error);
+        } finally {
+            loadingMoreCards = false;
+        }
+    }
+
+    const cardsListSentinel = document.createElement('div');
+    cardsListContainer.after(cardsListSentinel);
+    new IntersectionObserver((entries) => {
+        if (entries.some(entry => entry.isIntersecting)) loadMoreCards();
+    }, { rootMargin: '400px' }).observe(cardsListSentinel);
+
     function renderCardsList() {
         // ... (renderCardsList function remains the same as before, ensure it uses escapeHtml) ...
         if (currentCards.length === 0) {
@@ -262,7 +293,8 @@ document.addEventListener("DOMContentLoaded", () => {
                     currentCards.unshift(result.card); 
                     console.log("currentCards after unshift:", currentCards);
                     
-                    cardCountSpan.textContent = currentCards.length;
+                    totalCardCount++;
+                    cardCountSpan.textContent = totalCardCount;
                     
                     if (formElement && typeof formElement.remove === 'function') {
                         formElement.remove(); 
@@ -337,7 +369,8 @@ document.addEventListener("DOMContentLoaded", () => {
             if (response.ok && result.success) {
                 currentCards = currentCards.filter(c => c.note_id.toString() !== noteId);
                 cardItemElement.remove();
-                cardCountSpan.textContent = currentCards.length;
+                totalCardCount--;
+                cardCountSpan.textContent = totalCardCount;
                 if (currentCards.length === 0) { // If last card deleted
                     renderCardsList(); // Show "no cards" message
                 }
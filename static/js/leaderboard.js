@@ -30,6 +30,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- State Variables ---
     let currentPage = 1;
     let totalPages = 0; // Initialize to 0
+    let pageCursors = [null]; // pageCursors[n - 1] is the keyset cursor that loads page n
     let currentUserId = null; 
 
     // --- Helper to get current user ID ---
@@ -62,7 +63,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // --- Core Function: Fetch and Display Leaderboard ---
     async function fetchLeaderboard(page = 1) {
         // Validate page number
-        if (page < 1 || (totalPages > 0 && page > totalPages)) {
+        if (page < 1 || (totalPages > 0 && page > totalPages) || pageCursors[page - 1] === undefined) {
              console.warn(`Attempted to fetch invalid page: ${page}. Current total pages: ${totalPages}`);
              return; // Do nothing for invalid pages
         }
@@ -78,7 +79,8 @@ document.addEventListener('DOMContentLoaded', () => {
         // if(currentUserRankSection) currentUserRankSection.style.display = 'none'; // Keep visible or hide depending on preference
 
         try {
-            const response = await fetch(`/api/leaderboard?page=${currentPage}`);
+            const pageCursor = pageCursors[currentPage - 1];
+            const response = await fetch(pageCursor ? `/api/leaderboard?cursor=${encodeURIComponent(pageCursor)}` : '/api/leaderboard');
             if (!response.ok) {
                 // If 401, login_required should handle redirect, but adding check
                 if (response.status === 401) {
@@ -98,6 +100,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 const currentUserRank = result.current_user_rank; // User's rank info or null
 
                 totalPages = pagination.total_pages;
+                pageCursors[currentPage] = pagination.next_cursor || undefined;
                 
                 // Get current user ID from the response if available
                 if (currentUserId === null) { // Only fetch once if possible
@@ -217,7 +220,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         pageInfoEl.textContent = `Page ${currentPage} of ${totalPages}`;
         prevPageBtn.disabled = currentPage <= 1;
-        nextPageBtn.disabled = currentPage >= totalPages;
+        nextPageBtn.disabled = currentPage >= totalPages || !pageCursors[currentPage];
 
         if (totalPages <= 1) { // Hide pagination if only one page
             if(paginationControls) paginationControls.style.display = 'none';
@@ -237,7 +240,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     if (nextPageBtn) {
         nextPageBtn.addEventListener('click', () => {
-            if (currentPage < totalPages) {
+            if (currentPage < totalPages && pageCursors[currentPage]) {
                 fetchLeaderboard(currentPage + 1);
             }
         });
@@ -258,6 +261,7 @@ document.addEventListener('DOMContentLoaded', () => {
     //             const result = await response.json();
     //             if (response.ok && result.success) {
     //                 alert(result.message || 'Leaderboard updated successfully!');
+    //                 pageCursors = [null];
     //                 fetchLeaderboard(1); // Refresh the first page of the leaderboard
     //             } else {
     //                 console.error("Admin populate failed:", result);
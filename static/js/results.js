@@ -15,6 +15,25 @@ document.addEventListener("DOMContentLoaded", () => {
 
     // Get DOM element for recent activity list
     const activityListElement = document.querySelector(".activity-list");
+
+    // The summary stats and the chart share one /api/stats/performance request.
+    let performanceRequest = null;
+    function fetchPerformanceData() {
+        if (!performanceRequest) {
+            performanceRequest = fetch("/api/stats/performance").then(async (response) => ({
+                ok: response.ok,
+                status: response.status,
+                result: response.ok ? await response.json() : null
+            }));
+        }
+        return performanceRequest;
+    }
+
+    function formatStudyTime(totalSeconds) {
+        const hours = Math.floor(totalSeconds / 3600);
+        const minutes = Math.floor((totalSeconds % 3600) / 60);
+        return hours > 0 ? `${hours}h ${minutes}m` : `${minutes}m`;
+    }
     function escapeHtml(unsafe) {
          if (typeof unsafe !== 'string') return '';
          return unsafe
@@ -65,22 +84,23 @@ document.addEventListener("DOMContentLoaded", () => {
                 // Option 3 is reasonable as performance API returns daily reviews/ratings.
 
                  // Let's fetch from /api/stats/performance to get totals for the period
-                 const perfResponse = await fetch("/api/stats/performance");
-                 if(perfResponse.ok) {
-                     const perfResult = await perfResponse.json();
-                     if(perfResult.success && perfResult.performance_data) {
-                         const totalReviews = perfResult.performance_data.datasets[0].data.reduce((sum, count) => sum + count, 0);
-                         const validRatings = perfResult.performance_data.datasets[1].data.filter(r => r !== null);
-                         const averageRating = validRatings.length > 0 ? (validRatings.reduce((sum, rating) => sum + rating, 0) / validRatings.length).toFixed(2) : 'N/A';
-
-                          if(totalCardsReviewedElement) totalCardsReviewedElement.textContent = totalReviews;
+                 let timeStudied = null;
+                 const perf = await fetchPerformanceData();
+                 if(perf.ok) {
+                     const perfResult = perf.result;
+                     if(perfResult.success && perfResult.performance_data && perfResult.performance_data.totals) {
+                         const totals = perfResult.performance_data.totals;
+                         const averageRating = totals.average_rating !== null ? totals.average_rating.toFixed(2) : 'N/A';
+                         timeStudied = formatStudyTime(totals.seconds_studied);
+
+                          if(totalCardsReviewedElement) totalCardsReviewedElement.textContent = totals.total_reviews;
                           if(averageAccuracyElement) averageAccuracyElement.textContent = `${averageRating} (Avg Rating)`; // Label correctly
                      }
                  }
 
 
                 if(studyStreakElement) studyStreakElement.textContent = stats.review_streak_days !== undefined ? `${stats.review_streak_days} days` : 'N/A';
-                if(timeStudiedElement) timeStudiedElement.textContent = stats.total_study_time_formatted || 'N/A';
+                if(timeStudiedElement) timeStudiedElement.textContent = timeStudied || 'N/A';
 
 
              } else {
@@ -109,9 +129,9 @@ document.addEventListener("DOMContentLoaded", () => {
          }
 
          try {
-              const response = await fetch("/api/stats/performance");
-             if (!response.ok) {
-                 console.error("Failed to fetch performance data", response.status);
+              const perf = await fetchPerformanceData();
+             if (!perf.ok) {
+                 console.error("Failed to fetch performance data", perf.status);
                  // Display error message in chart area
                  const errorDiv = document.createElement('div');
                  errorDiv.textContent = 'Error loading performance data.';
@@ -119,7 +139,7 @@ document.addEventListener("DOMContentLoaded", () => {
                  performanceChartCanvas.parentNode.replaceChild(errorDiv, performanceChartCanvas);
                  return;
              }
-             const result = await response.json();
+             const result = perf.result;
 
              if (result.success && result.performance_data) {
                  const chartData = result.performance_data;
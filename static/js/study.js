@@ -11,6 +11,13 @@ document.addEventListener("DOMContentLoaded", () => {
 
     let studyCards = [];
     let currentCardIndex = 0;
+    // The server keeps the session queue; cards arrive a page at a time.
+    let studySessionId = null;
+    let studyCursor = null;
+    let studyHasMore = false;
+    let totalCards = 0;
+    let pendingPage = null;
+    let cardShownAt = null; // When the current card was shown, for time studied
     let currentDeckId = null; // This will now be updated by the dropdown listener
 
     function escapeHtml(unsafe) {
@@ -35,6 +42,11 @@ document.addEventListener("DOMContentLoaded", () => {
         currentDeckId = deckId;
         currentCardIndex = 0; // Reset index for new deck
         studyCards = []; // Clear previous cards
+        studySessionId = null;
+        studyCursor = null;
+        studyHasMore = false;
+        totalCards = 0;
+        pendingPage = null;
 
 
         // Reset UI to loading state
@@ -51,7 +63,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
 
         try {
-            const response = await fetch(`/api/study/session/${deckId}`);
+            const response = await fetch(`/api/study/session/${deckId}/next`);
             console.log("API Response Status (Study Session):", response.status);
 
             if (!response.ok) {
@@ -69,6 +81,10 @@ document.addEventListener("DOMContentLoaded", () => {
 
             if (result.success && result.cards) {
                 studyCards = result.cards;
+                studySessionId = result.session_id;
+                studyCursor = result.next_cursor;
+                studyHasMore = result.has_more;
+                totalCards = result.total_cards;
                 console.log("Fetched Study Cards:", studyCards);
 
                 if (studyCards.length === 0) {
@@ -98,6 +114,30 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
   
+    // Loads the next page of the session queue; concurrent calls share one request.
+    function fetchNextStudyPage() {
+        if (!pendingPage) {
+            const deckId = currentDeckId;
+            pendingPage = (async () => {
+                try {
+                    const response = await fetch(`/api/study/session/${deckId}/next?cursor=${encodeURIComponent(studyCursor)}`);
+                    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                    const result = await response.json();
+                    if (deckId !== currentDeckId || !result.success) return;
+                    studyCards = studyCards.concat(result.cards);
+                    studyCursor = result.next_cursor;
+                    studyHasMore = result.has_more;
+                    totalCards = result.total_cards;
+                } catch (error) {
+                    console.error("Failed to fetch the next study page:", error);
+                } finally {
+                    pendingPage = null;
+                }
+            })();
+        }
+        return pendingPage;
+    }
+
     async function fetchDeckName(deckId) {
        console.log("fetchDeckName called for deck ID:", deckId); // Log which deck ID is being fetched
        try {
@@ -137,9 +177,15 @@ document.addEventListener("DOMContentLoaded", () => {
         flashcardElement.classList.remove("flipped");
         cardFrontElement.innerHTML = `<p>${escapeHtml(cardData.front)}</p>`;
         cardBackElement.innerHTML = `<p>${escapeHtml(cardData.back)}</p>`;
-        cardCounterElement.textContent = `Card ${currentCardIndex + 1} of ${studyCards.length}`;
-        progressBar.style.width = `${((currentCardIndex + 1) / studyCards.length) * 100}%`;
+        cardCounterElement.textContent = `Card ${currentCardIndex + 1} of ${totalCards}`;
+        progressBar.style.width = `${((currentCardIndex + 1) / totalCards) * 100}%`;
         flashcardElement.dataset.flashcardId = cardData.flashcard_id;
+        cardShownAt = Date.now();
+
+        // Prefetch so the next page is usually there before it is needed.
+        if (studyHasMore && studyCards.length - currentCardIndex <= 2) {
+            fetchNextStudyPage();
+        }
     }
 
     flashcardElement.addEventListener("click", () => flashcardElement.classList.toggle("flipped"));
@@ -178,13 +224,25 @@ document.addEventListener("DOMContentLoaded", () => {
             const response = await fetch(`/api/study/review/${flashcardId}`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json', 'Accept': 'application/json' },
-                body: JSON.stringify({ rating: ratingString }),
+                body: JSON.stringify({
+                    rating: ratingString,
+                    study_session_id: studySessionId,
+                    duration_seconds: cardShownAt ? Math.round((Date.now() - cardShownAt) / 1000) : null
+                }),
             });
             const result = await response.json();
             console.log("Submit Review API Result:", result); // Log review result
 
             if (response.ok && result.success) {
+                if (result.requeued) {
+                    // The card was put back into the server-side queue.
+                    totalCards++;
+                    studyHasMore = true;
+                }
                 currentCardIndex++;
+                if (currentCardIndex >= studyCards.length && studyHasMore) {
+                    await fetchNextStudyPage();
+                }
                 if (currentCardIndex < studyCards.length) {
                     loadCard(studyCards[currentCardIndex]);
                 } else {
@@ -283,6 +341,9 @@ document.addEventListener("DOMContentLoaded", () => {
                currentDeckId = null; // Reset global state
                studyCards = [];
                currentCardIndex = 0;
+               studySessionId = null;
+               studyCursor = null;
+               studyHasMore = false;
                // Reset UI to initial state
                deckTitleElement.textContent = "NeuroFlash Study";
                cardCounterElement.textContent = "";
@@ -0,0 +1,99 @@
+# streaks.py
+
+import re
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+ACTIVITY_WINDOW_DAYS = 64
+RECENT_ACTIVITY_DAYS = 30
+DEFAULT_TIMEZONE = 'UTC+0'
+
+_UTC_OFFSET_PATTERN = re.compile(r'^UTC([+-])(\d{1,2})(?::?(\d{2}))?$')
+_ALL_DAYS_ACTIVE = (1 << ACTIVITY_WINDOW_DAYS) - 1
+
+# user_stats keeps, per user: last_reviewed_date (in the user's time zone),
+# review_streak_days and longest_streak_days as of that day, and
+# activity_bitmap where bit i is set when the user reviewed i days before
+# last_reviewed_date. The upsert moves them forward for one review day.
+#
+# MySQL evaluates ON DUPLICATE KEY UPDATE assignments left to right, so the
+# streak sees the new bitmap while last_reviewed_date still holds the old
+# day; keep the column order. A streak is the run of set bits from bit 0,
+# counted as BIT_COUNT(b ^ (b + 1)) - 1; once the window is all ones it
+# grows by the days advanced instead.
+USER_STATS_REVIEW_UPSERT = f"""
+    INSERT INTO user_stats
+        (user_id, points, total_reviews, last_reviewed_date, review_streak_days, longest_streak_days, activity_bitmap)
+    VALUES (%s, %s, %s, %s, 1, 1, 1)
+    ON DUPLICATE KEY UPDATE
+        points = points + VALUES(points),
+        total_reviews = total_reviews + VALUES(total_reviews),
+        activity_bitmap = CASE
+            WHEN last_reviewed_date IS NULL THEN 1
+            WHEN VALUES(last_reviewed_date) >= last_reviewed_date
+                THEN (activity_bitmap << DATEDIFF(VALUES(last_reviewed_date), last_reviewed_date)) | 1
+            ELSE activity_bitmap | (1 << DATEDIFF(last_reviewed_date, VALUES(last_reviewed_date)))
+        END,
+        review_streak_days = CASE
+            WHEN activity_bitmap = {_ALL_DAYS_ACTIVE} THEN GREATEST(
+                review_streak_days + GREATEST(DATEDIFF(VALUES(last_reviewed_date), last_reviewed_date), 0),
+                {ACTIVITY_WINDOW_DAYS}
+            )
+            ELSE BIT_COUNT(activity_bitmap ^ (activity_bitmap + 1)) - 1
+        END,
+        longest_streak_days = GREATEST(longest_streak_days, review_streak_days),
+        last_reviewed_date = GREATEST(COALESCE(last_reviewed_date, VALUES(last_reviewed_date)), VALUES(last_reviewed_date))
+"""
+
+
+def parse_timezone(name):
+    """Return a tzinfo for a profile time zone ('UTC+1', 'UTC-5:30' or an IANA name).
+
+    Unknown values fall back to UTC so a bad setting never blocks a review.
+    """
+    match = _UTC_OFFSET_PATTERN.match(name or '')
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        if offset <= timedelta(hours=14):
+            return timezone(-offset if sign == '-' else offset)
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return timezone.utc
+
+
+def local_review_day(tz_name, moment=None):
+    """The calendar day in the user's time zone of a naive server-local datetime (default: now)."""
+    moment = moment or datetime.now()
+    return moment.astimezone(parse_timezone(tz_name)).date()
+
+
+def streak_summary(stats_row, today):
+    """Current streak, longest streak and recent activity as of the user's ``today``.
+
+    The stored streak is as of last_reviewed_date; it is still current when
+    that day is today or yesterday and has lapsed otherwise.
+    """
+    last_reviewed_date = stats_row.get('last_reviewed_date') if stats_row else None
+    if last_reviewed_date is None:
+        return {
+            'review_streak_days': 0,
+            'longest_streak_days': 0,
+            'recent_activity': [False] * RECENT_ACTIVITY_DAYS
+        }
+
+    days_since = (today - last_reviewed_date).days
+    activity_bitmap = int(stats_row.get('activity_bitmap') or 0)
+    recent_activity = []
+    # Oldest day first, ending with today.
+    for days_ago in range(RECENT_ACTIVITY_DAYS - 1, -1, -1):
+        bit = days_ago - days_since
+        recent_activity.append(0 <= bit < ACTIVITY_WINDOW_DAYS and bool(activity_bitmap >> bit & 1))
+
+    return {
+        'review_streak_days': (stats_row.get('review_streak_days') or 0) if days_since <= 1 else 0,
+        'longest_streak_days': stats_row.get('longest_streak_days') or 0,
+        'recent_activity': recent_activity
+    }
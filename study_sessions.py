@@ -0,0 +1,96 @@
+# study_sessions.py
+
+import json
+import random
+
+STUDY_PAGE_SIZE = 5
+MAX_STUDY_PAGE_SIZE = 50
+# A relapsed card comes back after this many other cards.
+RELAPSE_REINSERT_GAP = 3
+STUDY_SESSION_MAX_AGE_HOURS = 24
+
+# The statements are shared with the async routes in asgi.py.
+NEW_CARDS_QUERY = """
+    SELECT f.id
+    FROM flashcards f
+    JOIN notes n ON f.note_id = n.id
+    WHERE f.deck_id = %s AND n.user_id = %s AND f.card_type = 'new'
+    ORDER BY f.created_at DESC
+    LIMIT %s
+"""
+DUE_CARDS_QUERY = """
+    SELECT f.id
+    FROM flashcards f
+    JOIN notes n ON f.note_id = n.id
+    WHERE f.deck_id = %s AND n.user_id = %s AND f.card_type != 'new' AND f.due_date <= %s
+    ORDER BY f.due_date ASC, f.ease_factor ASC
+    LIMIT %s
+"""
+DELETE_EXPIRED_SESSIONS = "DELETE FROM study_sessions WHERE user_id = %s AND created_at < NOW() - INTERVAL %s HOUR"
+INSERT_SESSION = "INSERT INTO study_sessions (user_id, deck_id, card_ids, handed_out) VALUES (%s, %s, %s, 0)"
+LOAD_SESSION_QUERY = """
+    SELECT id, deck_id, card_ids, handed_out
+    FROM study_sessions
+    WHERE id = %s AND user_id = %s
+"""
+MARK_HANDED_OUT = "UPDATE study_sessions SET handed_out = GREATEST(handed_out, %s) WHERE id = %s"
+UPDATE_SESSION_CARDS = "UPDATE study_sessions SET card_ids = %s WHERE id = %s"
+
+
+def build_study_queue(cur, deck_id, user_id, new_cards_limit, review_cards_limit, today):
+    """Return the shuffled flashcard ids of a study session.
+
+    Only ids are read here; card contents are loaded a page at a time.
+    """
+    cur.execute(NEW_CARDS_QUERY, (deck_id, user_id, new_cards_limit))
+    card_ids = [row['id'] for row in cur.fetchall()]
+
+    cur.execute(DUE_CARDS_QUERY, (deck_id, user_id, today, review_cards_limit))
+    card_ids.extend(row['id'] for row in cur.fetchall())
+
+    random.shuffle(card_ids)
+    return card_ids
+
+
+def create_study_session(cur, user_id, deck_id, card_ids):
+    # Sessions are short-lived; the user's expired ones are dropped here.
+    cur.execute(DELETE_EXPIRED_SESSIONS, (user_id, STUDY_SESSION_MAX_AGE_HOURS))
+    cur.execute(INSERT_SESSION, (user_id, deck_id, json.dumps(card_ids)))
+    return cur.lastrowid
+
+
+def decode_study_session(row):
+    if row:
+        row = dict(row)
+        row['card_ids'] = json.loads(row['card_ids'])
+    return row
+
+
+def load_study_session(cur, session_id, user_id, for_update=False):
+    cur.execute(LOAD_SESSION_QUERY + (' FOR UPDATE' if for_update else ''), (session_id, user_id))
+    return decode_study_session(cur.fetchone())
+
+
+def mark_handed_out(cur, session_id, position):
+    cur.execute(MARK_HANDED_OUT, (position, session_id))
+
+
+def insert_relapsed_card(study_session, flashcard_id):
+    """Return the session's card ids with the card put back a few cards after those already handed out."""
+    card_ids = study_session['card_ids']
+    position = min(study_session['handed_out'] + RELAPSE_REINSERT_GAP, len(card_ids))
+    card_ids.insert(position, flashcard_id)
+    return card_ids
+
+
+def requeue_card(cur, session_id, user_id, flashcard_id):
+    """Put a relapsed card back into the queue a few cards after those already handed out.
+
+    Returns False when the session does not exist (expired or not the user's).
+    """
+    study_session = load_study_session(cur, session_id, user_id, for_update=True)
+    if not study_session:
+        return False
+    card_ids = insert_relapsed_card(study_session, flashcard_id)
+    cur.execute(UPDATE_SESSION_CARDS, (json.dumps(card_ids), session_id))
+    return True
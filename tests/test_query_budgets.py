@@ -0,0 +1,102 @@
+# tests/test_query_budgets.py
+#
+# Round-trip budgets of the write endpoints: each request runs a fixed
+# number of statements whatever the number of cards, notes or reviews it
+# carries. A per-item statement (N+1) fails max_repeats, and a count that
+# grows with the payload fails the small/large comparison.
+
+import pytest
+
+MAX_REPEATS = 2
+
+
+@pytest.fixture
+def study_user(populated_db):
+    cur = populated_db.cursor()
+    try:
+        cur.execute("""
+            SELECT u.id, u.username
+            FROM users u
+            JOIN notes n ON n.user_id = u.id
+            GROUP BY u.id, u.username
+            HAVING COUNT(*) >= 40
+            ORDER BY u.id
+            LIMIT 1
+        """)
+        user = cur.fetchone()
+        cur.execute("""
+            SELECT f.id AS flashcard_id, n.id AS note_id
+            FROM flashcards f
+            JOIN notes n ON f.note_id = n.id
+            WHERE n.user_id = %s
+            ORDER BY f.id
+            LIMIT 40
+        """, (user['id'],))
+        cards = list(cur.fetchall())
+    finally:
+        cur.close()
+    populated_db.commit()
+    return {'id': user['id'], 'username': user['username'], 'cards': cards}
+
+
+@pytest.fixture
+def client(study_user):
+    from app import app
+
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = study_user['id']
+        flask_session['username'] = study_user['username']
+    return client
+
+
+def request_query_count(query_budget, max_queries, send):
+    with query_budget(max_queries, max_repeats=MAX_REPEATS) as reports:
+        response = send()
+    assert response.status_code in (200, 201), response.get_json()
+    assert len(reports) == 1
+    return reports[0].count
+
+
+def test_create_deck_budget(client, query_budget):
+    def send(card_count):
+        return lambda: client.post('/api/decks', json={
+            'name': f'Budget deck {card_count}',
+            'tags': ['budget', f'budget-{card_count}'],
+            'cards': [{'front': f'Front {i}', 'back': f'Back {i}'} for i in range(card_count)],
+        })
+
+    small = request_query_count(query_budget, 20, send(2))
+    large = request_query_count(query_budget, 20, send(40))
+    assert large == small
+
+
+def test_create_custom_deck_budget(client, study_user, query_budget):
+    note_ids = [card['note_id'] for card in study_user['cards']]
+
+    def send(note_count):
+        return lambda: client.post('/api/decks/create-custom', json={
+            'name': f'Budget custom deck {note_count}',
+            'note_ids': note_ids[:note_count],
+        })
+
+    small = request_query_count(query_budget, 15, send(2))
+    large = request_query_count(query_budget, 15, send(40))
+    assert large == small
+
+
+def test_review_batch_budget(client, study_user, query_budget):
+    flashcard_ids = [card['flashcard_id'] for card in study_user['cards']]
+
+    def send(review_count):
+        return lambda: client.post('/api/study/review/batch', json={
+            'reviews': [
+                {'flashcard_id': flashcard_id, 'rating': ('hard', 'good', 'easy')[index % 3]}
+                for index, flashcard_id in enumerate(flashcard_ids[:review_count])
+            ],
+        })
+
+    small = request_query_count(query_budget, 20, send(2))
+    large = request_query_count(query_budget, 20, send(40))
+    # The deck_due_counts cleanup only runs when a due date loses cards.
+    assert large <= small + 1
@@ -0,0 +1,29 @@
+# tests/test_query_plans.py
+
+import pytest
+
+from query_plans import HOT_QUERIES, check_query_plans, explain_hot_queries
+
+
+@pytest.fixture(scope='module')
+def plan_problems(populated_db):
+    return check_query_plans(populated_db)
+
+
+@pytest.mark.parametrize('name', [name for name, _ in HOT_QUERIES])
+def test_hot_query_uses_indexes(plan_problems, name):
+    problems = [problem for problem in plan_problems if problem.startswith(f"{name}:")]
+    assert problems == []
+
+
+def test_due_queue_is_read_in_index_order(populated_db):
+    # An index on (deck_id, card_type, due_date) still leaves a filesort here.
+    for row in explain_hot_queries(populated_db)['study_queue_due']:
+        assert 'filesort' not in (row.get('Extra') or ''), row
+        assert 'temporary' not in (row.get('Extra') or ''), row
+
+
+def test_card_search_is_read_in_index_order(populated_db):
+    # Ordering on a flashcards column as well would filesort every matching row.
+    for row in explain_hot_queries(populated_db)['card_search_recent']:
+        assert 'Using filesort' not in (row.get('Extra') or ''), row